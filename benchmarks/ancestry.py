@@ -0,0 +1,76 @@
+"""Benchmark the ancestry queries of the repository
+
+Ask whether each release head reaches the others, and for the merge bases of
+each pair of heads, on a deep linear history and on a merge-heavy history.
+The generation-pruned queries of the repository are compared with plain
+depth-first searches:
+
+    python -m benchmarks.ancestry
+"""
+import itertools
+import time
+from typing import Callable, List, Set
+
+from releasy.repository import Commit, Repository
+from tests.mock_repository import SyntheticRepositoryProxy
+
+HISTORIES = {
+    'linear': dict(branches=1, tags=40, commits_per_tag=500, history=20000),
+    'merges': dict(branches=20, tags=2, commits_per_tag=500, history=20000),
+}
+
+
+def ancestors(commit: Commit) -> Set[Commit]:
+    commits = set([commit])
+    commits_to_track = [commit]
+    while commits_to_track:
+        for parent in commits_to_track.pop().parents:
+            if parent not in commits:
+                commits.add(parent)
+                commits_to_track.append(parent)
+    return commits
+
+
+def dfs_is_ancestor(commit: Commit, descendant: Commit) -> bool:
+    return commit in ancestors(descendant)
+
+
+def dfs_merge_bases(commit: Commit, other: Commit) -> Set[Commit]:
+    common = ancestors(commit) & ancestors(other)
+    # the ancestors of a common ancestor are common too, so a common 
+    # ancestor reaches another one if it reaches it through a parent
+    return common - set(parent for base in common for parent in base.parents)
+
+
+def measure(query: Callable, heads: List[Commit]) -> float:
+    start = time.perf_counter()
+    for commit, other in itertools.permutations(heads, 2):
+        query(commit, other)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    print(f"{'history':>8} {'heads':>6} {'index':>8} {'ancestor':>9} "
+          f"{'dfs':>8} {'bases':>8} {'dfs':>8}")
+    for name, parameters in HISTORIES.items():
+        proxy = SyntheticRepositoryProxy(**parameters)
+        repository = Repository(proxy)
+        heads = [repository.get_commit(id) for id in proxy.tag_refs.values()]
+        heads = heads[::max(1, len(heads) // 10)]
+        # load the commits before timing the queries
+        for commit in proxy.parent_refs:
+            repository.get_commit(commit).parents
+
+        start = time.perf_counter()
+        for head in heads:
+            repository.generation(head)
+        index = time.perf_counter() - start
+        print(f"{name:>8} {len(heads):>6} {index:>8.3f}",
+              f"{measure(repository.is_ancestor, heads):>9.3f}",
+              f"{measure(dfs_is_ancestor, heads):>8.3f}",
+              f"{measure(repository.merge_bases, heads):>8.3f}",
+              f"{measure(dfs_merge_bases, heads):>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
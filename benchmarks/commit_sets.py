@@ -0,0 +1,53 @@
+"""Benchmark the union of the commits of many releases
+
+Mine a synthetic repository with many patches, and print the time to 
+unite the commits of all patches, the first time and once the bitmaps of
+the patches are built, and the memory of these bitmaps:
+
+    python -m benchmarks.commit_sets
+"""
+import sys
+import time
+
+import releasy
+from releasy.miner_base_release import BaseReleaseMiner
+from releasy.miner_commit import HistoryCommitMiner
+from releasy.miner_release import FinalReleaseMiner
+from releasy.miner_semantic import SemanticReleaseMiner
+from releasy.repository import Repository
+from tests.mock_repository import SyntheticRepositoryProxy
+
+BRANCHES = 10
+
+
+def main() -> None:
+    print(f"{'patches':>8} {'commits':>8} {'cold':>8} {'warm':>8} {'MB':>6}")
+    for tags in (100, 200, 400):
+        proxy = SyntheticRepositoryProxy(BRANCHES, tags, commits_per_tag=50, 
+                                         patches=True)
+        project = releasy.Miner(Repository(proxy)).apply(
+            FinalReleaseMiner(),
+            HistoryCommitMiner(),
+            BaseReleaseMiner(),
+            SemanticReleaseMiner()
+        ).mine()
+        start = time.perf_counter()
+        commits = project.patches.commits()
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        commits = project.patches.commits()
+        warm = time.perf_counter() - start
+        print(f"{len(project.patches):>8} {len(commits):>8} {cold:>8.3f} "
+              f"{warm:>8.3f} {bitmaps_size(project) / 2**20:>6.1f}")
+
+
+def bitmaps_size(project) -> int:
+    size = 0
+    for srelease in project.patches:
+        chunks = srelease.commits.bitmap.chunks
+        size += sys.getsizeof(chunks) \
+            + sum(sys.getsizeof(bits) for bits in chunks.values())
+    return size
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Benchmark the pygit2 and git command line repository backends
+
+Read the tags and the commit graph of a repository with both backends, 
+then fetch the tagged commits and their ancestors one by one:
+
+    python -m benchmarks.git_backends path/to/repository
+"""
+import sys
+import time
+from typing import Callable, Dict
+
+from releasy.repository import Repository, RepositoryProxy
+from releasy.repository_git import GitRepository
+from releasy.repository_gitcli import GitCliRepository
+
+BACKENDS: Dict[str, Callable[[str], RepositoryProxy]] = {
+    'pygit2': lambda path: GitRepository(path, use_commit_graph=False),
+    'git': GitCliRepository,
+}
+
+
+def fetch_tags(repository: Repository) -> int:
+    return len(repository.get_tags())
+
+
+def load_commits(repository: Repository) -> int:
+    repository.load_commits()
+    return len(repository.commit_cache)
+
+
+def walk_commits(repository: Repository) -> int:
+    commits = set()
+    commits_to_track = [tag.commit for tag in repository.get_tags()]
+    while commits_to_track:
+        commit = commits_to_track.pop()
+        if commit not in commits:
+            commits.add(commit)
+            commits_to_track.extend(commit.parents)
+    return len(commits)
+
+
+def main() -> None:
+    path = sys.argv[1] if len(sys.argv) > 1 else '.'
+    print(f"{'backend':>8} {'task':>14} {'items':>8} {'time':>8}")
+    for task in (fetch_tags, load_commits, walk_commits):
+        for backend, proxy in BACKENDS.items():
+            repository = Repository(proxy(path))
+            start = time.perf_counter()
+            items = task(repository)
+            print(f"{backend:>8} {task.__name__:>14} {items:>8}",
+                  f"{time.perf_counter() - start:>8.3f}")
+            if isinstance(repository.proxy, GitCliRepository):
+                repository.proxy.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Benchmark mining from a history dump
+
+Export the history of a Git repository to a dump, then load the commit
+graph from the repository and from the dump:
+
+    python -m benchmarks.history_dump path/to/repository
+"""
+import os
+import sys
+import tempfile
+import time
+
+import releasy
+from releasy.miner_commit import HistoryCommitMiner
+from releasy.miner_release import ReleaseMiner
+from releasy.repository import Repository, RepositoryProxy
+from releasy.repository_dump import DumpRepository, export_dump
+from releasy.repository_git import GitRepository
+
+
+def mine(proxy: RepositoryProxy) -> float:
+    start = time.perf_counter()
+    repository = Repository(proxy)
+    repository.load_commits()
+    releasy.Miner(repository).apply(
+        ReleaseMiner(), 
+        HistoryCommitMiner()).mine()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    path = sys.argv[1] if len(sys.argv) > 1 else '.'
+    with tempfile.TemporaryDirectory() as directory:
+        dump_path = os.path.join(directory, 'history.dump')
+        start = time.perf_counter()
+        export_dump(Repository(GitRepository(path)), dump_path)
+        print(f"export {time.perf_counter() - start:8.3f}s",
+              f"{os.path.getsize(dump_path) / 2**20:8.1f}MB")
+
+        start = time.perf_counter()
+        DumpRepository(dump_path).verify()
+        print(f"verify {time.perf_counter() - start:8.3f}s")
+        print(f"git    {mine(GitRepository(path)):8.3f}s")
+        print(f"dump   {mine(DumpRepository(dump_path)):8.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""Benchmark the MixedHistoryCommitMiner engines
+
+Mine synthetic repositories with long-lived maintenance branches, growing
+the number of tags, and print the mining time of each engine:
+
+    python -m benchmarks.mixed_history
+"""
+import time
+
+import releasy
+from releasy.miner_commit import MixedHistoryCommitMiner
+from releasy.miner_release import ReleaseMiner
+from releasy.repository import Repository
+from tests.mock_repository import SyntheticRepositoryProxy
+
+HISTORY = 20000
+
+
+def mine(engine: str, branches: int, tags: int) -> float:
+    proxy = SyntheticRepositoryProxy(branches, tags, history=HISTORY)
+    project = releasy.Miner(Repository(proxy)).apply(ReleaseMiner()).mine()
+    # load the commits before timing the traversal
+    for commit in proxy.parent_refs:
+        project.repository.get_commit(commit).parents
+    start = time.perf_counter()
+    MixedHistoryCommitMiner(engine).mine(project)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    print(f"{'branches':>8} {'tags':>6}", 
+          *(f"{engine:>8}" for engine in MixedHistoryCommitMiner.ENGINES))
+    for branches in (5, 10, 20, 40, 80):
+        tags = 5
+        print(f"{branches:>8} {branches * tags:>6}", 
+              *(f"{mine(engine, branches, tags):>8.3f}" 
+                for engine in MixedHistoryCommitMiner.ENGINES))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""Benchmark the ReleaseVersion parsing
+
+Parse a corpus of 100k tag names, most of them nightly tags, check their
+types, as the release miners do, and sort the parsed versions:
+
+    python -m benchmarks.release_version
+"""
+import re
+import time
+
+from releasy.release import ReleaseVersion
+
+CORPUS_SIZE = 100000
+
+
+def corpus(size: int):
+    names = []
+    for pos in range(size):
+        if pos % 10:
+            names.append(f"nightly-{20200101 + pos % 20000}")
+        else:
+            names.append(f"v{pos % 7}.{pos % 13}.{pos % 3}")
+    return names
+
+
+def parse(names, **patterns) -> float:
+    start = time.perf_counter()
+    for name in names:
+        version = ReleaseVersion(name, **patterns)
+        version.is_main_release()
+        version.is_pre_release()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    names = corpus(CORPUS_SIZE)
+    uncached = parse(names, version_separator=re.compile(r'([0-9]+)'))
+    cold = parse(names)
+    warm = parse(names)
+    print(f"{len(names)} tags, {len(set(names))} distinct names")
+    print(f"uncached: {uncached:.3f}s")
+    print(f"memoized (cold): {cold:.3f}s")
+    print(f"memoized (warm): {warm:.3f}s")
+
+    versions = [ReleaseVersion(name) for name in names]
+    start = time.perf_counter()
+    sorted(versions, key=lambda version: version.key)
+    print(f"sort by key: {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""Benchmark the SemanticReleaseMiner
+
+Mine synthetic repositories with a growing number of tags, half of them
+patches, and print the time of the semantic stage alone:
+
+    python -m benchmarks.semantic
+"""
+import time
+
+import releasy
+from releasy.miner_base_release import BaseReleaseMiner
+from releasy.miner_commit import HistoryCommitMiner
+from releasy.miner_release import FinalReleaseMiner
+from releasy.miner_semantic import SemanticReleaseMiner
+from releasy.repository import Repository
+from tests.mock_repository import SyntheticRepositoryProxy
+
+BRANCHES = 10
+
+
+def mine(tags: int, patches: bool) -> float:
+    proxy = SyntheticRepositoryProxy(BRANCHES, tags // BRANCHES,
+                                     commits_per_tag=1, patches=patches)
+    project = releasy.Miner(Repository(proxy)).apply(
+        FinalReleaseMiner(),
+        HistoryCommitMiner(engine='topological'),
+        BaseReleaseMiner()
+    ).mine()
+    start = time.perf_counter()
+    SemanticReleaseMiner().mine(project)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    print(f"{'tags':>6} {'minors':>8} {'patches':>8}")
+    for tags in (1000, 2000, 4000, 8000, 16000):
+        print(f"{tags:>6} {mine(tags, False):>8.3f} {mine(tags, True):>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 __all__ = [
     'Miner',
+    'BatchMiner',
     'Project',
     'ReleaseMiner',
     'FinalReleaseMiner',
@@ -10,18 +11,25 @@ __all__ = [
     'MixedHistoryCommitMiner',
     'ContributorMiner',
     'BaseReleaseMiner',
-    'SemanticReleaseMiner']
+    'SemanticReleaseMiner',
+    'ReachabilityMiner']
 
 from .miner_release import *
 from .miner_commit import *
 from .miner_base_release import *
 from .miner_contributor import *
 from .miner_semantic import *
+from .miner_reachability import *
+from .miner_batch import BatchMiner, RepositoryFactory
 
 from .project import Project
 from .repository import Repository
 from .miner_base import AbstractMiner
-from .repository_git import GitRepository
+from .repository_gitcli import GitCliRepository
+try:
+    from .repository_git import GitRepository
+except ImportError: # pygit2 is not installed
+    GitRepository = None
 
 
 class Miner():
@@ -33,24 +41,48 @@ class Miner():
         BaseReleaseMiner(),
         SemanticReleaseMiner()
     ).mine()
+
+    A previously mined project can be updated with the new tags, reusing 
+    the work done for the releases that did not change, e.g:
+
+    project = releasy.Miner(project.repository).apply(
+        FinalReleaseMiner(),
+        HistoryCommitMiner(),
+        BaseReleaseMiner(),
+        SemanticReleaseMiner()
+    ).mine(project)
+
+    A repository path is read with pygit2, or with the git command line 
+    when pygit2 is not installed.
+
+    Before the first mining, the commits reachable from the tags are loaded
+    in bulk with Repository.load_commits, which also reads and writes the 
+    commit-graph cache of the repository, if any. Set load_commits to False
+    to fetch the commits one by one, as the miners reach them.
     """
-    def __init__(self, repository: Repository, name: str = None) -> None:
+    def __init__(self, repository: Repository, name: str = None,
+                 load_commits: bool = True) -> None:
         if isinstance(repository, str):
-            self.repository = Repository(GitRepository(repository))
+            proxy = GitRepository or GitCliRepository
+            self.repository = Repository(proxy(repository))
         else:
             self.repository = repository
         if name:
             self.name = name
         else:
             self.name = self.repository.name
+        self.load_commits = load_commits
         self.miners = list[AbstractMiner]()
 
     def apply(self, *miners) -> Miner:
         self.miners.extend(miners)
         return self
 
-    def mine(self) -> Project:
-        project = Project(self.name, self.repository)
+    def mine(self, project: Project = None) -> Project:
+        if not project:
+            project = Project(self.name, self.repository)
+        if self.load_commits and not self.repository.commits_loaded:
+            self.repository.load_commits()
         args = []
         for miner in self.miners:
             project, args = miner.mine(project, *args)
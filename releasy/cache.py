@@ -0,0 +1,226 @@
+"""Persistent caches
+
+This module stores repository data in SQLite files, so that the next runs
+can load it without reading the version control system again.
+"""
+from __future__ import annotations
+from contextlib import closing
+import sqlite3
+from typing import Dict, Iterable, Set, Tuple
+
+from .repository import Commit, DiffDelta, Repository, Tag
+
+
+class CommitGraphCache:
+    """
+    Store the commit graph and the tags of a repository.
+
+    The cache is keyed by the repository refs: it is only loaded when the
+    refs are the same as the ones used to save it.
+    """
+    VERSION = '1'
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def load(self, repository: Repository,
+             refs: str) -> Tuple[Dict[str, Commit], Set[Tag]]:
+        """Load the commits and tags, or return None if the cache is stale"""
+        with closing(sqlite3.connect(self.path)) as db:
+            if not self._is_valid(db, refs):
+                return None
+
+            identity_table = repository.identity_table
+            identities = [
+                identity_table.intern(name) if name is not None else None
+                for name, in db.execute(
+                    'SELECT name FROM identities ORDER BY pos')]
+            commits = [
+                Commit(
+                    repository,
+                    id,
+                    message,
+                    committer_id=identities[committer],
+                    author_id=identities[author],
+                    committer_timestamp=committer_time,
+                    committer_offset=committer_offset,
+                    author_timestamp=author_time,
+                    author_offset=author_offset)
+                for id, message, committer, committer_time, committer_offset,
+                    author, author_time, author_offset
+                in db.execute(
+                    'SELECT id, message, committer, committer_time, '
+                    'committer_offset, author, author_time, author_offset '
+                    'FROM commits ORDER BY pos')]
+
+            parents = [[] for _ in commits]
+            for commit_pos, parent_pos in db.execute(
+                    'SELECT commit_pos, parent_pos FROM parents ORDER BY rowid'):
+                parents[commit_pos].append(commits[parent_pos])
+            table = repository.commit_table
+            for commit, commit_parents in zip(commits, parents):
+                table.set_parents(commit.index, commit_parents)
+
+            tags = set[Tag]()
+            for name, commit_pos, message, author, time, offset in db.execute(
+                    'SELECT name, commit_pos, message, author, time, offset '
+                    'FROM tags'):
+                tag = Tag(
+                    repository,
+                    name,
+                    commits[commit_pos],
+                    message,
+                    author,
+                    timestamp=time,
+                    offset=offset)
+                tags.add(tag)
+
+        return {commit.id: commit for commit in commits}, tags
+
+    def save(self, refs: str, commits: Iterable[Commit],
+             tags: Iterable[Tag]) -> None:
+        """Replace the cache content. The commits must include the tag 
+        commits and all their ancestors"""
+        commits = list(commits)
+        positions = {commit.id: pos for pos, commit in enumerate(commits)}
+        identities: Dict[str, int] = {}
+        def identity(name: str) -> int:
+            return identities.setdefault(name, len(identities))
+
+        with closing(sqlite3.connect(self.path)) as db, db:
+            db.executescript(_SCHEMA)
+            db.executemany(
+                'INSERT INTO commits VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                ((pos, commit.id, commit.message, identity(commit.committer),
+                  commit.committer_timestamp, commit.committer_offset,
+                  identity(commit.author),
+                  commit.author_timestamp, commit.author_offset)
+                 for pos, commit in enumerate(commits)))
+            db.executemany(
+                'INSERT INTO parents VALUES (?, ?)',
+                ((pos, positions[parent.id])
+                 for pos, commit in enumerate(commits)
+                 for parent in commit.parents))
+            db.executemany(
+                'INSERT INTO tags VALUES (?, ?, ?, ?, ?, ?)',
+                ((tag.name, positions[tag.commit.id], tag.message, tag.author,
+                  tag._timestamp, tag._offset)
+                 for tag in tags))
+            db.executemany(
+                'INSERT INTO identities VALUES (?, ?)',
+                ((pos, name) for name, pos in identities.items()))
+            db.executemany(
+                'INSERT INTO meta VALUES (?, ?)',
+                (('version', self.VERSION), ('refs', refs)))
+
+    def _is_valid(self, db: sqlite3.Connection, refs: str) -> bool:
+        try:
+            meta = dict(db.execute('SELECT key, value FROM meta'))
+        except sqlite3.OperationalError:
+            return False
+        return meta.get('version') == self.VERSION and meta.get('refs') == refs
+
+
+_SCHEMA = """
+DROP TABLE IF EXISTS meta;
+DROP TABLE IF EXISTS identities;
+DROP TABLE IF EXISTS commits;
+DROP TABLE IF EXISTS parents;
+DROP TABLE IF EXISTS tags;
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE identities (pos INTEGER PRIMARY KEY, name TEXT);
+CREATE TABLE commits (
+    pos INTEGER PRIMARY KEY, id TEXT, message TEXT,
+    committer INTEGER, committer_time INTEGER, committer_offset INTEGER,
+    author INTEGER, author_time INTEGER, author_offset INTEGER);
+CREATE TABLE parents (commit_pos INTEGER, parent_pos INTEGER);
+CREATE TABLE tags (
+    name TEXT PRIMARY KEY, commit_pos INTEGER, message TEXT, author TEXT,
+    time INTEGER, offset INTEGER);
+"""
+
+
+class DiffCache:
+    """
+    Store the diff stats between two trees.
+
+    As the entries are keyed by tree ids, they remain valid when commits
+    are rebased or tags are moved. When the cache has more than max_entries,
+    the least recently used entries are evicted.
+
+    The connection is kept open until close() is called, or until the end
+    of a with block.
+    """
+    def __init__(self, path: str, max_entries: int = 100000) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.db = sqlite3.connect(path)
+        self.db.executescript(
+            'PRAGMA journal_mode = WAL;'
+            'PRAGMA synchronous = NORMAL;'
+            'CREATE TABLE IF NOT EXISTS diffs ('
+            '  tree_a TEXT, tree_b TEXT, insertions INTEGER,'
+            '  deletions INTEGER, files_changed INTEGER, files TEXT,'
+            '  accessed INTEGER, PRIMARY KEY (tree_a, tree_b));'
+            'CREATE INDEX IF NOT EXISTS diffs_accessed ON diffs (accessed);')
+        self.size, self.clock = self.db.execute(
+            'SELECT count(*), coalesce(max(accessed), 0) FROM diffs').fetchone()
+
+    def __enter__(self) -> DiffCache:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.db.close()
+
+    def get(self, tree_a: str, tree_b: str, parse_files: bool) -> DiffDelta:
+        """Return the cached diff, or None if it is not cached. Diffs cached 
+        without files do not answer requests that parse files."""
+        row = self.db.execute(
+            'SELECT insertions, deletions, files_changed, files FROM diffs '
+            'WHERE tree_a = ? AND tree_b = ?', (tree_a, tree_b)).fetchone()
+        if not row:
+            return None
+        insertions, deletions, files_changed, files = row
+        if parse_files and files is None:
+            return None
+
+        self.clock += 1
+        with self.db:
+            self.db.execute(
+                'UPDATE diffs SET accessed = ? WHERE tree_a = ? AND tree_b = ?',
+                (self.clock, tree_a, tree_b))
+        if parse_files:
+            files = set(files.split('\n')) if files else set()
+        else:
+            files = set()
+        return DiffDelta(insertions, deletions, files_changed, files)
+
+    def put(self, tree_a: str, tree_b: str, delta: DiffDelta, 
+            parse_files: bool) -> None:
+        files = '\n'.join(sorted(delta.files)) if parse_files else None
+        self.clock += 1
+        with self.db:
+            cursor = self.db.execute(
+                'INSERT OR REPLACE INTO diffs VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (tree_a, tree_b, delta.insertions, delta.deletions, 
+                 delta.files_changed, files, self.clock))
+            self.size += cursor.rowcount
+            if self.size > self.max_entries:
+                # replaced entries are also counted as inserted
+                self.size, = self.db.execute(
+                    'SELECT count(*) FROM diffs').fetchone()
+            if self.size > self.max_entries:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Remove the least recently used tenth of the entries"""
+        evicted = max(self.size - self.max_entries, self.max_entries // 10)
+        cursor = self.db.execute(
+            'DELETE FROM diffs WHERE rowid IN ('
+            '  SELECT rowid FROM diffs ORDER BY accessed LIMIT ?)', 
+            (evicted,))
+        self.size -= cursor.rowcount
+
@@ -1,19 +1,39 @@
-from typing import List, Set, Tuple
+from collections import Counter
+from typing import Callable, List, Set, Tuple
 from releasy.repository import CommitSet
 
 class ContributorSet():
+    """The committers and authors of a set of commits.
+
+    The contributors are counted on the identity ids of the repository, and
+    only the distinct ids are converted to names.
+    """
     def __init__(self, 
             commits: CommitSet = None, 
             previous_authors: Set[str] = None) -> None:
         self._commits = CommitSet()
+        self._authors: List = []
+        self._name: Callable = None
         self.committers = set[str]()
         self.authors = set[str]()
         self.newcomers = set[str]()
   
         if commits:
             self._commits = commits
-            self.committers = set[str](commit.committer for commit in commits)
-            self.authors = set[str](commit.author for commit in commits)
+            author_ids = commits.author_ids
+            if author_ids is None: # commits without repository
+                self._authors = [commit.author for commit in commits]
+                self.committers = set[str](
+                    commit.committer for commit in commits)
+                self.authors = set[str](self._authors)
+            else:
+                identities = commits._repository().identity_table
+                self._authors = author_ids
+                self._name = identities.name
+                self.committers = set[str](
+                    identities.name(id) for id in set(commits.committer_ids))
+                self.authors = set[str](
+                    identities.name(id) for id in set(author_ids))
 
             if previous_authors:
                 self.newcomers = self.authors - previous_authors
@@ -22,20 +42,13 @@ class ContributorSet():
         return len(self.authors)
 
     def frequency(self):
+        total_contributions = len(self._authors)
         contributors_frequency = dict[str,int]()
-        total_contributions = 0
-        for author in (commit.author for commit in self._commits):
+        for author, contributions in Counter(self._authors).items():
+            if self._name:
+                author = self._name(author)
             contributors_frequency[author] \
-                = contributors_frequency.get(author, 0) +1
-            total_contributions += 1
-
-        for contributor, contributions in contributors_frequency.items():
-            contributors_frequency[contributor] \
-                = round(
-                    contributors_frequency[contributor] \
-                    * 100 \
-                    / total_contributions,
-                    2)
+                = round(contributions * 100 / total_contributions, 2)
         
         return contributors_frequency
 
@@ -16,15 +16,18 @@ class BaseReleaseMiner(AbstractMiner):
         self.project = project
 
         self.c2r = Commit2ReleaseMapper()
+        releases = self.project.releases
         for arg in args:
             if isinstance(arg, Commit2ReleaseMapper):
                 self.c2r = arg
-        self._mine_base_releases()
+            elif isinstance(arg, ReleaseSet):
+                releases = arg
+        self._mine_base_releases(releases)
 
         return self.project, []
 
-    def _mine_base_releases(self) -> None:
-        for release in self.project.releases:
+    def _mine_base_releases(self, releases: ReleaseSet) -> None:
+        for release in releases:
             self._mine_release_base_releases(release)
             self._mine_release_main_base_release(release)
 
@@ -39,13 +42,14 @@ class BaseReleaseMiner(AbstractMiner):
         release.base_releases = base_releases
     
     def _mine_release_main_base_release(self, release: Release):
+        release.base_release = None
         if len(release.base_releases) == 1:
             release.base_release = release.base_releases[0]
         elif len(release.base_releases) > 1:
             #TODO handle v2.0.0, v2.0.1, and 2,0
             releases = [release]
             releases.extend(release.base_releases)
-            releases = sorted(releases, key = lambda r: r.version)
+            releases = sorted(releases, key = lambda r: r.version.key)
             pos = releases.index(release)
             if pos > 0:
                 release.base_release = releases[pos-1]
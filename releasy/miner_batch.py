@@ -0,0 +1,244 @@
+"""Batch Miner
+
+This module mines many repositories in parallel. Each repository is mined
+in its own worker process, so a failure or a timeout in one repository does
+not affect the others. The repositories are opened in the workers, from 
+their paths or from picklable RepositoryFactory objects.
+"""
+from __future__ import annotations
+import multiprocessing
+from multiprocessing.connection import Connection, wait
+import os
+import time
+import traceback
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Union
+
+from .miner_base import AbstractMiner
+from .project import Project
+from .repository import Repository
+
+
+class BatchMiner():
+    """Mine several repositories with the same miners, e.g:
+
+    batch = releasy.BatchMiner(workers=8, timeout=600).apply(
+        FinalReleaseMiner(),
+        HistoryCommitMiner(),
+        BaseReleaseMiner(),
+        SemanticReleaseMiner()
+    )
+    for result in batch.mine(['repos/releasy', 'repos/pygit2']):
+        print(result.name, result.summary or result.error)
+    print(batch.report.throughput)
+
+    Projects hold the repository, so they cannot be sent back from the
+    workers. Instead, the workers send the output of summarize(project),
+    which must be picklable. Likewise, repositories hold handles that 
+    cannot be sent to the workers, so they are given as paths or as 
+    RepositoryFactory objects. The workers are started with the 
+    multiprocessing start_method, e.g., 'spawn', or with the default one.
+    """
+    def __init__(self, workers: int = None, timeout: float = None,
+                 summarize: Callable[[Project], Any] = None,
+                 start_method: str = None) -> None:
+        self.workers = workers or os.cpu_count()
+        self.timeout = timeout
+        self.summarize = summarize or summarize_project
+        self.context = multiprocessing.get_context(start_method)
+        self.miners = list[AbstractMiner]()
+        self.report = BatchReport()
+
+    def apply(self, *miners) -> BatchMiner:
+        self.miners.extend(miners)
+        return self
+
+    def mine(self, repositories: Iterable[Union[str, RepositoryFactory]]
+             ) -> Iterator[BatchResult]:
+        """Mine the repositories, given by their paths or factories, 
+        yielding the results as they complete"""
+        self.report = BatchReport()
+        repositories = iter(repositories)
+        running: Dict[Connection, BatchWorker] = {}
+        try:
+            while True:
+                while len(running) < self.workers:
+                    repository = next(repositories, None)
+                    if repository is None:
+                        break
+                    if not isinstance(repository, (str, RepositoryFactory)):
+                        raise TypeError(
+                            "repositories must be paths or RepositoryFactory "
+                            f"objects, not {type(repository).__name__}")
+                    worker = BatchWorker(repository, self.miners, 
+                                         self.summarize, self.context)
+                    running[worker.connection] = worker
+
+                if not running:
+                    break
+
+                timeout = None
+                if self.timeout:
+                    timeout = max(0, min(worker.started for worker
+                                         in running.values())
+                                     + self.timeout - time.perf_counter())
+                for connection in wait(list(running), timeout):
+                    result = running.pop(connection).result()
+                    self.report.add(result)
+                    yield result
+
+                if self.timeout:
+                    for connection, worker in list(running.items()):
+                        elapsed = time.perf_counter() - worker.started
+                        if elapsed >= self.timeout:
+                            del running[connection]
+                            result = worker.kill()
+                            self.report.add(result)
+                            yield result
+        finally:
+            # stop the workers left running by an error or an early exit
+            for worker in running.values():
+                worker.kill()
+
+
+class RepositoryFactory():
+    """Create a repository in a worker process, e.g:
+
+    RepositoryFactory('releasy', open_dump, 'dumps/releasy.dump')
+
+    The factory is sent to the worker, so create must be a module level 
+    function and its args must be picklable.
+    """
+    def __init__(self, name: str, create: Callable[..., Repository], 
+                 *args) -> None:
+        self.name = name
+        self.create = create
+        self.args = args
+
+    def __call__(self) -> Repository:
+        return self.create(*self.args)
+
+    def __repr__(self) -> str:
+        return self.name
+
+
+class BatchWorker():
+    """A process that mines a single repository"""
+    def __init__(self, repository: Union[str, RepositoryFactory], 
+                 miners: List[AbstractMiner],
+                 summarize: Callable[[Project], Any],
+                 context = multiprocessing) -> None:
+        self.name = repository if isinstance(repository, str) \
+                    else repository.name
+        self.connection, child_connection = context.Pipe(False)
+        self.process = context.Process(
+            target=_mine_repository,
+            args=(child_connection, repository, miners, summarize))
+        self.started = time.perf_counter()
+        self.process.start()
+        child_connection.close()
+
+    def result(self) -> BatchResult:
+        try:
+            summary, error = self.connection.recv()
+        except EOFError:
+            summary = None
+            self.process.join()
+            error = f"worker exited with code {self.process.exitcode}"
+        self.connection.close()
+        self.process.join()
+        return BatchResult(self.name, summary, error,
+                           time.perf_counter() - self.started)
+
+    def kill(self) -> BatchResult:
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+        return BatchResult(self.name, None, "timeout",
+                           time.perf_counter() - self.started, True)
+
+
+def _mine_repository(connection: Connection, 
+                     repository: Union[str, RepositoryFactory],
+                     miners: List[AbstractMiner],
+                     summarize: Callable[[Project], Any]) -> None:
+    from . import Miner
+    try:
+        if isinstance(repository, RepositoryFactory):
+            repository = repository()
+        project = Miner(repository).apply(*miners).mine()
+        connection.send((summarize(project), None))
+    except Exception:
+        connection.send((None, traceback.format_exc()))
+    finally:
+        connection.close()
+
+
+class BatchResult():
+    """The result of mining a single repository"""
+    def __init__(self, name: str, summary: Any, error: str, elapsed: float,
+                 timed_out: bool = False) -> None:
+        self.name = name
+        self.summary = summary
+        self.error = error
+        self.elapsed = elapsed
+        self.timed_out = timed_out
+
+    def __repr__(self) -> str:
+        return self.name
+
+
+class BatchReport():
+    """Aggregate the results of a batch"""
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.finished = self.started
+        self.succeeded = 0
+        self.failed = 0
+        self.timed_out = 0
+
+    def add(self, result: BatchResult) -> None:
+        self.finished = time.perf_counter()
+        if result.timed_out:
+            self.timed_out += 1
+        elif result.error:
+            self.failed += 1
+        else:
+            self.succeeded += 1
+
+    @property
+    def repositories(self) -> int:
+        return self.succeeded + self.failed + self.timed_out
+
+    @property
+    def elapsed(self) -> float:
+        return self.finished - self.started
+
+    @property
+    def throughput(self) -> float:
+        """Mined repositories per second"""
+        if not self.elapsed:
+            return 0.0
+        return self.repositories / self.elapsed
+
+
+def summarize_project(project: Project) -> Dict[str, Any]:
+    """Summarize the mined releases in picklable data"""
+    def names(releases):
+        return sorted(releases.names) if releases is not None else None
+
+    return {
+        'name': project.name,
+        'releases': {
+            release.name: {
+                'head': release.head.id,
+                'time': release.time,
+                'commits': len(release.commits),
+                'base_release': release.base_release.name
+                                if release.base_release else None,
+                'base_releases': names(release.base_releases)
+            }
+            for release in project.releases or []
+        },
+        'main_releases': names(project.main_releases),
+        'patches': names(project.patches)
+    }
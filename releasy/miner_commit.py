@@ -7,17 +7,31 @@ For each release, it assigns:
 - its tail commits: the first commits of each release branch
 """
 
-from typing import Any, List, Tuple
-from releasy.release import Commit2ReleaseMapper, Release
+from typing import Any, Dict, List, Set, Tuple
+from releasy.release import (
+    Commit2ReleaseMapper, Release, ReleaseSet, sort_releases)
 
-from releasy.repository import Commit, CommitSet
+from releasy.repository import Commit, CommitSet, _bit_positions
 from .miner_base import AbstractMiner
 from .project import Project
 
 
 class MixedHistoryCommitMiner(AbstractMiner):
-    def __init__(self) -> None:
+    """Assign to each release all commits it reaches before other releases.
+
+    The releases of parallel branches share the commits of their common 
+    history. The engine selects how the history is traversed:
+    - dfs: one depth-first search from each release head;
+    - shared: a single traversal, which reuses the commits reached from 
+      the common history across releases.
+    """
+    ENGINES = ('dfs', 'shared')
+
+    def __init__(self, engine: str = 'dfs') -> None:
         super().__init__()
+        if engine not in MixedHistoryCommitMiner.ENGINES:
+            raise ValueError(f"unknown engine: {engine}")
+        self.engine = engine
         self.c2r = dict[Commit, Release]()
 
     def mine(self, project: Project, *args) -> Tuple[Project, Any]:
@@ -29,16 +43,21 @@ class MixedHistoryCommitMiner(AbstractMiner):
         release_commits = set(map(lambda release: release.tag.commit, 
                               self.project.releases))
 
+        for release in self.project.releases:
+            if release.head not in self.c2r:
+                self.c2r[release.head] = set()
+            self.c2r[release.head].add(release)
+
+        if self.engine == 'shared':
+            self._share_commits(release_commits)
+            return
+
         for release in self.project.releases:
             commits = CommitSet()
             tails = CommitSet()
             loop_detector = set()
             commits_to_track: List[Commit] = [release.head]
 
-            if release.head not in self.c2r:
-                self.c2r[release.head] = set()
-            self.c2r[release.head].add(release)
-
             while commits_to_track:
                 commit = commits_to_track.pop()
                 commits.add(commit)
@@ -57,30 +76,188 @@ class MixedHistoryCommitMiner(AbstractMiner):
             release.tails = tails
             release.commits = commits
 
+    def _share_commits(self, release_commits: Set[Commit]) -> None:
+        """Mine the releases in a single traversal of the history.
+
+        The history is cut at the release commits. The commits reached by
+        more than one commit are memo points, and their regions, i.e., the
+        commits they reach, are kept as bitmaps until all the segments that
+        reach them used them. The commits between memo points are numbered 
+        contiguously, so that each memo region is built with a few bitwise 
+        operations.
+        """
+        # discover the history from the heads, up to the release commits
+        ids: Dict[int, int] = {}
+        commits = list[Commit]()
+        for release in self.project.releases:
+            if release.head.index not in ids:
+                ids[release.head.index] = len(commits)
+                commits.append(release.head)
+        heads = len(commits)
+        parents: List[List[int]] = []
+        children = [0] * heads
+        is_tail = list[bool]()
+        for commit in commits:
+            commit_parents = []
+            parents.append(commit_parents)
+            is_tail.append(not commit.parents)
+            for parent in commit.parents:
+                if parent in release_commits:
+                    is_tail[-1] = True
+                    continue
+                id = ids.get(parent.index)
+                if id is None:
+                    id = ids[parent.index] = len(commits)
+                    commits.append(parent)
+                    children.append(0)
+                children[id] += 1
+                commit_parents.append(id)
+
+        # number the segments of commits between memo points
+        positions = [0] * len(commits)
+        segments: Dict[int, Tuple[int, int, List[int]]] = {}
+        users = [0] * len(commits)
+        position = 0
+        for memo in range(len(commits)):
+            if memo >= heads and children[memo] < 2:
+                continue
+            start = position
+            memo_parents = []
+            commits_to_track = [memo]
+            while commits_to_track:
+                id = commits_to_track.pop()
+                positions[id] = position
+                position += 1
+                for parent in parents[id]:
+                    if children[parent] > 1:
+                        memo_parents.append(parent)
+                    else:
+                        commits_to_track.append(parent)
+            # a memo can be reached from more than one commit of a segment
+            memo_parents = list(dict.fromkeys(memo_parents))
+            segments[memo] = (start, position, memo_parents)
+            for parent in memo_parents:
+                users[parent] += 1
+
+        commits_by_position = list[Commit](commits)
+        tail_bitmap = bytearray(len(commits) // 8 + 1)
+        for id, commit in enumerate(commits):
+            commits_by_position[positions[id]] = commit
+            if is_tail[id]:
+                tail_bitmap[positions[id] >> 3] |= 1 << (positions[id] & 7)
+        tail_mask = int.from_bytes(tail_bitmap, 'little')
+
+        regions: Dict[int, int] = {}
+        for head in range(heads):
+            memos_to_track = [head]
+            while memos_to_track:
+                memo = memos_to_track[-1]
+                if memo in regions:
+                    memos_to_track.pop()
+                    continue
+                start, end, memo_parents = segments[memo]
+                missing = [parent for parent in memo_parents 
+                           if parent not in regions]
+                if missing:
+                    memos_to_track.extend(missing)
+                    continue
+                memos_to_track.pop()
+                region = ((1 << (end - start)) - 1) << start
+                for parent in memo_parents:
+                    region |= regions[parent]
+                    users[parent] -= 1
+                    if not users[parent]:
+                        del regions[parent]
+                regions[memo] = region
+
+            region = regions.pop(head)
+            for release in self.c2r[commits[head]]:
+                release.commits = CommitSet(
+                    commits_by_position[position] 
+                    for position in _bit_positions(region))
+                release.tails = CommitSet(
+                    commits_by_position[position] 
+                    for position in _bit_positions(region & tail_mask))
+
 
 class HistoryCommitMiner(AbstractMiner):
-    
-    def __init__(self) -> None:
+    """Assign each commit to the first release that reaches it.
+
+    If the project was already mined and the new releases come after the
+    previous ones, only the new releases are mined, resuming from the 
+    previous commit assignment. Otherwise, all releases are mined again,
+    dropping what was mined for the previous ones.
+
+    The engine selects how the history is traversed:
+    - dfs: one depth-first search from each release head;
+    - topological: a single sweep over the commit graph, from children to
+      parents, that assigns the commits on dense integer positions.
+    Both engines find the same commits and tails.
+    """
+    ENGINES = ('dfs', 'topological')
+
+    def __init__(self, engine: str = 'dfs') -> None:
         super().__init__()
+        if engine not in HistoryCommitMiner.ENGINES:
+            raise ValueError(f"unknown engine: {engine}")
+        self.engine = engine
         self.c2r = Commit2ReleaseMapper()
 
     def mine(self, project: Project, *args) -> Tuple[Project, Any]:
         self.project = project
-        self._assign_heads()
-        self._mine_releases()
-        return (self.project, [self.c2r]) 
-
-    def _assign_heads(self):
-        for release in sorted(
-                self.project.releases, 
-                key=lambda r: (r.time, r.version)):
-            if not self.c2r.get_release(release.head):
+        releases = self.project.releases
+        for arg in args:
+            if isinstance(arg, ReleaseSet):
+                releases = arg
+
+        if self._can_resume(releases):
+            self.c2r = self.project.c2r
+        else:
+            releases = self.project.releases
+            self._reset_releases(releases)
+        self._assign_heads(releases)
+        self._mine_releases(releases)
+        self.project.c2r = self.c2r
+        return (self.project, [self.c2r, releases]) 
+
+    def _can_resume(self, new_releases: ReleaseSet) -> bool:
+        """Check if mining only the new releases gives the same result as
+        mining all of them"""
+        if not self.project.c2r:
+            return False
+        previous_releases = [release for release in self.project.releases
+                             if release not in new_releases]
+        if not previous_releases:
+            return False
+        last_release = max(previous_releases, 
+                           key=lambda r: (r.timestamp, r.version.key))
+        for release in new_releases:
+            if self.project.c2r.is_assigned(release.head):
+                return False
+            if not (last_release.timestamp, last_release.version.key) \
+                    < (release.timestamp, release.version.key):
+                return False
+        return True
+
+    def _reset_releases(self, releases: ReleaseSet) -> None:
+        """Clear the commits and base releases of the reused releases"""
+        for release in releases:
+            release.commits = CommitSet()
+            release.tails = set[Commit]()
+            release.base_release = None
+            release.base_releases = ReleaseSet()
+
+    def _assign_heads(self, releases: ReleaseSet):
+        for release in sort_releases(releases):
+            if not self.c2r.is_assigned(release.head):
                 self.c2r.assign_commit(release.head, release)
 
-    def _mine_releases(self) -> None:
-        for release in sorted(
-                self.project.releases, 
-                key=lambda r: (r.time, r.version)):
+    def _mine_releases(self, releases: ReleaseSet) -> None:
+        if self.engine == 'topological':
+            self._sweep_releases(releases)
+            return
+
+        for release in sort_releases(releases):
             commits, tails = self._mine_commits(release)
             release.commits = commits
             release.tails = tails
@@ -105,10 +282,97 @@ class HistoryCommitMiner(AbstractMiner):
                 tails.add(commit)
 
             for parent in commit.parents:
-                if not self.c2r.get_release(parent):
+                if not self.c2r.is_assigned(parent):
                     commits_to_track.append(parent)
                 else:
                     tails.add(commit)
                     
         return commits, tails
-    
+
+    def _sweep_releases(self, releases: ReleaseSet) -> None:
+        """Assign the commits of all releases in a single topological sweep.
+
+        Each commit is labeled with the position of the first release that
+        reaches it without crossing another release head. The labels flow
+        from children to parents, and a commit is only swept after all its
+        children. The sweep works on dense integer positions: commits[pos]
+        is the commit, parents[pos] the positions of its parents.
+        """
+        releases = sort_releases(releases)
+        positions: Dict[int, int] = {}
+        commits: List[Commit] = []
+        labels: List[int] = []
+        for label, release in enumerate(releases):
+            head = release.head
+            if head.index not in positions \
+                    and release in self.c2r.get_release(head):
+                positions[head.index] = len(commits)
+                commits.append(head)
+                labels.append(label)
+        heads = len(commits)
+
+        # commits assigned by a previous mining are not tracked, so their 
+        # children are tails, as well as the root commits
+        is_tail = [False] * heads
+        parents: List[List[int]] = []
+        pending = [0] * heads
+        unlabeled = len(releases)
+        for commit in commits:
+            parent_positions = []
+            parents.append(parent_positions)
+            commit_parents = commit.parents
+            if not commit_parents:
+                is_tail[len(parents) - 1] = True
+            for parent in commit_parents:
+                position = positions.get(parent.index)
+                if position is None:
+                    if self.c2r.is_assigned(parent):
+                        is_tail[len(parents) - 1] = True
+                        continue
+                    position = positions[parent.index] = len(commits)
+                    commits.append(parent)
+                    labels.append(unlabeled)
+                    pending.append(0)
+                    is_tail.append(False)
+                pending[position] += 1
+                parent_positions.append(position)
+
+        # the label of a commit is final once all its children were swept
+        release_commits = [CommitSet() for _ in releases]
+        commits_to_sweep = [pos for pos in range(heads) if not pending[pos]]
+        while commits_to_sweep:
+            pos = commits_to_sweep.pop()
+            label = labels[pos]
+            self.c2r.assign_commit(commits[pos], releases[label])
+            release_commits[label].add(commits[pos])
+            for parent in parents[pos]:
+                if parent >= heads and labels[parent] > label:
+                    labels[parent] = label
+                pending[parent] -= 1
+                if not pending[parent]:
+                    commits_to_sweep.append(parent)
+
+        # the depth-first search also marks a commit as a tail when a parent
+        # of the same release was visited before it, so the tails follow its
+        # visiting order, skipping the parents labeled by other releases
+        release_tails = [CommitSet() for _ in releases]
+        visited = [False] * len(commits)
+        for head in range(heads):
+            label = labels[head]
+            tails = release_tails[label]
+            positions_to_track = [head]
+            while positions_to_track:
+                pos = positions_to_track.pop()
+                visited[pos] = True
+                if is_tail[pos]:
+                    tails.add(commits[pos])
+                for parent in parents[pos]:
+                    if labels[parent] != label or visited[parent]:
+                        tails.add(commits[pos])
+                    else:
+                        positions_to_track.append(parent)
+
+        for release, commits, tails in zip(
+                releases, release_commits, release_tails):
+            release.commits = commits
+            release.tails = tails
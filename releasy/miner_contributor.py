@@ -3,6 +3,7 @@ from typing import Any, Tuple
 from releasy.miner_base import AbstractMiner
 from releasy.project import Project
 from releasy.contributor import ContributorSet
+from releasy.release import sort_releases
 
 
 class ContributorMiner(AbstractMiner):
@@ -11,8 +12,7 @@ class ContributorMiner(AbstractMiner):
 
     def mine(self, project: Project, *args) -> Tuple[Project, Any]:
         previous_authors = set[str]()
-        for release in sorted(
-                project.releases, key = lambda r: (r.time, r.version)):
+        for release in sort_releases(project.releases):
 
             release.contributors = ContributorSet(
                 release.commits, 
@@ -0,0 +1,38 @@
+"""Reachability Miner
+
+This module indexes the commits reachable from each release, so that the
+ancestry queries do not need to walk the commit graph.
+"""
+from __future__ import annotations
+from typing import Any, Tuple
+
+from .miner_base import AbstractMiner
+from .project import Project
+from .reachability import ReachabilityIndex
+
+
+class ReachabilityMiner(AbstractMiner):
+    """Build the reachability index of the project releases, e.g:
+
+    project = releasy.Miner(GitRepository('repos/releasy')).apply(
+        FinalReleaseMiner(),
+        ReachabilityMiner('repos/releasy.reachability')
+    ).mine()
+    project.reachability.ids_between(
+        project.releases['v3.1.0'], project.releases['v2.1'])
+
+    When a path is given, the index is saved to that file and reused by the 
+    next runs, rebuilding only the releases whose tags moved.
+    """
+    def __init__(self, path: str = None) -> None:
+        super().__init__()
+        self.path = path
+
+    def mine(self, project: Project, *args) -> Tuple[Project, Any]:
+        self.project = project
+        index = project.reachability
+        if index is None or index.path != self.path:
+            index = ReachabilityIndex(project.repository, self.path)
+        index.update(project.releases)
+        project.reachability = index
+        return (project, [index])
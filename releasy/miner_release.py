@@ -1,41 +1,62 @@
-from ensurepip import version
 from typing import Any, Set, Tuple
-import re
 
 from .project import Project
-from .release import Release, ReleaseSet
+from .release import RELEASE_PATTERN, Release, ReleaseSet
 from .miner_base import AbstractMiner
 from .repository import Repository
 
 class ReleaseMiner(AbstractMiner):
     """ 
     Mine all releases 
+
+    If the project was already mined, it keeps the releases whose tags did
+    not change and passes the new releases to the next miner. When a 
+    release tag is removed or moved, all releases are mined again.
     """
     def __init__(self) -> None:
         super().__init__()
-        self.release_regexp = re.compile(
-            r'(?P<prefix>(?:[^\s,]*?)(?=(?:[0-9]+[\._]))|[^\s,]*?)(?P<version>(?:[0-9]+[\._])*[0-9]+)(?P<suffix>[^\s,]*)'
-        )
+        self.release_regexp = RELEASE_PATTERN
 
     def mine(self, project: Project, *args) -> Tuple[Project, Any]:
-        tags = project.repository.get_tags()
+        tags = project.repository.get_tags(self.release_regexp.match)
 
         releases: Set[Release] = set()
         for tag in tags:
-            if self.release_regexp.match(tag.name):
-                release = Release(project, tag.name, tag)
-                releases.add(release)
+            release = Release(project, tag.name, tag)
+            releases.add(release)
 
+        new_releases = self._reuse_releases(project, releases)
         project.releases = ReleaseSet(releases)
-        return (project, [])
+        return (project, [new_releases])
+
+    def _reuse_releases(self, project: Project, 
+                        releases: Set[Release]) -> ReleaseSet:
+        """Replace the releases that were already mined by the previous ones
+        and return the new releases"""
+        previous_releases = project.releases or ReleaseSet()
+        new_releases = ReleaseSet(
+            release for release in releases
+            if release.name not in previous_releases
+                or previous_releases[release.name].head != release.head)
+
+        if len(releases) - len(new_releases) != len(previous_releases):
+            project.c2r = None
+            return ReleaseSet(releases)
+
+        for release in previous_releases:
+            releases.remove(release)
+            releases.add(release)
+        return new_releases
 
 class FinalReleaseMiner(ReleaseMiner):
     """ 
     Mine only final releases, ignoring pre releases 
     """
     def mine(self, project: Project, *args) -> Tuple[Project, Any]:
-        super().mine(project, args)
+        project, (new_releases,) = super().mine(project, args)
         releases = ReleaseSet(release for release in project.releases 
                               if not release.version.is_pre_release())
+        new_releases = ReleaseSet(release for release in new_releases
+                                  if release in releases)
         project.releases = releases
-        return (project, [])
\ No newline at end of file
+        return (project, [new_releases])
\ No newline at end of file
@@ -8,10 +8,10 @@ This module categorizes the releases according to their semantic:
 This module also categorize releases into pre releases.
 """
 
-from typing import Any, Tuple
+from typing import Any, Dict, Tuple
 from unicodedata import name
 from .project import Project
-from .release import Release
+from .release import Release, sort_releases
 from .semantic import MainRelease, Patch, SReleaseSet, SemanticRelease
 from .miner_base import AbstractMiner
 
@@ -48,8 +48,7 @@ class SemanticReleaseMiner(AbstractMiner):
 
     def _mine_semantic_releases(self) -> SReleaseSet:
         #TODO implement in ReleaseSet
-        for release in sorted(self.project.releases.all(), 
-                              key = lambda r: (r.time, r.version)):
+        for release in sort_releases(self.project.releases.all()):
             duplicated_release \
                 = True if release.version.number in self.versions else False
             if release.version.is_main_release() and not duplicated_release:
@@ -63,30 +62,46 @@ class SemanticReleaseMiner(AbstractMiner):
                     srelease.was_main_release = True
 
             self.r2s[release] = srelease
-            self.sreleases = SReleaseSet(self.mreleases | self.patches)
+            self.sreleases.add(srelease)
     
     def _assign_patches_to_mreleases(self):
+        main_releases = dict[Patch, MainRelease]()
         for patch in self.patches:
-            main_release = self._track_patch_main_release(patch)
+            main_release = self._track_patch_main_release(patch, main_releases)
             if main_release:
                 main_release.patches.add(patch)
                 patch.main_release = main_release
             elif patch.commits:
                 patch.is_orphan = True
 
-    def _track_patch_main_release(self, patch: Patch):
-        patch_to_track = [patch]
-        loop_control = set()
-        while patch_to_track:
-            patch = patch_to_track.pop()
-            if patch.release.base_release:
-                sbase_release = self.r2s[patch.release.base_release]
-                if isinstance(sbase_release, MainRelease):
-                    return sbase_release
-                elif sbase_release not in loop_control:
-                    loop_control.add(patch)
-                    patch_to_track.append(sbase_release)
-        return None
+    def _track_patch_main_release(
+            self, patch: Patch, 
+            main_releases: Dict[Patch, MainRelease]) -> MainRelease:
+        """Follow the base releases of the patch up to a main release.
+
+        The main release is memoized for all the patches in the path, as in
+        the path compression of union-find, so each patch is followed once.
+        The patches in a loop of base releases have no main release.
+        """
+        path = list[Patch]()
+        in_path = set[Patch]()
+        main_release = None
+        while patch not in main_releases and patch not in in_path:
+            path.append(patch)
+            in_path.add(patch)
+            if not patch.release.base_release:
+                break
+            sbase_release = self.r2s[patch.release.base_release]
+            if isinstance(sbase_release, MainRelease):
+                main_release = sbase_release
+                break
+            patch = sbase_release
+        else:
+            main_release = main_releases.get(patch)
+
+        for patch in path:
+            main_releases[patch] = main_release
+        return main_release
 
     def _assign_base_releases(self):
         for srelease in self.sreleases:
@@ -112,25 +127,28 @@ class SemanticReleaseMiner(AbstractMiner):
         elif len(main_base_releases) > 1:
             releases = [release]
             releases.extend(main_base_releases)
-            releases = sorted(releases, key = lambda r: r.release.version)
+            releases = sorted(releases, key = lambda r: r.release.version.key)
             pos = releases.index(release)
             if pos > 0:
                 release.main_base_release = releases[pos-1]
             else:
                 release.main_base_release = releases[1]
 
-    def _assign_prev_main_releases(self):        
-        mreleases = sorted(self.mreleases, 
-            key=lambda r: (r.release.version, r.time))
-        for i in range(1, len(mreleases)):
-            mrelease = mreleases[i]
-            prev_mrelease_pos = i-1
-
-            while prev_mrelease_pos >= 0 \
-                    and mreleases[prev_mrelease_pos].time > mrelease.time:
-                prev_mrelease_pos -= 1
-            
-            if prev_mrelease_pos >= 0:
-                prev_mrelease = mreleases[prev_mrelease_pos]
-                mrelease.prev_main_release = prev_mrelease
+    def _assign_prev_main_releases(self):
+        """Assign to each main release the closest previous main release, in 
+        version order, that is not newer than it.
 
+        The candidates are kept in a stack with increasing times. The ones 
+        newer than a main release are popped, as that main release is a 
+        closer candidate for all the next ones.
+        """
+        mreleases = sorted(self.mreleases, 
+            key=lambda r: (r.release.version.key, r.release.timestamp))
+        candidates = list[MainRelease]()
+        for mrelease in mreleases:
+            while candidates and candidates[-1].release.timestamp \
+                    > mrelease.release.timestamp:
+                candidates.pop()
+            if candidates:
+                mrelease.prev_main_release = candidates[-1]
+            candidates.append(mrelease)
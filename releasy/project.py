@@ -5,7 +5,8 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from .repository import Repository
     from .semantic import SReleaseSet, MainRelease, Patch
-    from .release import ReleaseSet
+    from .release import Commit2ReleaseMapper, ReleaseSet
+    from .reachability import ReachabilityIndex
 
 class Project:
     def __init__(self, name: str, repository: Repository) -> None:
@@ -13,4 +14,6 @@ class Project:
         self.main_releases: SReleaseSet[MainRelease] = None
         self.patches: SReleaseSet[Patch] = None
         self.releases: ReleaseSet = None
+        self.c2r: Commit2ReleaseMapper = None
+        self.reachability: ReachabilityIndex = None
         self.name = name
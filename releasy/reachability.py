@@ -0,0 +1,182 @@
+"""Reachability Index
+
+This module stores, for each release head, a bitmap of the commits that are
+reachable from it, similar to the Git pack bitmaps. The bitmaps answer
+ancestry, commits-between and release-containment queries without walking
+the commit graph.
+"""
+from __future__ import annotations
+from contextlib import closing
+import heapq
+import sqlite3
+from typing import Dict, Iterable, List, Set
+import zlib
+
+from .release import Release, ReleaseSet, sort_releases
+from .repository import (
+    Bitmap, Commit, CommitSet, Repository)
+
+
+class ReachabilityIndex:
+    """
+    Map each release to the bitmap of the commits reachable from its head.
+
+    The commits are numbered with positions that are stable for the index,
+    so that the bitmaps remain valid when new commits are added. As the
+    ancestry of a commit never changes, only the releases whose tags moved
+    are invalidated. The bitmaps are kept compressed in memory, so that 
+    their size depends on the commits they hold rather than on the size of
+    the whole index.
+
+    When a path is given, the index is loaded from and saved to that file.
+    """
+    VERSION = '1'
+
+    def __init__(self, repository: Repository, path: str = None) -> None:
+        self.repository = repository
+        self.path = path
+        self.ids: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.heads: Dict[str, str] = {}
+        self.bitmaps: Dict[str, Bitmap] = {}
+        if path:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self.heads)
+
+    def update(self, releases: Iterable[Release]) -> None:
+        """Index the releases, rebuilding the ones whose tags moved and
+        dropping the ones that no longer exist"""
+        releases = list(releases)
+        heads = {release.name: release.head.id for release in releases}
+        changed = heads != self.heads
+        self.heads = heads
+        for head_id in set(self.bitmaps) - set(heads.values()):
+            del self.bitmaps[head_id]
+
+        for release in sort_releases(releases):
+            if release.head.id not in self.bitmaps:
+                self.bitmaps[release.head.id] = self._build(release.head)
+                changed = True
+        if changed and self.path:
+            self._save()
+
+    def _build(self, head: Commit) -> Bitmap:
+        """Build the bitmap of a head, reusing the bitmaps of the indexed
+        heads it reaches.
+
+        The commits are visited from the newest to the oldest, so that the 
+        indexed heads are usually reached before their ancestors.
+        """
+        reached = list[Bitmap]()
+        positions = list[int]()
+        visited = set[str]([head.id])
+        commits_to_track = [(_time(head), 0, head)]
+        order = 1
+        while commits_to_track:
+            _, _, commit = heapq.heappop(commits_to_track)
+            if commit.id in self.bitmaps:
+                reached.append(self.bitmaps[commit.id])
+                continue
+            position = self.positions.get(commit.id)
+            if position is None:
+                position = self.positions[commit.id] = len(self.ids)
+                self.ids.append(commit.id)
+            elif any(position in bitmap for bitmap in reached):
+                continue
+            positions.append(position)
+            for parent in commit.parents:
+                if parent.id not in visited:
+                    visited.add(parent.id)
+                    heapq.heappush(commits_to_track, 
+                                   (_time(parent), order, parent))
+                    order += 1
+        return Bitmap.union(Bitmap(positions), *reached)
+
+    def bitmap(self, release: Release) -> Bitmap:
+        return self.bitmaps[self.heads[release.name]]
+
+    def reaches(self, release: Release, commit: Commit) -> bool:
+        """Check if the commit is reachable from the release"""
+        position = self.positions.get(commit.id)
+        if position is None:
+            return False
+        return position in self.bitmap(release)
+
+    def is_ancestor(self, release: Release, other: Release) -> bool:
+        """Check if the release head is reachable from the other release"""
+        return self.reaches(other, release.head)
+
+    def count_between(self, release: Release, base: Release) -> int:
+        """Count the commits reachable from release but not from base"""
+        return len(self.bitmap(release) - self.bitmap(base))
+
+    def ids_between(self, release: Release, base: Release) -> Set[str]:
+        """Return the ids of the commits reachable from release but not from
+        base"""
+        return set(self.ids[position] 
+                   for position in self.bitmap(release) - self.bitmap(base))
+
+    def commits_between(self, release: Release, base: Release) -> CommitSet:
+        """Return the commits reachable from release but not from base"""
+        return CommitSet(self.repository.get_commit(id)
+                         for id in self.ids_between(release, base))
+
+    def releases_containing(self, commit: Commit,
+                            releases: ReleaseSet) -> ReleaseSet:
+        """Return the releases that reach the commit"""
+        return ReleaseSet(release for release in releases
+                          if release.name in self.heads
+                          and self.reaches(release, commit))
+
+    def _load(self) -> None:
+        with closing(sqlite3.connect(self.path)) as db:
+            try:
+                meta = dict(db.execute('SELECT key, value FROM meta'))
+            except sqlite3.OperationalError:
+                return
+            if meta.get('version') != self.VERSION:
+                return
+            self.ids = [id for id, in db.execute(
+                'SELECT id FROM positions ORDER BY pos')]
+            self.positions = {id: pos for pos, id in enumerate(self.ids)}
+            self.heads = dict(db.execute('SELECT name, head FROM releases'))
+            self.bitmaps = {
+                head: Bitmap.from_bytes(zlib.decompress(bitmap))
+                for head, bitmap in db.execute(
+                    'SELECT head, bitmap FROM bitmaps')}
+
+    def _save(self) -> None:
+        with closing(sqlite3.connect(self.path)) as db, db:
+            db.executescript(_SCHEMA)
+            db.executemany(
+                'INSERT INTO positions VALUES (?, ?)', enumerate(self.ids))
+            db.executemany(
+                'INSERT INTO releases VALUES (?, ?)', self.heads.items())
+            db.executemany(
+                'INSERT INTO bitmaps VALUES (?, ?)',
+                ((head, zlib.compress(bitmap.to_bytes()))
+                 for head, bitmap in self.bitmaps.items()))
+            db.execute(
+                'INSERT INTO meta VALUES (?, ?)', ('version', self.VERSION))
+
+
+def _time(commit: Commit) -> float:
+    """The heap key to visit the newest commits first"""
+    if commit.committer_timestamp is not None:
+        return -commit.committer_timestamp
+    return 0.0
+
+
+_SCHEMA = """
+DROP TABLE IF EXISTS meta;
+DROP TABLE IF EXISTS positions;
+DROP TABLE IF EXISTS releases;
+DROP TABLE IF EXISTS bitmaps;
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE positions (pos INTEGER PRIMARY KEY, id TEXT);
+CREATE TABLE releases (name TEXT PRIMARY KEY, head TEXT);
+CREATE TABLE bitmaps (head TEXT PRIMARY KEY, bitmap BLOB);
+"""
+
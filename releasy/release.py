@@ -1,7 +1,9 @@
 from __future__ import annotations
-from ast import List
+from array import array
 from collections import OrderedDict
-from typing import Callable, Dict, Generic, Iterator, Set, TypeVar
+from functools import lru_cache
+from typing import (
+    Callable, Dict, Generic, Iterable, Iterator, List, Set, Tuple, TypeVar)
 from typing import TYPE_CHECKING
 
 from releasy.contributor import ContributorSet
@@ -14,6 +16,7 @@ from datetime import datetime, timedelta
 from .repository import (
     Commit,
     CommitSet, 
+    CommitTable,
     Repository, 
     Tag)
 
@@ -59,6 +62,10 @@ class Release:
     def time(self) -> datetime:
         return self.tag.time
 
+    @property
+    def timestamp(self) -> float:
+        return self.tag.timestamp
+
     @property
     def merges(self):
         return CommitSet(
@@ -76,66 +83,45 @@ TYPE_MINOR   = 0b01000
 TYPE_MAIN    = 0b00100
 TYPE_PRE     = 0b00010
 TYPE_PATCH   = 0b00001
+
+RELEASE_PATTERN = re.compile(
+    r'(?P<prefix>(?:[^\s,]*?)(?=(?:[0-9]+[\._]))|[^\s,]*?)(?P<version>(?:[0-9]+[\._])*[0-9]+)(?P<suffix>[^\s,]*)'
+)
+VERSION_NUMBER_PATTERN = re.compile(r'([0-9]+)')
+
+
 class ReleaseVersion():
     def __init__(self, name: str, separator: re.Pattern = None,
                  version_separator: re.Pattern = None) -> None:
         self.full_name = name
-        self.prefix = ''
-        self.suffix = ''
-        
-        if not separator:
-            separator = re.compile(
-                r'(?P<prefix>(?:[^\s,]*?)(?=(?:[0-9]+[\._]))|[^\s,]*?)(?P<version>(?:[0-9]+[\._])*[0-9]+)(?P<suffix>[^\s,]*)'
-            )
-        parts = separator.match(name)
-        if parts:
-            if parts.group('prefix'):
-                self.prefix = parts.group('prefix')
-            if parts.group('suffix'):
-                self.suffix = parts.group('suffix')
-            if parts.group('version'):
-                self.number = parts.group('version')
-
-        if not version_separator:
-            version_separator = re.compile(r'([0-9]+)')
-        version_parts = version_separator.findall(self.number)
-        self.numbers = [int(version_part) for version_part in version_parts]
-        if len(self.numbers) == 1:
-            self.numbers.append(0)
-        if len(self.numbers) == 2:
-            self.numbers.append(0)
-        #TODO handle dinamic
-        self.number = '.'.join([str(v) for v in self.numbers])
+        if separator or version_separator:
+            parsed = _parse_version(name, separator or RELEASE_PATTERN,
+                                    version_separator or VERSION_NUMBER_PATTERN)
+        else:
+            parsed = _parse_default_version(name)
+        self.prefix, self.suffix, numbers, self.number, self.type_bits, \
+            self._key = parsed
+        self.numbers = list(numbers)
+
+    @property
+    def key(self) -> Tuple:
+        """A totally ordered sort key: the version numbers without trailing 
+        zeros, then final releases after pre releases ordered by suffix"""
+        return self._key
 
     def __lt__(self, other):
-        return self.__cmp(self, other) < 0
+        return self._key < other._key
     def __gt__(self, other):
-        return self.__cmp(self, other) > 0
+        return self._key > other._key
     def __eq__(self, other):
-        return self.__cmp(self, other) == 0
+        return self._key == other._key
     def __le__(self, other):
-        return self.__cmp(self, other) <= 0
+        return self._key <= other._key
     def __ge__(self, other):
-        return self.__cmp(self, other) >= 0
-
-    def __cmp(self, version_a: ReleaseVersion, version_b: ReleaseVersion) -> int:
-        for vnumber_a, vnumber_b in zip(version_a.numbers, version_b.numbers):
-            if vnumber_a > vnumber_b:
-                return 1
-            if vnumber_a < vnumber_b:
-                return -1
-        if not version_a.suffix and version_b.suffix:
-            return 1
-        elif version_a.suffix and not version_b.suffix:
-            return -1
-
-        if version_a.suffix and version_b.suffix:
-            if version_a.suffix > version_b.suffix:
-                return 1
-            elif version_a.suffix < version_b.suffix:
-                return -1
-
-        return 0
+        return self._key >= other._key
+
+    def __hash__(self) -> int:
+        return hash(self._key)
 
     def is_main_release(self) -> bool:
         return self.type(TYPE_MAIN)
@@ -153,23 +139,7 @@ class ReleaseVersion():
         return self.type(TYPE_PATCH)
 
     def type(self, mask: int) -> bool:
-        type = 0b0
-        if int(self.numbers[2]) > 0:
-            type |= TYPE_PATCH
-        elif int(self.numbers[1]) > 0:
-            type |= TYPE_MINOR
-        elif int(self.numbers[0]) > 0:
-            type |= TYPE_MAJOR
-
-        if self.suffix:
-            type |= TYPE_PRE
-        elif not (type & TYPE_PATCH):
-            type |= TYPE_MAIN
-
-        if type & mask == mask:
-            return True
-        else:
-            return False
+        return self.type_bits & mask == mask
 
     #TODO return ReleaseVersion
     def normalize(self, n: int):
@@ -195,9 +165,109 @@ class ReleaseVersion():
         return result
     
 
-class ReleaseSet():
+def _parse_version(name: str, separator: re.Pattern,
+                   version_separator: re.Pattern) -> Tuple:
+    """Parse a release name into its prefix, suffix, version numbers, 
+    version number, type bits and sort key"""
+    prefix = ''
+    suffix = ''
+    parts = separator.match(name)
+    if parts:
+        if parts.group('prefix'):
+            prefix = parts.group('prefix')
+        if parts.group('suffix'):
+            suffix = parts.group('suffix')
+        if parts.group('version'):
+            number = parts.group('version')
+
+    numbers = [int(version_part) 
+               for version_part in version_separator.findall(number)]
+    if len(numbers) == 1:
+        numbers.append(0)
+    if len(numbers) == 2:
+        numbers.append(0)
+
+    type = 0b0
+    if numbers[2] > 0:
+        type |= TYPE_PATCH
+    elif numbers[1] > 0:
+        type |= TYPE_MINOR
+    elif numbers[0] > 0:
+        type |= TYPE_MAJOR
+
+    if suffix:
+        type |= TYPE_PRE
+    elif not (type & TYPE_PATCH):
+        type |= TYPE_MAIN
+    #TODO handle dinamic
+    number = '.'.join([str(v) for v in numbers])
+
+    significant = len(numbers)
+    while significant and not numbers[significant - 1]:
+        significant -= 1
+    key = (tuple(numbers[:significant]), 0 if suffix else 1, suffix)
+    return prefix, suffix, tuple(numbers), number, type, key
+
+
+@lru_cache(maxsize=1 << 17)
+def _parse_default_version(name: str) -> Tuple:
+    """Memoize the parsing of the names with the default patterns"""
+    return _parse_version(name, RELEASE_PATTERN, VERSION_NUMBER_PATTERN)
+
+
+def sort_releases(releases: Iterable[Release]) -> List[Release]:
+    """Sort the releases by time and version"""
+    return sorted(releases, key=_release_order)
+
+
+def _release_order(release: Release) -> Tuple:
+    return (release.timestamp, release.version._key)
+
+
+T = TypeVar('T')
+class OrderedReleaseSet(Generic[T]):
+    """The ordered access shared by the sets of releases keyed by name.
+
+    Subclasses keep their releases in ``_named`` and call ``_changed`` 
+    whenever they add or remove one. Only the positional view is cached: 
+    the first/last releases by a function are computed on each call, since
+    the releases they are computed from may change.
+    """
+    def __init__(self) -> None:
+        self._named = OrderedDict[str, T]()
+        self._values: List[T] = None
+
+    def first(self, func: Callable = None) -> T:
+        if self._named:
+            if func:
+                return min(self._ordered(), key=func)
+            return self._ordered()[0]
+        else:
+            return None
+
+    def last(self, func: Callable = None) -> T:
+        if self._named:
+            if func:
+                # the last of the ties, as a stable sort would do
+                return max(reversed(self._ordered()), key=func)
+            return self._ordered()[-1]
+        else:
+            return None
+
+    def _ordered(self) -> List[T]:
+        if self._values is None:
+            self._values = list(self._named.values())
+        return self._values
+
+    def _changed(self) -> None:
+        self._values = None
+
+
+class ReleaseSet(OrderedReleaseSet[Release]):
+    """An ordered set of releases"""
     def __init__(self, releases: Set[Release] = None) -> None:
-        self._releases = OrderedDict[str, Release]()
+        super().__init__()
+        self._releases = self._named
         if releases:
             for release in releases:
                 self.add(release)
@@ -207,8 +277,7 @@ class ReleaseSet():
 
     def __getitem__(self, key) -> Release:
         if isinstance(key, int):
-            release_name = list(self._releases.keys())[key]
-            return self._releases[release_name]
+            return self._ordered()[key]
         elif isinstance(key, str):
             return self._releases[key]
         else:
@@ -238,36 +307,18 @@ class ReleaseSet():
             prefixes.add(release.version.prefix)
         return prefixes
 
-    def first(self, func: Callable = None) -> Release:
-        if self._releases:
-            if func:
-                ordered_releases = sorted(self._releases.values(), key=func)
-            else:
-                ordered_releases = list(self._releases.values())
-            return ordered_releases[0]
-        else:
-            return None
-
-    def last(self, func: Callable = None) -> Release:
-        if self._releases:
-            if func:
-                ordered_releases = sorted(self._releases.values(), key=func)
-            else:
-                ordered_releases = list(self._releases.values())
-            return ordered_releases[-1]
-        else:
-            return None
-
     def all(self) -> List[Release]:
         return list(self._releases.values())
 
     def add(self, release: Release):
         if release:
             self._releases[release.name] = release
+            self._changed()
 
     def remove(self, release: Release):
         if release.name in self:
             del self._releases[release.name]
+            self._changed()
 
     def update(self, iterable):
         for item in iterable:
@@ -278,17 +329,78 @@ class ReleaseSet():
 
 
 class Commit2ReleaseMapper():
-    """Map a commit to a release"""
-    def __init__(self) -> None:
-        self.mapper = dict[Commit, ReleaseSet]()
+    """Map a commit to its releases.
 
-    def get_release(self, commit: Commit) -> bool:
-        return self.mapper.get(commit)
+    The releases are numbered in assignment order, and a dense array maps 
+    each commit index to the number of its first release. The commits that
+    belong to more than one release keep the other releases in an overflow
+    table.
+    """
+    NONE = -1
+
+    def __init__(self) -> None:
+        self.releases: List[Release] = []
+        self.release_numbers: Dict[Release, int] = {}
+        self.primary = array('i')
+        self.overflow: Dict[int, List[int]] = {}
+        self.commit_table: CommitTable = None
+
+    def __len__(self) -> int:
+        """The number of assigned commits"""
+        return len(self.primary) - self.primary.count(Commit2ReleaseMapper.NONE)
+
+    def is_assigned(self, commit: Commit) -> bool:
+        index = commit.index
+        return index < len(self.primary) \
+            and self.primary[index] != Commit2ReleaseMapper.NONE
+
+    def get_release(self, commit: Commit) -> Set[Release]:
+        """Return the releases of the commit, or None if it is not assigned"""
+        index = commit.index
+        if index >= len(self.primary):
+            return None
+        number = self.primary[index]
+        if number == Commit2ReleaseMapper.NONE:
+            return None
+        releases = {self.releases[number]}
+        if index in self.overflow:
+            releases.update(self.releases[number] 
+                            for number in self.overflow[index])
+        return releases
 
     def assign_commit(self, commit: Commit, release: Release):
-        if commit not in self.mapper:
-            self.mapper[commit] = set() 
-        self.mapper.get(commit).add(release)
+        number = self.release_numbers.get(release)
+        if number is None:
+            number = self.release_numbers[release] = len(self.releases)
+            self.releases.append(release)
+        if self.commit_table is None:
+            self.commit_table = commit.repository.commit_table
+
+        index = commit.index
+        if index >= len(self.primary):
+            self.primary.extend(array(
+                'i', [Commit2ReleaseMapper.NONE]) 
+                * (index + 1 - len(self.primary)))
+        primary = self.primary[index]
+        if primary == Commit2ReleaseMapper.NONE:
+            self.primary[index] = number
+        elif primary != number:
+            numbers = self.overflow.setdefault(index, [])
+            if number not in numbers:
+                numbers.append(number)
+
+    def export(self) -> List[Tuple[str, str]]:
+        """Return the whole mapping as (commit id, release name) rows, 
+        ordered by commit index"""
+        rows = []
+        for index, number in enumerate(self.primary):
+            if number == Commit2ReleaseMapper.NONE:
+                continue
+            commit_id = self.commit_table.ids[index]
+            rows.append((commit_id, self.releases[number].name))
+            for other in self.overflow.get(index, ()):
+                rows.append((commit_id, self.releases[other].name))
+        return rows
 
 
 class BaseReleaseSet():
@@ -1,24 +1,35 @@
 # This module abstract repository objects such as commits and tags
 from __future__ import annotations
 from abc import ABC, abstractclassmethod
+from array import array
 from collections import OrderedDict
-from mimetypes import init
-from typing import Callable, Dict, Iterator, Set
-from datetime import datetime
+from functools import lru_cache
+from operator import attrgetter
+import heapq
+import weakref
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Set, Tuple
+from datetime import datetime, timedelta, timezone
 
 
 class Repository:
     """ 
     A repository stores Tags and Commits
     """
-    def __init__(self, proxy: RepositoryProxy):
+    def __init__(self, proxy: RepositoryProxy, cache_size: int = None):
         proxy.repository = self # TODO better alternative
         self.name: str = proxy.name
         self.proxy = proxy
-        self.commit_cache = CommitCache(proxy)
+        self.commit_table = CommitTable()
+        self.identity_table = IdentityTable()
+        self.commits_loaded = False
+        self.commit_cache = CommitCache(proxy, cache_size)
 
-    def get_tags(self) -> Set[Tag]:
-        tags = self.proxy.fetch_tags()
+    def get_tags(self, name_filter: Callable[[str], Any] = None) -> Set[Tag]:
+        """Return the tags, or only the ones whose names pass name_filter.
+        
+        The commits of the tags that do not pass the filter are not loaded.
+        """
+        tags = self.proxy.fetch_tags(name_filter)
         return tags
 
     def get_commit(self, id: str) -> Commit:
@@ -26,40 +37,423 @@ class Repository:
         return commit
 
     def get_parents(self, commit: Commit) -> CommitSet:
-        parents = self.proxy.fetch_commit_parents(commit)
-        return parents
+        """Return the parents of the commit, fetching them once"""
+        parent_indexes = self.commit_table.parents(commit.index)
+        if parent_indexes is None:
+            parents = self.proxy.fetch_commit_parents(commit)
+            self.commit_table.set_parents(commit.index, parents)
+            return parents
+        ids = self.commit_table.ids
+        return CommitSet(self.get_commit(ids[index]) 
+                         for index in parent_indexes)
+
+    def _parent_indexes(self, index: int) -> Tuple[int, ...]:
+        """Return the parent indexes of a commit, fetching them once"""
+        parent_indexes = self.commit_table.parents(index)
+        if parent_indexes is None:
+            self.get_commit(self.commit_table.ids[index]).parents
+            parent_indexes = self.commit_table.parents(index)
+        return parent_indexes
+
+    def load_commits(self) -> None:
+        """Load all the commits reachable from the tags in a single pass.
+
+        The loaded commits already have their parents, so the miners no longer
+        fetch commits and parents one by one.
+        """
+        for commit in self.proxy.fetch_commits():
+            self.commit_cache.add(commit)
+        self.commits_loaded = True
+
+    @property
+    def supports_diff(self) -> bool:
+        """Whether the diffs of the commits can be computed. Miners that 
+        need diffs should check it, as the diff methods raise DiffUnavailable
+        otherwise."""
+        return self.proxy.supports_diff
 
     def diff(self, commit_a: Commit, commit_b: Commit, parse_files: bool) -> DiffDelta:
+        if not self.proxy.supports_diff:
+            raise DiffUnavailable(self.name)
         diff_delta = self.proxy.diff(commit_a, commit_b, parse_files)
         return diff_delta
 
+    def diff_many(self, pairs: Iterable[Tuple[Commit, Commit]], 
+                  parse_files: bool = False, workers: int = None,
+                  chunk_size: int = 64) -> Iterator[DiffDelta]:
+        """Compute the diff of each pair of commits, in the input order.
+
+        The pairs are split in chunks of chunk_size that proxies may 
+        process in parallel, using up to workers processes.
+        """
+        if not self.proxy.supports_diff:
+            raise DiffUnavailable(self.name)
+        return self.proxy.diff_many(pairs, parse_files, workers, chunk_size)
+
+    def generation(self, commit: Commit) -> int:
+        """The length of the longest path from the commit to a root commit,
+        as in the Git commit-graph. Root commits have generation 1."""
+        self._index_generations(commit)
+        return self.commit_table.generations[commit.index]
+
+    def _index_generations(self, commit: Commit) -> None:
+        """Compute the generation and the committer time bounds of the commit
+        and of its ancestors that were not indexed yet.
+
+        The time bounds of a commit are the minimum and the maximum committer
+        times of the commits it reaches. As the ancestry of a commit never 
+        changes, they are computed once per repository.
+        """
+        table = self.commit_table
+        generations = table.generations
+        indexes_to_track = [commit.index]
+        while indexes_to_track:
+            index = indexes_to_track[-1]
+            if generations[index]:
+                indexes_to_track.pop()
+                continue
+            parents = self._parent_indexes(index)
+            missing = [parent for parent in parents if not generations[parent]]
+            if missing:
+                indexes_to_track.extend(missing)
+                continue
+            indexes_to_track.pop()
+            generation = 1
+            min_time = max_time = table.committer_times[index]
+            for parent in parents:
+                generation = max(generation, generations[parent] + 1)
+                min_time = min(min_time, table.min_times[parent])
+                max_time = max(max_time, table.max_times[parent])
+            generations[index] = generation
+            table.min_times[index] = min_time
+            table.max_times[index] = max_time
+
+    def is_ancestor(self, commit: Commit, descendant: Commit) -> bool:
+        """Check if the commit is reachable from the descendant. A commit is 
+        an ancestor of itself.
+
+        The search skips the commits that cannot reach the commit: the ones 
+        whose generation is not greater than the commit generation, and the 
+        ones whose time bounds do not include the commit ones.
+        """
+        if commit == descendant:
+            return True
+        self._index_generations(commit)
+        self._index_generations(descendant)
+        table = self.commit_table
+        generation = table.generations[commit.index]
+        time = table.committer_times[commit.index]
+        min_time = table.min_times[commit.index]
+
+        def can_reach(index: int) -> bool:
+            return table.generations[index] > generation \
+                and table.max_times[index] >= time \
+                and table.min_times[index] <= min_time
+
+        if not can_reach(descendant.index):
+            return False
+        visited = set[int]([descendant.index])
+        indexes_to_track = [descendant.index]
+        while indexes_to_track:
+            for parent in self._parent_indexes(indexes_to_track.pop()):
+                if parent == commit.index:
+                    return True
+                if parent not in visited and can_reach(parent):
+                    visited.add(parent)
+                    indexes_to_track.append(parent)
+        return False
+
+    def merge_bases(self, commit: Commit, other: Commit) -> CommitSet:
+        """Return the best common ancestors of both commits, i.e., the common
+        ancestors that do not reach other common ancestors, as in
+        git merge-base --all.
+
+        Both sides are painted down in decreasing generation order, so that
+        a commit is only visited after all its painted children. The commits
+        reached from a merge base are stale, and the search stops when only
+        stale commits remain.
+        """
+        self._index_generations(commit)
+        self._index_generations(other)
+        generations = self.commit_table.generations
+        flags = {commit.index: _FIRST}
+        flags[other.index] = flags.get(other.index, 0) | _SECOND
+        indexes_to_paint = [(-generations[index], index) 
+                            for index in set([commit.index, other.index])]
+        heapq.heapify(indexes_to_paint)
+        not_stale = len(indexes_to_paint)
+        merge_bases = CommitSet()
+        while not_stale:
+            _, index = heapq.heappop(indexes_to_paint)
+            commit_flags = flags[index]
+            if commit_flags & _STALE:
+                pass
+            elif commit_flags & _BOTH == _BOTH:
+                not_stale -= 1
+                merge_bases.add(self.get_commit(self.commit_table.ids[index]))
+                commit_flags = flags[index] = commit_flags | _STALE
+            else:
+                not_stale -= 1
+            for parent in self._parent_indexes(index):
+                parent_flags = flags.get(parent)
+                if parent_flags is None:
+                    flags[parent] = commit_flags
+                    heapq.heappush(indexes_to_paint, 
+                                   (-generations[parent], parent))
+                    if not commit_flags & _STALE:
+                        not_stale += 1
+                elif parent_flags | commit_flags != parent_flags:
+                    # the parent is still queued, as its generation is lower
+                    if commit_flags & _STALE and not parent_flags & _STALE:
+                        not_stale -= 1
+                    flags[parent] = parent_flags | commit_flags
+        return merge_bases
+
+
+# paint flags of Repository.merge_bases
+_FIRST = 1
+_SECOND = 2
+_BOTH = _FIRST | _SECOND
+_STALE = 4
 
-class CommitCache:
+
+class LRUCache:
+    """
+    A cache that keeps at most max_size items, evicting the least recently 
+    used ones. A max_size of None means that the cache is unbounded.
+
+    It counts the hits, misses and evictions, to help tuning its size.
+    """
+    def __init__(self, max_size: int = None) -> None:
+        self.cache = OrderedDict[Any, Any]()
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.cache)
+
+    def get(self, key) -> Any:
+        """Return the cached item or None, counting the hit or miss"""
+        item = self.cache.get(key)
+        if item is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            if self.max_size:
+                self.cache.move_to_end(key)
+        return item
+
+    def put(self, key, item) -> None:
+        self.cache[key] = item
+        if self.max_size:
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.max_size:
+                evicted_key, evicted_item = self.cache.popitem(last=False)
+                self.evictions += 1
+                self.evict(evicted_key, evicted_item)
+
+    def evict(self, key, item) -> None:
+        """Called after an item is evicted"""
+        pass
+
+
+class CommitCache(LRUCache):
     """
     Implement cache to improve fech commit performance
+
+    Evicted commits that are still in use, e.g., in a CommitSet, are kept 
+    as weak references. Therefore, each commit has a single instance while 
+    it is in use.
     """
-    def __init__(self, proxy: RepositoryProxy) -> None:
-        self.cache: Dict[str, Commit] = {}
+    def __init__(self, proxy: RepositoryProxy, max_size: int = None) -> None:
+        super().__init__(max_size)
         self.proxy = proxy
+        self.evicted = weakref.WeakValueDictionary[str, Commit]()
 
     def fetch_commit(self, commit_id: str) -> Commit:
-        if commit_id not in self.cache:
-            commit = self.proxy.fetch_commit(commit_id)
-            self.cache[commit_id] = commit
-        return self.cache[commit_id]
+        commit = self.get(commit_id)
+        if commit is None:
+            commit = self.evicted.pop(commit_id, None)
+            if commit is None:
+                commit = self.proxy.fetch_commit(commit_id)
+            self.put(commit_id, commit)
+        return commit
+
+    def add(self, commit: Commit) -> None:
+        self.put(commit.id, commit)
+
+    def evict(self, commit_id: str, commit: Commit) -> None:
+        self.evicted[commit_id] = commit
+
+
+class CommitTable:
+    """
+    Intern the commits of a repository into dense integer indexes.
+
+    The parents, the times and the identity ids of the interned commits are 
+    stored in flat arrays, which let traversals work on integers instead of 
+    Commit objects. Commits are views over their row of the table.
+    The parents of a commit are UNKNOWN until they are fetched, and its 
+    generation is 0 until it is indexed by the repository. The offsets are 
+    NO_OFFSET for times without timezone and NO_TIME for missing times.
+    """
+    NONE = -1
+    UNKNOWN = -2
+    NO_OFFSET = -0x80000000
+    NO_TIME = -0x7fffffff
+
+    def __init__(self) -> None:
+        self.ids: List[str] = []
+        self.indexes: Dict[str, int] = {}
+        self.first_parents = array('q')
+        self.second_parents = array('q')
+        self.other_parents: Dict[int, Tuple[int, ...]] = {}
+        self.committer_times = array('d')
+        self.committer_offsets = array('i')
+        self.author_times = array('d')
+        self.author_offsets = array('i')
+        self.committer_ids = array('q')
+        self.author_ids = array('q')
+        self.generations = array('q')
+        self.min_times = array('d')
+        self.max_times = array('d')
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def intern(self, commit_id: str) -> int:
+        index = self.indexes.get(commit_id)
+        if index is None:
+            index = len(self.ids)
+            self.indexes[commit_id] = index
+            self.ids.append(commit_id)
+            if index == len(self.generations):
+                self._grow()
+        return index
+
+    def _grow(self) -> None:
+        """Double the capacity of the arrays, so that they are not extended
+        for each interned commit. The rows past the interned commits are 
+        unused."""
+        size = max(len(self.generations), 1024)
+        self.first_parents.extend(array('q', [CommitTable.UNKNOWN]) * size)
+        self.second_parents.extend(array('q', [CommitTable.NONE]) * size)
+        self.committer_times.extend(array('d', [0]) * size)
+        self.committer_offsets.extend(array('i', [CommitTable.NO_TIME]) * size)
+        self.author_times.extend(array('d', [0]) * size)
+        self.author_offsets.extend(array('i', [CommitTable.NO_TIME]) * size)
+        self.committer_ids.extend(array('q', [CommitTable.NONE]) * size)
+        self.author_ids.extend(array('q', [CommitTable.NONE]) * size)
+        self.generations.extend(array('q', [0]) * size)
+        self.min_times.extend(array('d', [0]) * size)
+        self.max_times.extend(array('d', [0]) * size)
+
+    def set_identities(self, index: int, committer_id: int, 
+                       author_id: int) -> None:
+        if committer_id is not None:
+            self.committer_ids[index] = committer_id
+        else:
+            self.committer_ids[index] = CommitTable.NONE
+        if author_id is not None:
+            self.author_ids[index] = author_id
+        else:
+            self.author_ids[index] = CommitTable.NONE
+
+    def set_times(self, index: int, 
+                  committer_timestamp: float, committer_offset: int,
+                  author_timestamp: float, author_offset: int) -> None:
+        self.committer_times[index], self.committer_offsets[index] \
+            = _pack_time(committer_timestamp, committer_offset)
+        self.author_times[index], self.author_offsets[index] \
+            = _pack_time(author_timestamp, author_offset)
+
+    def set_parents(self, index: int, parents: Iterable[Commit]) -> None:
+        parent_indexes = [parent.index for parent in parents]
+        self.first_parents[index] = parent_indexes[0] if parent_indexes \
+                                    else CommitTable.NONE
+        self.second_parents[index] = parent_indexes[1] \
+                                     if len(parent_indexes) > 1 \
+                                     else CommitTable.NONE
+        if len(parent_indexes) > 2:
+            self.other_parents[index] = tuple(parent_indexes[2:])
+
+    def parents(self, index: int) -> Tuple[int, ...]:
+        """Return the parent indexes or None if they were not fetched yet"""
+        first_parent = self.first_parents[index]
+        if first_parent == CommitTable.UNKNOWN:
+            return None
+        if first_parent == CommitTable.NONE:
+            return ()
+        second_parent = self.second_parents[index]
+        if second_parent == CommitTable.NONE:
+            return (first_parent,)
+        return (first_parent, second_parent) \
+               + self.other_parents.get(index, ())
+
+
+class IdentityTable:
+    """
+    Intern the committer and author identities of a repository.
+
+    Each distinct identity, i.e., 'Name <email>', has a dense integer id and 
+    a single string instance, shared by all its commits. Identities can be 
+    interned from their name and email, without building the string again.
+    """
+    def __init__(self) -> None:
+        self.names: List[str] = []
+        self.ids: Dict[Any, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def intern(self, name: str, email: str = None) -> int:
+        """Return the id of the identity, given as a string or as its 
+        name and email"""
+        key = name if email is None else (name, email)
+        id = self.ids.get(key)
+        if id is None:
+            identity = name if email is None else f"{name} <{email}>"
+            id = self.ids.get(identity)
+            if id is None:
+                id = len(self.names)
+                self.names.append(identity)
+                self.ids[identity] = id
+            self.ids[key] = id
+        return id
+
+    def name(self, id: int) -> str:
+        """Return the identity string, or None for CommitTable.NONE"""
+        if id < 0:
+            return None
+        return self.names[id]
+
+
+class DiffUnavailable(Exception):
+    """The repository does not store what is needed to compute diffs"""
+    def __init__(self, repository_name: str) -> None:
+        super().__init__(
+            f"diffs are not available in the repository {repository_name}")
 
 
 class RepositoryProxy(ABC):
     """ 
     An adapter to enable developers creating specific repository, such as Git 
+
+    Proxies that cannot compute diffs set supports_diff to False.
     """
+    supports_diff = True
+
     def __init__(self) -> None:
         super().__init__()
         self.repository: Repository = None #TODO better alternative
         self.name: str = None
 
     @abstractclassmethod
-    def fetch_tags(self) -> Set[Tag]:
+    def fetch_tags(self, name_filter: Callable[[str], Any] = None) -> Set[Tag]:
+        """Fetch the tags whose names pass name_filter, or all tags if it is 
+        None"""
         pass
 
     @abstractclassmethod
@@ -74,13 +468,40 @@ class RepositoryProxy(ABC):
     def diff(self, commit_a: Commit, commit_b: Commit, parse_files:bool) -> DiffDelta:
         pass
 
+    def diff_many(self, pairs: Iterable[Tuple[Commit, Commit]], 
+                  parse_files: bool = False, workers: int = None,
+                  chunk_size: int = 64) -> Iterator[DiffDelta]:
+        """Compute many diffs. This default implementation computes them one
+        by one, in the calling thread."""
+        for commit_a, commit_b in pairs:
+            yield self.diff(commit_a, commit_b, parse_files)
+
+    def fetch_commits(self) -> List[Commit]:
+        """Fetch all the commits reachable from the tags, with their parents.
+
+        This default implementation walks the history commit by commit. 
+        Proxies should override it to load the commit graph in bulk.
+        """
+        commits: Dict[str, Commit] = {}
+        commits_to_track = [tag.commit for tag in self.fetch_tags() 
+                            if tag.commit]
+        while commits_to_track:
+            commit = commits_to_track.pop()
+            if commit.id not in commits:
+                commits[commit.id] = commit
+                commits_to_track.extend(commit.parents)
+        return list(commits.values())
+
 
 class Tag:
     """
     A Tag represents a reference to a commit, which is a potential release
     """
     def __init__(self, repository: Repository, name: str, commit: Commit = None,
-                 message: str = None, author: str = None, time: datetime = None) -> None:
+                 message: str = None, author: str = None, time: datetime = None,
+                 timestamp: float = None, offset: int = None) -> None:
+        """The time is either a datetime or a raw timestamp with its offset 
+        in minutes. Tags without time have the time of their commits."""
         self.repository = repository
         self.name = name
         self.commit = commit
@@ -89,15 +510,30 @@ class Tag:
             self.message = message
         else:
             self.message = ""
+        self._time = time
         if time:
-            self.time = time
-        elif commit:
-            self.time = commit.committer_time
-        if message or time:
+            timestamp, offset = _from_datetime(time)
+        self._timestamp = timestamp
+        self._offset = offset
+        if message or timestamp is not None:
             self.is_annotated = True
         else:
             self.is_annotated = False
 
+    @property
+    def timestamp(self) -> float:
+        if self._timestamp is None and self.commit:
+            return self.commit.committer_timestamp
+        return self._timestamp
+
+    @property
+    def time(self) -> datetime:
+        if self._time is None:
+            if self._timestamp is None:
+                return self.commit.committer_time if self.commit else None
+            self._time = _to_datetime(self._timestamp, self._offset)
+        return self._time
+
     def __eq__(self, __o: object) -> bool:
         if isinstance(__o, Tag):
             return self.repository == __o.repository and self.name == __o.name
@@ -114,22 +550,130 @@ class Tag:
 class Commit:
     """
     A Commit represents a change
+
+    Commits are interned in the repository commit table, so each commit has 
+    a dense integer index that is also used as its hash. The commit is a 
+    view over its row of the table: the parents, the times and the committer
+    and author identity ids are only stored there, and the identities are 
+    interned in the repository identity table. Commits without repository 
+    keep these fields themselves.
+
+    The times are stored as raw timestamps with their offsets in minutes,
+    and the datetimes are only created when they are read. The offset is 
+    None for times without timezone.
     """
+    __slots__ = ('repository', 'id', 'index', 'message', '_hash', '_fields',
+                 '_parents', '__weakref__')
+
     def __init__(self, repository: Repository, id: str, message: str = None, 
                  committer: str = None, committer_time: datetime = None,
-                 author: str = None, author_time: datetime = None) -> None:
+                 author: str = None, author_time: datetime = None,
+                 committer_timestamp: float = None, 
+                 committer_offset: int = None,
+                 author_timestamp: float = None, 
+                 author_offset: int = None,
+                 committer_id: int = None, author_id: int = None) -> None:
         self.repository = repository
         self.id = id
         self.message = message
         self._parents = None # Lazy loaded
-        self.committer = committer
-        self.committer_time = committer_time
-        self.author = author
-        self.author_time = author_time
+        if committer_time:
+            committer_timestamp, committer_offset \
+                = _from_datetime(committer_time)
+        if author_time:
+            author_timestamp, author_offset = _from_datetime(author_time)
+        if repository:
+            table = repository.commit_table
+            self.index = table.intern(id)
+            self._hash = self.index
+            self._fields = None
+            identities = repository.identity_table
+            if committer_id is None and committer is not None:
+                committer_id = identities.intern(committer)
+            if author_id is None and author is not None:
+                author_id = identities.intern(author)
+            table.set_identities(self.index, committer_id, author_id)
+            table.set_times(self.index, committer_timestamp, committer_offset,
+                            author_timestamp, author_offset)
+        else:
+            self.index = None
+            self._hash = hash(id)
+            self._fields = (committer, committer_timestamp, committer_offset,
+                            author, author_timestamp, author_offset)
+
+    @property
+    def committer_id(self) -> int:
+        if self._fields:
+            return None
+        return _from_column(
+            self.repository.commit_table.committer_ids[self.index])
+
+    @property
+    def author_id(self) -> int:
+        if self._fields:
+            return None
+        return _from_column(
+            self.repository.commit_table.author_ids[self.index])
+
+    @property
+    def committer(self) -> str:
+        if self._fields:
+            return self._fields[0]
+        return self.repository.identity_table.name(
+            self.repository.commit_table.committer_ids[self.index])
+
+    @property
+    def author(self) -> str:
+        if self._fields:
+            return self._fields[3]
+        return self.repository.identity_table.name(
+            self.repository.commit_table.author_ids[self.index])
+
+    @property
+    def committer_timestamp(self) -> float:
+        return self._time(1)[0]
+
+    @property
+    def committer_offset(self) -> int:
+        return self._time(1)[1]
+
+    @property
+    def author_timestamp(self) -> float:
+        return self._time(4)[0]
+
+    @property
+    def author_offset(self) -> int:
+        return self._time(4)[1]
+
+    @property
+    def committer_time(self) -> datetime:
+        timestamp, offset = self._time(1)
+        if timestamp is None:
+            return None
+        return _to_datetime(timestamp, offset)
+
+    @property
+    def author_time(self) -> datetime:
+        timestamp, offset = self._time(4)
+        if timestamp is None:
+            return None
+        return _to_datetime(timestamp, offset)
+
+    def _time(self, field: int) -> Tuple[float, int]:
+        """Return the timestamp and offset of the committer (field 1) or of
+        the author (field 4)"""
+        if self._fields:
+            return self._fields[field], self._fields[field + 1]
+        table = self.repository.commit_table
+        if field == 1:
+            return _unpack_time(table.committer_times[self.index],
+                                table.committer_offsets[self.index])
+        return _unpack_time(table.author_times[self.index],
+                            table.author_offsets[self.index])
 
     @property
     def parents(self) -> CommitSet:
-        if not self._parents:
+        if self._parents is None:
             self._parents = self.repository.get_parents(self)
         return self._parents
 
@@ -140,7 +684,7 @@ class Commit:
             return False
         
     def __hash__(self) -> int:
-        return hash((self.repository, self.id))
+        return self._hash
 
     def __repr__(self) -> str:
         return self.id[0:8]
@@ -168,12 +712,91 @@ class DiffDelta:
 
 
 class CommitSet:
+    """An ordered set of commits.
+
+    The set can also be represented as a compressed bitmap over the commit 
+    indexes, which is built on demand and kept until the set changes. The 
+    set operations between commit sets of the same repository work on the 
+    bitmaps, and their results only create the commit mapping when they 
+    are iterated or changed.
+    """
+    __slots__ = ('_commits', '_bitmap', '_sources')
+
     def __init__(self, commits: Set[Commit] = None) -> None:
-        self._commits = OrderedDict[str, Commit]()
+        self._commits = dict[str, Commit]()
+        self._bitmap: Bitmap = None
+        self._sources: List[CommitSet] = None
         if commits:
             self.update(commits)
+
+    @classmethod
+    def _from_bitmap(cls, bitmap: Bitmap, 
+                     sources: List[CommitSet]) -> CommitSet:
+        """Create a lazy commit set, whose commits are taken from sources"""
+        commits = cls()
+        commits._commits = None
+        commits._bitmap = bitmap
+        commits._sources = sources
+        return commits
+
+    def _source_list(self) -> List[CommitSet]:
+        """The sets whose commits include the commits of this set"""
+        if self._commits is None:
+            return self._sources
+        return [self]
+
+    def _materialize(self) -> None:
+        positions = set(self._bitmap)
+        self._commits = dict[str, Commit]()
+        for source in self._sources:
+            for commit in source:
+                if commit.index in positions:
+                    positions.remove(commit.index)
+                    self._commits[commit.id] = commit
+            if not positions:
+                break
+        self._sources = None
+
+    @property
+    def bitmap(self) -> Bitmap:
+        """The commit indexes as a bitmap, or None if some commit does not 
+        belong to a repository"""
+        if self._bitmap is None:
+            indexes = [commit.index for commit in self._commits.values()]
+            if None in indexes:
+                return None
+            self._bitmap = Bitmap(indexes)
+        return self._bitmap
+
+    def _repository(self) -> Repository:
+        """The repository of the commits, or None if the set is empty"""
+        if self._commits is None:
+            for source in self._sources:
+                repository = source._repository()
+                if repository:
+                    return repository
+            return None
+        for commit in self._commits.values():
+            return commit.repository
+        return None
+
+    def _same_repository(self, other: CommitSet) -> bool:
+        repository = self._repository()
+        other_repository = other._repository()
+        return repository is None or other_repository is None \
+            or repository is other_repository
     
     def __contains__(self, item) -> bool:
+        if self._commits is None:
+            # a lazy set answers from its bitmap, without materializing
+            repository = self._repository()
+            if isinstance(item, Commit) and item.repository is repository:
+                index = item.index
+            elif isinstance(item, str) and repository:
+                index = repository.commit_table.indexes.get(item)
+            else:
+                return False
+            return index is not None and index in self._bitmap
         if isinstance(item, str) and item in self._commits:
             return True
         elif isinstance(item, Commit) and item.id in self._commits:
@@ -181,6 +804,8 @@ class CommitSet:
         return False
 
     def __getitem__(self, key) -> Commit:
+        if self._commits is None:
+            self._materialize()
         if isinstance(key, int):
             commit_id = list(self._commits.keys())[key]
             return self._commits[commit_id]
@@ -190,42 +815,141 @@ class CommitSet:
             raise TypeError()
 
     def __iter__(self) -> Iterator[Commit]:
+        if self._commits is None:
+            self._materialize()
         return iter(self._commits.values())
 
     def __eq__(self, __o: object) -> bool:
+        if isinstance(__o, CommitSet) and self._same_repository(__o):
+            if self._commits is not None and __o._commits is not None:
+                return self._commits.keys() == __o._commits.keys()
+            return self.bitmap == __o.bitmap
         return self.all == __o
 
     def __len__(self) -> int:
+        if self._commits is None:
+            return len(self._bitmap)
         return len(self._commits)
         
     def add(self, commit: Commit):
+        if self._commits is None:
+            self._materialize()
         if commit and commit not in self._commits:
             self._commits[commit.id] = commit
+            self._bitmap = None
     
     def update(self, commits):
         for commit in commits:
             self.add(commit)
 
+    def _operands(self, *others: CommitSet) -> List[Bitmap]:
+        """Return the bitmaps of this set and the others, or None if they 
+        cannot be combined as bitmaps"""
+        bitmaps = [self.bitmap]
+        for other in others:
+            if not isinstance(other, CommitSet) \
+                    or not self._same_repository(other):
+                return None
+            bitmaps.append(other.bitmap)
+        if None in bitmaps:
+            return None
+        return bitmaps
+
+    def union(self, *others: CommitSet) -> CommitSet:
+        """Unite this set with all the others at once"""
+        operands = self._operands(*others)
+        if operands is None:
+            commits = CommitSet(self)
+            for other in others:
+                commits.update(other)
+            return commits
+        sources = list(self._source_list())
+        for other in others:
+            sources.extend(other._source_list())
+        return CommitSet._from_bitmap(Bitmap.union(*operands), sources)
+
+    def intersection(self, other: CommitSet) -> CommitSet:
+        operands = self._operands(other)
+        if operands is None:
+            return CommitSet(commit for commit in self if commit in other)
+        bitmap, other_bitmap = operands
+        return CommitSet._from_bitmap(
+            bitmap & other_bitmap, self._source_list())
+
+    def difference(self, other: CommitSet) -> CommitSet:
+        operands = self._operands(other)
+        if operands is None:
+            return CommitSet(commit for commit in self if commit not in other)
+        bitmap, other_bitmap = operands
+        return CommitSet._from_bitmap(
+            bitmap - other_bitmap, self._source_list())
+
+    def __or__(self, other: CommitSet) -> CommitSet:
+        return self.union(other)
+
+    def __and__(self, other: CommitSet) -> CommitSet:
+        return self.intersection(other)
+
     def __sub__(self, other):
+        if isinstance(other, CommitSet):
+            return set(self.difference(other))
         return self.all - other.all
 
     @property
     def ids(self) -> Set[str]:
-        return set(commit.id for commit in self._commits.values())
+        return set(commit.id for commit in self)
 
     @property
     def all(self) -> Set[Commit]:
-        return set(commit for commit in self._commits.values())
+        return set(commit for commit in self)
 
     @property
     def authors(self) -> Set[str]:
-        return set(commit.author for commit in self._commits.values())
+        return self._identities(self.author_ids, 'author')
 
     @property
     def committers(self) -> Set[str]:
-        return set(commit.committer for commit in self._commits.values())
+        return self._identities(self.committer_ids, 'committer')
+
+    @property
+    def author_ids(self) -> List[int]:
+        """The author identity ids of the commits, or None if some commit 
+        does not belong to a repository"""
+        return self._identity_ids('author_id')
+
+    @property
+    def committer_ids(self) -> List[int]:
+        """The committer identity ids of the commits, or None if some 
+        commit does not belong to a repository"""
+        return self._identity_ids('committer_id')
+
+    def _identity_ids(self, attribute: str) -> List[int]:
+        """Read the identity ids from the commit table when the set is lazy,
+        without creating its commit mapping"""
+        if self._commits is None:
+            repository = self._repository()
+            if repository is None:
+                return []
+            table_ids = getattr(repository.commit_table, f"{attribute}s")
+            return [table_ids[index] for index in self._bitmap]
+        ids = list(map(attrgetter(attribute), self._commits.values()))
+        if None in ids:
+            if self.bitmap is None:
+                return None
+            ids = [CommitTable.NONE if id is None else id for id in ids]
+        return ids
+
+    def _identities(self, ids: List[int], attribute: str) -> Set[str]:
+        if ids is None:
+            return set(getattr(commit, attribute) for commit in self)
+        if not ids:
+            return set()
+        identities = self._repository().identity_table
+        return set(identities.name(id) for id in set(ids))
 
     def first(self, func: Callable = None) -> Commit:
+        if self._commits is None:
+            self._materialize()
         if self._commits:
             if func:
                 ordered_commits = sorted(self._commits.values(), key=func)
@@ -236,6 +960,8 @@ class CommitSet:
             return None
 
     def last(self, func: Callable = None) -> Commit:
+        if self._commits is None:
+            self._materialize()
         if self._commits:
             if func:
                 ordered_commits = sorted(self._commits.values(), key=func)
@@ -243,4 +969,164 @@ class CommitSet:
                 ordered_commits = list(self._commits.values())
             return ordered_commits[-1]
         else:
-            return None 
\ No newline at end of file
+            return None 
+
+class Bitmap:
+    """
+    A compressed set of non-negative integers, such as commit indexes.
+
+    The positions are split in chunks of 2**CHUNK_BITS positions, and only 
+    the chunks that hold some position are kept, each one as an int bitmap.
+    Therefore, the size of a bitmap depends on the positions it holds, 
+    rather than on the highest one. Bitmaps are immutable.
+    """
+    CHUNK_BITS = 12
+    CHUNK_BYTES = (1 << CHUNK_BITS) // 8
+    __slots__ = ('chunks',)
+
+    def __init__(self, positions: Iterable[int] = ()) -> None:
+        chunks: Dict[int, int] = {}
+        mask = (1 << Bitmap.CHUNK_BITS) - 1
+        for position in positions:
+            chunk = position >> Bitmap.CHUNK_BITS
+            chunks[chunk] = chunks.get(chunk, 0) | 1 << (position & mask)
+        self.chunks = chunks
+
+    @classmethod
+    def _from_chunks(cls, chunks: Dict[int, int]) -> Bitmap:
+        bitmap = cls.__new__(cls)
+        bitmap.chunks = chunks
+        return bitmap
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Bitmap:
+        """Read a plain little-endian bitmap"""
+        chunks = {}
+        for chunk, start in enumerate(range(0, len(data), cls.CHUNK_BYTES)):
+            bits = int.from_bytes(data[start:start + cls.CHUNK_BYTES], 'little')
+            if bits:
+                chunks[chunk] = bits
+        return cls._from_chunks(chunks)
+
+    def to_bytes(self) -> bytes:
+        """Write the bitmap as a plain little-endian bitmap"""
+        if not self.chunks:
+            return b''
+        data = b''.join(
+            self.chunks.get(chunk, 0).to_bytes(Bitmap.CHUNK_BYTES, 'little')
+            for chunk in range(max(self.chunks) + 1))
+        return data.rstrip(b'\0')
+
+    @classmethod
+    def union(cls, *bitmaps: Bitmap) -> Bitmap:
+        """Unite all the bitmaps at once"""
+        chunks: Dict[int, int] = {}
+        for bitmap in bitmaps:
+            for chunk, bits in bitmap.chunks.items():
+                if chunk in chunks:
+                    chunks[chunk] |= bits
+                else:
+                    chunks[chunk] = bits
+        return cls._from_chunks(chunks)
+
+    def __or__(self, other: Bitmap) -> Bitmap:
+        return Bitmap.union(self, other)
+
+    def __and__(self, other: Bitmap) -> Bitmap:
+        if len(self.chunks) > len(other.chunks):
+            self, other = other, self
+        chunks = {}
+        for chunk, bits in self.chunks.items():
+            bits &= other.chunks.get(chunk, 0)
+            if bits:
+                chunks[chunk] = bits
+        return Bitmap._from_chunks(chunks)
+
+    def __sub__(self, other: Bitmap) -> Bitmap:
+        chunks = {}
+        for chunk, bits in self.chunks.items():
+            if chunk in other.chunks:
+                bits &= ~other.chunks[chunk]
+            if bits:
+                chunks[chunk] = bits
+        return Bitmap._from_chunks(chunks)
+
+    def __contains__(self, position: int) -> bool:
+        bits = self.chunks.get(position >> Bitmap.CHUNK_BITS)
+        if bits is None:
+            return False
+        return bool(bits >> (position & ((1 << Bitmap.CHUNK_BITS) - 1)) & 1)
+
+    def __iter__(self) -> Iterator[int]:
+        for chunk in sorted(self.chunks):
+            start = chunk << Bitmap.CHUNK_BITS
+            for position in _bit_positions(self.chunks[chunk]):
+                yield start + position
+
+    def __len__(self) -> int:
+        return sum(_bit_count(bits) for bits in self.chunks.values())
+
+    def __eq__(self, __o: object) -> bool:
+        if isinstance(__o, Bitmap):
+            return self.chunks == __o.chunks
+        return False
+
+    def __repr__(self) -> str:
+        return f"Bitmap({list(self)})"
+
+
+def _from_datetime(time: datetime) -> Tuple[float, int]:
+    """Return the timestamp and the offset in minutes of a datetime"""
+    offset = time.utcoffset()
+    if offset is None:
+        return time.timestamp(), None
+    return time.timestamp(), int(offset.total_seconds()) // 60
+
+
+def _pack_time(timestamp: float, offset: int) -> Tuple[float, int]:
+    """Return the timestamp and offset columns of the commit table"""
+    if timestamp is None:
+        return 0, CommitTable.NO_TIME
+    if offset is None:
+        return timestamp, CommitTable.NO_OFFSET
+    return timestamp, offset
+
+
+def _unpack_time(timestamp: float, offset: int) -> Tuple[float, int]:
+    if offset == CommitTable.NO_TIME:
+        return None, None
+    if timestamp.is_integer():
+        timestamp = int(timestamp)
+    if offset == CommitTable.NO_OFFSET:
+        return timestamp, None
+    return timestamp, offset
+
+
+def _from_column(id: int) -> int:
+    return None if id == CommitTable.NONE else id
+
+
+def _to_datetime(timestamp: float, offset: int) -> datetime:
+    if offset is None:
+        return datetime.fromtimestamp(timestamp)
+    return datetime.fromtimestamp(timestamp, _timezone(offset))
+
+
+@lru_cache(maxsize=None)
+def _timezone(offset: int) -> timezone:
+    return timezone(timedelta(minutes=offset))
+
+
+def _bit_positions(bitmap: int) -> Iterator[int]:
+    """Iterate over the positions of the bits set in the bitmap"""
+    bits = bin(bitmap)[:1:-1]
+    position = bits.find('1')
+    while position >= 0:
+        yield position
+        position = bits.find('1', position + 1)
+
+
+def _bit_count(bitmap: int) -> int:
+    if hasattr(bitmap, 'bit_count'):
+        return bitmap.bit_count()
+    return bin(bitmap).count('1')
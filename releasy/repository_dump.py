@@ -0,0 +1,336 @@
+"""History Dump
+
+This module exports the commit graph and the tags of a repository to a
+compact binary dump, and reads it back as a repository proxy. Projects can
+be mined again from the dump without the original clone.
+
+The dump is a little-endian file with the sections:
+- header: magic, version, sizes and the repository name;
+- commits: fixed size records, ordered with parents before children;
+- parents: the commit positions of the parents of each commit;
+- index: the commit positions sorted by commit id;
+- tags: fixed size records;
+- identities: the committer and author names, commits without committer 
+  or author refer to the NO_IDENTITY id;
+- strings: the UTF-8 text referenced by the other sections;
+- checksum: the SHA-1 of all the previous bytes.
+"""
+from __future__ import annotations
+import hashlib
+import math
+import mmap
+import struct
+from typing import Any, Callable, Dict, Iterator, List, Set, Tuple
+
+from .repository import (
+    Commit, CommitSet, DiffDelta, DiffUnavailable, Repository, 
+    RepositoryProxy, Tag)
+
+MAGIC = b'RLSYDUMP'
+VERSION = 2
+# identity of the commits without committer or author
+NO_IDENTITY = 0xffffffff
+
+_HEADER = struct.Struct('<8sIIIIIIQQI')
+_PARENT = struct.Struct('<I')
+_TAG = struct.Struct('<QIQIQIIBdh')
+_IDENTITY = struct.Struct('<QI')
+_CHECKSUM_SIZE = 20
+# offset of the times without timezone
+_NO_OFFSET = -0x8000
+
+
+def _commit_struct(id_size: int) -> struct.Struct:
+    """id, message, committer, committer time and offset, author, author
+    time and offset, first parent and number of parents"""
+    return struct.Struct(f'<{id_size}sQIIdhIdhIH')
+
+
+def export_dump(repository: Repository, path: str) -> None:
+    """Write the commits reachable from the tags and the tags of the
+    repository to a dump file"""
+    commits = _parents_first(repository.proxy.fetch_commits())
+    positions = {commit.id: pos for pos, commit in enumerate(commits)}
+    tags = sorted(repository.get_tags(), key=lambda tag: tag.name)
+    id_size = max((len(commit.id) for commit in commits), default=0)
+
+    strings = bytearray()
+    def string(text: str) -> Tuple[int, int]:
+        if not text:
+            return len(strings), 0
+        data = text.encode('utf-8')
+        offset = len(strings)
+        strings.extend(data)
+        return offset, len(data)
+
+    identities: Dict[str, int] = {}
+    def identity(name: str) -> int:
+        if name is None:
+            return NO_IDENTITY
+        return identities.setdefault(name, len(identities))
+
+    commit_struct = _commit_struct(id_size)
+    commit_records = bytearray()
+    parent_records = bytearray()
+    parent_count = 0
+    for commit in commits:
+        message = string(commit.message)
+        parents = [positions[parent.id] for parent in commit.parents]
+        commit_records += commit_struct.pack(
+            commit.id.encode('ascii'), *message,
+            identity(commit.committer),
+            *_pack_time(commit.committer_timestamp, commit.committer_offset),
+            identity(commit.author),
+            *_pack_time(commit.author_timestamp, commit.author_offset),
+            parent_count, len(parents))
+        for parent in parents:
+            parent_records += _PARENT.pack(parent)
+        parent_count += len(parents)
+
+    index = sorted(range(len(commits)), key=lambda pos: commits[pos].id)
+    index_records = b''.join(_PARENT.pack(pos) for pos in index)
+
+    tag_records = bytearray()
+    for tag in tags:
+        tag_records += _TAG.pack(
+            *string(tag.name), *string(tag.message), *string(tag.author),
+            positions[tag.commit.id], tag.is_annotated,
+            *_pack_time(tag._timestamp, tag._offset))
+
+    identity_records = b''.join(
+        _IDENTITY.pack(*string(name)) for name in identities)
+    name = string(repository.name)
+    header = _HEADER.pack(
+        MAGIC, VERSION, id_size, len(commits), parent_count, len(tags),
+        len(identities), len(strings), *name)
+
+    checksum = hashlib.sha1()
+    with open(path, 'wb') as dump:
+        for section in (header, commit_records, parent_records, index_records,
+                        tag_records, identity_records, strings):
+            checksum.update(section)
+            dump.write(section)
+        dump.write(checksum.digest())
+
+
+def _parents_first(commits: List[Commit]) -> List[Commit]:
+    """Order the commits so that the parents come before their children"""
+    ordered = list[Commit]()
+    visited = set[str]()
+    for commit in commits:
+        commits_to_visit = [(commit, False)]
+        while commits_to_visit:
+            commit, expanded = commits_to_visit.pop()
+            if expanded:
+                ordered.append(commit)
+                continue
+            if commit.id in visited:
+                continue
+            visited.add(commit.id)
+            commits_to_visit.append((commit, True))
+            for parent in reversed(list(commit.parents)):
+                if parent.id not in visited:
+                    commits_to_visit.append((parent, False))
+    return ordered
+
+
+class DumpRepository(RepositoryProxy):
+    """
+    A Repository proxy that reads a dump written by export_dump
+
+    The dump is memory mapped, and the records are unpacked straight from
+    the map when they are needed. The position of the commits already read
+    is kept, the others are found by a binary search on the index. The
+    whole file is checked against its checksum when verify is set.
+
+    Dumps do not store the commit trees, so diffs are not available: 
+    supports_diff is False and diff raises DiffUnavailable.
+    """
+    supports_diff = False
+
+    def __init__(self, path: str, verify: bool = True) -> None:
+        super().__init__()
+        self.path = path
+        with open(path, 'rb') as dump:
+            self.data = mmap.mmap(dump.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.data)
+        if len(self.data) < _HEADER.size + _CHECKSUM_SIZE:
+            raise ValueError(f"truncated dump: {path}")
+        magic, version, self.id_size, self.commit_count, parent_count, \
+            self.tag_count, identity_count, strings_size, name_offset, \
+            name_size = _HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"not a dump: {path}")
+        if version != VERSION:
+            raise ValueError(f"unsupported dump version {version}: {path}")
+
+        self.commit_struct = _commit_struct(self.id_size)
+        self.commits = _HEADER.size
+        self.parents = self.commits + self.commit_count*self.commit_struct.size
+        self.index = self.parents + parent_count*_PARENT.size
+        self.tags = self.index + self.commit_count*_PARENT.size
+        self.identities = self.tags + self.tag_count*_TAG.size
+        self.strings = self.identities + identity_count*_IDENTITY.size
+        self.checksum = self.strings + strings_size
+        if self.checksum + _CHECKSUM_SIZE != len(self.data):
+            raise ValueError(f"truncated dump: {path}")
+        if verify and not self.verify():
+            raise ValueError(f"corrupted dump: {path}")
+
+        self.name = self._string(name_offset, name_size)
+        self.identity_names = [
+            self._string(offset, size) for offset, size in
+            _IDENTITY.iter_unpack(self.view[self.identities:self.strings])]
+        self._identity_ids: Dict[int, int] = None
+        self.positions: Dict[str, int] = {}
+
+    def verify(self) -> bool:
+        """Check the dump content against its checksum"""
+        checksum = hashlib.sha1(self.view[:self.checksum]).digest()
+        return checksum == self.data[self.checksum:]
+
+    def fetch_tags(self, name_filter: Callable[[str], Any] = None) -> Set[Tag]:
+        tags: Set[Tag] = set()
+        for name_offset, name_size, message_offset, message_size, \
+                author_offset, author_size, commit_pos, is_annotated, time, \
+                offset in _TAG.iter_unpack(self.view[self.tags:self.identities]):
+            name = self._string(name_offset, name_size)
+            if name_filter and not name_filter(name):
+                continue
+            commit = self.repository.get_commit(self._commit_id(commit_pos))
+            if is_annotated:
+                timestamp, offset = _unpack_time(time, offset)
+                tag = Tag(self.repository, name, commit,
+                          self._string(message_offset, message_size),
+                          self._string(author_offset, author_size) or None,
+                          timestamp=timestamp, offset=offset)
+            else:
+                tag = Tag(self.repository, name, commit)
+            tags.add(tag)
+        return tags
+
+    def fetch_commit(self, commit_id: str) -> Commit:
+        pos = self.positions.get(commit_id)
+        if pos is None:
+            pos = self._find(commit_id)
+            if pos is None:
+                raise KeyError(commit_id)
+        return self._commit(pos, self.commit_struct.unpack_from(
+            self.data, self.commits + pos*self.commit_struct.size))[0]
+
+    def fetch_commit_parents(self, commit: Commit) -> CommitSet:
+        pos = self.positions.get(commit.id)
+        if pos is None:
+            pos = self._find(commit.id)
+            if pos is None:
+                raise KeyError(commit.id)
+        *_, first_parent, parent_count = self.commit_struct.unpack_from(
+            self.data, self.commits + pos*self.commit_struct.size)
+        return CommitSet(
+            self.repository.get_commit(self._commit_id(parent_pos))
+            for parent_pos in self._parent_positions(first_parent,
+                                                     parent_count))
+
+    def fetch_commits(self) -> List[Commit]:
+        """Read all the commits in a single pass over the commit records.
+
+        The parents come before their children in the dump, so each commit
+        is created with its parents already linked.
+        """
+        commits = list[Commit]()
+        table = self.repository.commit_table
+        for pos, record in enumerate(self.commit_struct.iter_unpack(
+                self.view[self.commits:self.parents])):
+            commit, first_parent, parent_count = self._commit(pos, record)
+            table.set_parents(commit.index, [
+                commits[parent_pos] for parent_pos in
+                self._parent_positions(first_parent, parent_count)])
+            commits.append(commit)
+        return commits
+
+    def diff(self, commit_a: Commit, commit_b: Commit,
+             parse_files: bool = False) -> DiffDelta:
+        raise DiffUnavailable(self.name)
+
+    def _commit(self, pos: int, record: Tuple) -> Tuple[Commit, int, int]:
+        commit_id, message_offset, message_size, committer, committer_time, \
+            committer_offset, author, author_time, author_offset, \
+            first_parent, parent_count = record
+        commit_id = commit_id.rstrip(b'\0').decode('ascii')
+        self.positions[commit_id] = pos
+        committer_time, committer_offset \
+            = _unpack_time(committer_time, committer_offset)
+        author_time, author_offset = _unpack_time(author_time, author_offset)
+        identity_ids = self._get_identity_ids()
+        commit = Commit(
+            self.repository,
+            commit_id,
+            self._string(message_offset, message_size),
+            committer_id=identity_ids.get(committer),
+            author_id=identity_ids.get(author),
+            committer_timestamp=committer_time,
+            committer_offset=committer_offset,
+            author_timestamp=author_time,
+            author_offset=author_offset)
+        return commit, first_parent, parent_count
+
+    def _get_identity_ids(self) -> Dict[int, int]:
+        """Map the dump identities to the repository identity ids. 
+        NO_IDENTITY is not mapped."""
+        if self._identity_ids is None:
+            identities = self.repository.identity_table
+            self._identity_ids = {
+                pos: identities.intern(name) 
+                for pos, name in enumerate(self.identity_names)}
+        return self._identity_ids
+
+    def _parent_positions(self, first_parent: int,
+                          parent_count: int) -> Iterator[int]:
+        start = self.parents + first_parent*_PARENT.size
+        for parent_pos, in _PARENT.iter_unpack(
+                self.view[start:start + parent_count*_PARENT.size]):
+            yield parent_pos
+
+    def _commit_id(self, pos: int) -> str:
+        start = self.commits + pos*self.commit_struct.size
+        commit_id = bytes(self.view[start:start + self.id_size])
+        commit_id = commit_id.rstrip(b'\0').decode('ascii')
+        self.positions[commit_id] = pos
+        return commit_id
+
+    def _find(self, commit_id: str) -> int:
+        """Binary search the commit position in the index"""
+        key = commit_id.encode('ascii')
+        low, high = 0, self.commit_count
+        while low < high:
+            middle = (low + high) // 2
+            pos, = _PARENT.unpack_from(
+                self.data, self.index + middle*_PARENT.size)
+            start = self.commits + pos*self.commit_struct.size
+            middle_id = self.data[start:start + self.id_size].rstrip(b'\0')
+            if middle_id < key:
+                low = middle + 1
+            elif middle_id > key:
+                high = middle
+            else:
+                self.positions[commit_id] = pos
+                return pos
+        return None
+
+    def _string(self, offset: int, size: int) -> str:
+        start = self.strings + offset
+        return str(self.view[start:start + size], 'utf-8')
+
+
+def _pack_time(timestamp: float, offset: int) -> Tuple[float, int]:
+    if timestamp is None:
+        return math.nan, _NO_OFFSET
+    return timestamp, _NO_OFFSET if offset is None else offset
+
+
+def _unpack_time(timestamp: float, offset: int) -> Tuple[float, int]:
+    if math.isnan(timestamp):
+        return None, None
+    if timestamp.is_integer():
+        timestamp = int(timestamp)
+    return timestamp, None if offset == _NO_OFFSET else offset
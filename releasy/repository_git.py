@@ -1,46 +1,130 @@
 # This module connect releasy with Git
+from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Set, Tuple
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+import hashlib
+from itertools import islice
+import mmap
+import os
+import struct
+from typing import (
+    Any, Callable, Deque, Dict, Iterable, Iterator, List, Set, Tuple)
 import pygit2
 
-from releasy.repository import Commit, CommitSet, DiffDelta, Repository, RepositoryProxy, Tag
+from releasy.cache import CommitGraphCache, DiffCache
+from releasy.repository import Commit, CommitSet, DiffDelta, LRUCache, Repository, RepositoryProxy, Tag
 
 
 class GitRepository(RepositoryProxy):
     """
     A Repository proxy to Git
+
+    When a cache_path is given, the commit graph and the tags are stored in
+    that file and loaded from it while the repository tags do not change.
+
+    When the repository has a commit-graph file (git commit-graph write), 
+    the parents are read from it instead of from the commit objects.
+
+    When a diff_cache_path is given, the diffs are stored in that file, 
+    keyed by the ids of the compared trees.
+
+    The pygit2 commits are kept in a cache of at most cache_size commits.
     """
-    def __init__(self, path) -> None:
+    def __init__(self, path, cache_path: str = None, 
+                 use_commit_graph: bool = True, 
+                 diff_cache_path: str = None,
+                 cache_size: int = 16384) -> None:
         super().__init__()
         self.path = path
         self.name = path
         self.git: pygit2.Repository = pygit2.Repository(path)
-        self.commit_cache = CommitCache(self.git)
+        self.commit_cache = CommitCache(self.git, cache_size)
+        self.commit_graph: CommitGraph = None
+        if use_commit_graph:
+            self.commit_graph = CommitGraph.open(self.git.path)
+        self.diff_cache = DiffCache(diff_cache_path) if diff_cache_path \
+                          else None
         self.repository: Repository = None
+        self.cache = CommitGraphCache(cache_path) if cache_path else None
+        self._snapshot: Tuple[Dict[str, Commit], Set[Tag]] = None
+        self._snapshot_loaded = False
+
+    def close(self) -> None:
+        """Close the diff cache and unmap the commit-graph files"""
+        if self.diff_cache:
+            self.diff_cache.close()
+            self.diff_cache = None
+        if self.commit_graph:
+            self.commit_graph.close()
+            self.commit_graph = None
 
-    def fetch_tags(self) -> Set[Tag]:
-        rtags = [ref for ref in self.git.references.objects 
-                    if ref.name.startswith('refs/tags/')]
+    def fetch_tags(self, name_filter: Callable[[str], Any] = None) -> Set[Tag]:
+        snapshot = self._load_snapshot()
+        if snapshot:
+            return set(tag for tag in snapshot[1] 
+                       if not name_filter or name_filter(tag.name))
 
+        tags = self._get_tags(name_filter=name_filter)
+        return tags
+
+    def _get_tags(self, commits: Dict[str, Commit] = None, 
+                  name_filter: Callable[[str], Any] = None) -> Set[Tag]:
         tags: Set[Tag] = set()
-        for rtag in rtags:
-            tag = self._get_tag(rtag)
+        for name, target, peeled in self._tag_refs():
+            if name_filter and not name_filter(name):
+                continue
+            tag = self._get_tag(name, target, peeled, commits)
             if tag:
                 tags.add(tag)
         return tags
 
-    def _get_tag(self, rtag: pygit2.Reference) -> Tag:
-        ref = self.git.get(rtag.target)
+    def _tag_refs(self) -> Iterator[Tuple[str, str, str]]:
+        """Yield the name, the target id and, if it is known, the peeled id 
+        of each tag, without loading any object.
+
+        The packed tags are read in bulk from the packed-refs file, which 
+        also stores the peeled ids of the annotated tags. The loose tags 
+        override the packed ones.
+        """
+        refs_path = _common_dir(self.git.path)
+        tag_refs = _read_packed_refs(os.path.join(refs_path, 'packed-refs'))
+        tags_path = os.path.join(refs_path, 'refs', 'tags')
+        for path, _, files in os.walk(tags_path):
+            for file in files:
+                if file.endswith('.lock'):
+                    continue
+                name = os.path.relpath(os.path.join(path, file), tags_path)
+                name = name.replace(os.sep, '/')
+                target = _read_loose_ref(os.path.join(path, file))
+                if target is None:
+                    rtag = self.git.references.get(f"refs/tags/{name}")
+                    if rtag is None:
+                        continue
+                    target = str(rtag.resolve().target)
+                tag_refs[f"refs/tags/{name}"] = (target, None)
+
+        for ref_name, (target, peeled) in tag_refs.items():
+            if ref_name.startswith('refs/tags/'):
+                yield ref_name[len('refs/tags/'):], target, peeled
+
+    def _get_tag(self, name: str, target: str, peeled: str = None,
+                 commits: Dict[str, Commit] = None) -> Tag:
+        def get_commit(commit_id: str) -> Commit:
+            if commits and commit_id in commits:
+                return commits[commit_id]
+            return self.repository.get_commit(commit_id)
+
+        ref = self.git.get(target)
         if ref.type == pygit2.GIT_OBJ_COMMIT:
-            commit = self.repository.get_commit(ref.hex)
+            commit = get_commit(ref.hex)
             #TODO time
-            tag = Tag(self.repository, rtag.shorthand, commit)
+            tag = Tag(self.repository, name, commit)
             return tag                
         elif ref.type == pygit2.GIT_OBJ_TAG: # annotatted tag
-            peel = rtag.peel()
+            peel = self.git.get(peeled) if peeled else ref.peel(None)
             if peel.type == pygit2.GIT_OBJ_COMMIT:
-                commit = self.repository.get_commit(rtag.peel().hex)
+                commit = get_commit(peel.hex)
                 rtag_ref: pygit2.Tag = ref
                 try:
                     message = rtag_ref.message
@@ -48,39 +132,102 @@ class GitRepository(RepositoryProxy):
                     message = ''
                 if rtag_ref.tagger:
                     tagger = f"{rtag_ref.tagger.name} <{rtag_ref.tagger.email}>"
-                    time_tzinfo = timezone(timedelta(minutes=rtag_ref.tagger.offset))
-                    time = datetime.fromtimestamp(float(rtag_ref.tagger.time), time_tzinfo)
-                    tag = Tag(self.repository, rtag.shorthand, commit, message, tagger, 
-                            time)
+                    tag = Tag(self.repository, name, commit, message, tagger, 
+                              timestamp=rtag_ref.tagger.time,
+                              offset=rtag_ref.tagger.offset)
                 else:
-                    tag = Tag(self.repository, rtag.shorthand, commit, message)
+                    tag = Tag(self.repository, name, commit, message)
                 return tag
         return None
 
     def fetch_commit(self, commit_id: str) -> Commit:
+        snapshot = self._load_snapshot()
+        if snapshot and commit_id in snapshot[0]:
+            return snapshot[0][commit_id]
+
         rcommit = self.commit_cache.fetch_commit(commit_id)
+        commit = self._build_commit(rcommit)
+        return commit
+
+    def fetch_commits(self) -> List[Commit]:
+        """Load all the commits reachable from the tags with a single revwalk.
+
+        The walk visits the parents before their children, so each commit 
+        is created with its parents already linked.
+        """
+        snapshot = self._load_snapshot()
+        if snapshot:
+            return list(snapshot[0].values())
 
-        committer_tzinfo = timezone(timedelta(minutes=rcommit.committer.offset))
-        committer_time = datetime.fromtimestamp(float(rcommit.committer.time), committer_tzinfo)
-        author_tzinfo = timezone(timedelta(minutes=rcommit.author.offset))
-        author_time = datetime.fromtimestamp(float(rcommit.author.time), author_tzinfo)
+        commits = self._walk_commits()
+        if self.cache:
+            self._snapshot = (commits, self._get_tags(commits))
+            self.cache.save(self._refs_key(), commits.values(), 
+                            self._snapshot[1])
+        return list(commits.values())
 
+    def _walk_commits(self) -> Dict[str, Commit]:
+        walker = self.git.walk(None, 
+            pygit2.GIT_SORT_TOPOLOGICAL | pygit2.GIT_SORT_REVERSE)
+        has_tags = False
+        for rtag in self.git.references.objects:
+            if rtag.name.startswith('refs/tags/'):
+                target = rtag.peel()
+                if target.type == pygit2.GIT_OBJ_COMMIT:
+                    walker.push(target.id)
+                    has_tags = True
+        if not has_tags:
+            return {}
+
+        commits: Dict[str, Commit] = {}
+        table = self.repository.commit_table
+        for rcommit in walker:
+            commit = self._build_commit(rcommit)
+            table.set_parents(commit.index, [
+                commits[parent_id.hex] for parent_id in rcommit.parent_ids])
+            commits[commit.id] = commit
+        return commits
+
+    def _load_snapshot(self) -> Tuple[Dict[str, Commit], Set[Tag]]:
+        if self.cache and not self._snapshot_loaded:
+            self._snapshot = self.cache.load(self.repository, self._refs_key())
+            self._snapshot_loaded = True
+        return self._snapshot
+
+    def _refs_key(self) -> str:
+        """Digest of the tag refs, which identifies the cached commit graph"""
+        refs = sorted(
+            f"refs/tags/{name} {target}" for name, target, _ in self._tag_refs())
+        return hashlib.sha1('\n'.join(refs).encode()).hexdigest()
+
+    def _build_commit(self, rcommit: pygit2.Commit) -> Commit:
         try:
-            message = rcommit.name,
+            message = rcommit.message
         except:
             message = ''
 
+        committer = rcommit.committer
+        author = rcommit.author
+        identities = self.repository.identity_table
         commit = Commit(
             self.repository,
             rcommit.hex,
             message,
-            f"{rcommit.committer.name} <{rcommit.committer.email}>",
-            committer_time,
-            f"{rcommit.author.name} <{rcommit.author.email}>",
-            author_time)
+            committer_id=identities.intern(committer.name, committer.email),
+            author_id=identities.intern(author.name, author.email),
+            committer_timestamp=rcommit.committer.time,
+            committer_offset=rcommit.committer.offset,
+            author_timestamp=rcommit.author.time,
+            author_offset=rcommit.author.offset)
         return commit
 
     def fetch_commit_parents(self, commit: Commit) -> CommitSet:
+        if self.commit_graph:
+            parent_ids = self.commit_graph.parents(commit.id)
+            if parent_ids is not None:
+                return CommitSet(self.repository.get_commit(parent_id) 
+                                 for parent_id in parent_ids)
+
         commit_ref: pygit2.Commit = self.commit_cache.fetch_commit(commit.id)
         parents = CommitSet()
         for parent_ref in commit_ref.parents:
@@ -89,33 +236,357 @@ class GitRepository(RepositoryProxy):
         return parents
 
     def diff(self, commit_a: Commit, commit_b: Commit, parse_delta:bool = False) -> DiffDelta:
-        diff_result = self.git.diff(commit_a.id, commit_b.id)
-
-        files = set()
-        if parse_delta:
-            for delta in diff_result.deltas:
-                if delta.new_file.path:
-                    files.add(delta.new_file.path)
-                if delta.old_file.path:
-                    files.add(delta.old_file.path)
-
-        delta = DiffDelta(
-            diff_result.stats.insertions, 
-            diff_result.stats.deletions,
-            diff_result.stats.files_changed,
-            files)
+        pair = (commit_a.id, commit_b.id)
+        cached_diffs = self._get_cached_diffs([pair], parse_delta)
+        if cached_diffs[0][1]:
+            return cached_diffs[0][1]
+        deltas = _diff_chunk([pair], parse_delta, self.git)
+        delta, = self._merge_diffs(cached_diffs, deltas, parse_delta)
         return delta
 
-class CommitCache:
+    def diff_many(self, pairs: Iterable[Tuple[Commit, Commit]], 
+                  parse_files: bool = False, workers: int = None, 
+                  chunk_size: int = 64) -> Iterator[DiffDelta]:
+        """Compute the diffs in a pool of worker processes.
+
+        Each worker opens its own pygit2 repository and receives the pairs 
+        in chunks. The results are streamed back in the input order. Diffs 
+        found in the diff cache are not sent to the workers.
+        """
+        workers = workers or os.cpu_count()
+        pairs = ((commit_a.id, commit_b.id) for commit_a, commit_b in pairs)
+        chunks = iter(lambda: list(islice(pairs, chunk_size)), [])
+        if workers == 1:
+            for chunk in chunks:
+                cached_diffs = self._get_cached_diffs(chunk, parse_files)
+                missing = [pair for pair, (_, delta) 
+                           in zip(chunk, cached_diffs) if not delta]
+                deltas = _diff_chunk(missing, parse_files, self.git)
+                yield from self._merge_diffs(cached_diffs, deltas, parse_files)
+            return
+
+        with ProcessPoolExecutor(workers, initializer=_open_worker_git,
+                                 initargs=(self.git.path,)) as executor:
+            pending: Deque[Tuple[List, Future]] = deque()
+            try:
+                for chunk in chunks:
+                    cached_diffs = self._get_cached_diffs(chunk, parse_files)
+                    missing = [pair for pair, (_, delta) 
+                               in zip(chunk, cached_diffs) if not delta]
+                    pending.append((cached_diffs, executor.submit(
+                        _diff_chunk, missing, parse_files)))
+                    if len(pending) > 2*workers:
+                        cached_diffs, future = pending.popleft()
+                        yield from self._merge_diffs(
+                            cached_diffs, future.result(), parse_files)
+                while pending:
+                    cached_diffs, future = pending.popleft()
+                    yield from self._merge_diffs(
+                        cached_diffs, future.result(), parse_files)
+            finally:
+                for _, future in pending:
+                    future.cancel()
+
+    def _get_cached_diffs(self, pairs: List[Tuple[str, str]], 
+                          parse_files: bool) -> List[Tuple[Tuple, DiffDelta]]:
+        """Return the tree ids of each pair with its cached diff, if any"""
+        if not self.diff_cache:
+            return [(None, None)] * len(pairs)
+
+        cached_diffs = []
+        for commit_a, commit_b in pairs:
+            trees = (self.commit_cache.fetch_commit(commit_a).tree_id.hex,
+                     self.commit_cache.fetch_commit(commit_b).tree_id.hex)
+            cached_diffs.append(
+                (trees, self.diff_cache.get(*trees, parse_files)))
+        return cached_diffs
+
+    def _merge_diffs(self, cached_diffs: List[Tuple[Tuple, DiffDelta]],
+                     deltas: List[DiffDelta], 
+                     parse_files: bool) -> Iterator[DiffDelta]:
+        """Fill the missing cached diffs with the computed ones"""
+        deltas = iter(deltas)
+        for trees, delta in cached_diffs:
+            if not delta:
+                delta = next(deltas)
+                if trees:
+                    self.diff_cache.put(*trees, delta, parse_files)
+            yield delta
+
+
+def _common_dir(git_path: str) -> str:
+    """The directory that stores the refs, which is shared by worktrees"""
+    common_dir_path = os.path.join(git_path, 'commondir')
+    if os.path.exists(common_dir_path):
+        with open(common_dir_path) as common_dir:
+            return os.path.normpath(
+                os.path.join(git_path, common_dir.read().strip()))
+    return git_path
+
+
+def _read_packed_refs(path: str) -> Dict[str, Tuple[str, str]]:
+    """Read the target and the peeled ids of each ref in a packed-refs file.
+
+    The peeled id is the one in the ^ line that follows an annotated tag.
+    It is None when it is not in the file.
+    """
+    refs: Dict[str, Tuple[str, str]] = {}
+    if not os.path.exists(path):
+        return refs
+    ref_name = None
+    with open(path) as packed_refs:
+        for line in packed_refs:
+            if line.startswith('#'):
+                continue
+            line = line.rstrip()
+            if line.startswith('^'):
+                if ref_name:
+                    refs[ref_name] = (refs[ref_name][0], line[1:])
+                continue
+            target, _, ref_name = line.partition(' ')
+            if ref_name:
+                refs[ref_name] = (target, None)
+    return refs
+
+
+def _read_loose_ref(path: str) -> str:
+    """Read the target id of a loose ref, or None if it is symbolic"""
+    try:
+        with open(path) as loose_ref:
+            target = loose_ref.read().strip()
+    except OSError:
+        return None
+    if target.startswith('ref:'):
+        return None
+    return target
+
+
+_worker_git: pygit2.Repository = None
+
+def _open_worker_git(path: str) -> None:
+    global _worker_git
+    _worker_git = pygit2.Repository(path)
+
+
+def _diff_chunk(chunk: List[Tuple[str, str]], parse_files: bool,
+                git: pygit2.Repository = None) -> List[DiffDelta]:
+    git = git or _worker_git
+    return [_diff(git, commit_a, commit_b, parse_files) 
+            for commit_a, commit_b in chunk]
+
+
+def _diff(git: pygit2.Repository, commit_a: str, commit_b: str, 
+          parse_delta: bool) -> DiffDelta:
+    diff_result = git.diff(commit_a, commit_b)
+
+    files = set()
+    if parse_delta:
+        for delta in diff_result.deltas:
+            if delta.new_file.path:
+                files.add(delta.new_file.path)
+            if delta.old_file.path:
+                files.add(delta.old_file.path)
+
+    delta = DiffDelta(
+        diff_result.stats.insertions, 
+        diff_result.stats.deletions,
+        diff_result.stats.files_changed,
+        files)
+    return delta
+
+
+class CommitCache(LRUCache):
     """
     Implement a cache to improve fech commit performance
+
+    It keeps the max_size most recently used pygit2 commits.
     """
-    def __init__(self, git: pygit2.Repository) -> None:
-        self.git =  git
-        self.cache: Dict[str, pygit2.Commit] = {}
+    def __init__(self, git: pygit2.Repository, max_size: int = 16384) -> None:
+        super().__init__(max_size)
+        self.git = git
 
     def fetch_commit(self, commit_id: str) -> pygit2.Commit:
-        if commit_id not in self.cache:
-            commit_ref: pygit2.Commit = self.git.get(commit_id)
-            self.cache[commit_id] = commit_ref
-        return self.cache[commit_id]
+        commit_ref: pygit2.Commit = self.get(commit_id)
+        if commit_ref is None:
+            commit_ref = self.git.get(commit_id)
+            self.put(commit_id, commit_ref)
+        return commit_ref
+
+
+class CommitGraph:
+    """
+    Read the Git commit-graph files, which store the parents, the generation 
+    number and the commit time of the commits. 
+
+    It supports both a single commit-graph file and a chain of split files. 
+    The files are memory mapped and answer queries without reading the 
+    commit objects. Commits that are not in the files return None.
+    """
+    NO_PARENT = 0x70000000
+    EXTRA_EDGES = 0x80000000
+
+    def __init__(self, paths: List[str]) -> None:
+        self.layers: List[CommitGraphFile] = []
+        offset = 0
+        for path in paths:
+            layer = CommitGraphFile(path, offset)
+            self.layers.append(layer)
+            offset += layer.size
+        self.size = offset
+
+    @staticmethod
+    def open(git_path: str) -> CommitGraph:
+        """Open the commit-graph of a git directory, if there is one"""
+        info_path = os.path.join(git_path, 'objects', 'info')
+        chain_path = os.path.join(info_path, 'commit-graphs', 
+                                  'commit-graph-chain')
+        if os.path.exists(chain_path):
+            with open(chain_path) as chain:
+                paths = [
+                    os.path.join(info_path, 'commit-graphs', 
+                                 f"graph-{graph_hash.strip()}.graph")
+                    for graph_hash in chain if graph_hash.strip()]
+        elif os.path.exists(os.path.join(info_path, 'commit-graph')):
+            paths = [os.path.join(info_path, 'commit-graph')]
+        else:
+            return None
+
+        try:
+            return CommitGraph(paths)
+        except (OSError, ValueError):
+            return None
+
+    def close(self) -> None:
+        for layer in self.layers:
+            layer.data.close()
+
+    def __contains__(self, commit_id: str) -> bool:
+        return self.position(commit_id) is not None
+
+    def position(self, commit_id: str) -> int:
+        """Return the commit position in the graph"""
+        oid = bytes.fromhex(commit_id)
+        for layer in self.layers:
+            pos = layer.find(oid)
+            if pos is not None:
+                return layer.offset + pos
+        return None
+
+    def parents(self, commit_id: str) -> List[str]:
+        pos = self.position(commit_id)
+        if pos is None:
+            return None
+        return [self._commit_id(parent_pos) 
+                for parent_pos in self._parent_positions(pos)]
+
+    def generation(self, commit_id: str) -> int:
+        """Return the topological level of the commit"""
+        pos = self.position(commit_id)
+        if pos is None:
+            return None
+        layer, pos = self._layer(pos)
+        return layer.generation(pos)
+
+    def commit_time(self, commit_id: str) -> int:
+        pos = self.position(commit_id)
+        if pos is None:
+            return None
+        layer, pos = self._layer(pos)
+        return layer.commit_time(pos)
+
+    def _layer(self, pos: int) -> Tuple[CommitGraphFile, int]:
+        for layer in self.layers:
+            if pos < layer.offset + layer.size:
+                return layer, pos - layer.offset
+        raise IndexError(pos)
+
+    def _commit_id(self, pos: int) -> str:
+        layer, pos = self._layer(pos)
+        return layer.oid(pos).hex()
+
+    def _parent_positions(self, pos: int) -> List[int]:
+        layer, local_pos = self._layer(pos)
+        first_parent, second_parent = layer.parents(local_pos)
+        if first_parent == CommitGraph.NO_PARENT:
+            return []
+        if second_parent == CommitGraph.NO_PARENT:
+            return [first_parent]
+        if not second_parent & CommitGraph.EXTRA_EDGES:
+            return [first_parent, second_parent]
+
+        parents = [first_parent]
+        edge = second_parent & ~CommitGraph.EXTRA_EDGES
+        while True:
+            parent = layer.edge(edge)
+            parents.append(parent & ~CommitGraph.EXTRA_EDGES)
+            if parent & CommitGraph.EXTRA_EDGES:
+                return parents
+            edge += 1
+
+
+class CommitGraphFile:
+    """A single memory mapped commit-graph file"""
+    def __init__(self, path: str, offset: int) -> None:
+        self.offset = offset
+        with open(path, 'rb') as graph_file:
+            self.data = mmap.mmap(graph_file.fileno(), 0, 
+                                  access=mmap.ACCESS_READ)
+
+        signature, version, hash_version, chunk_count = struct.unpack_from(
+            '>4sBBB', self.data, 0)
+        if signature != b'CGPH' or version != 1:
+            raise ValueError(f"invalid commit-graph file: {path}")
+        self.hash_size = 20 if hash_version == 1 else 32
+
+        chunks: Dict[bytes, int] = {}
+        for i in range(chunk_count):
+            chunk_id, chunk_offset = struct.unpack_from(
+                '>4sQ', self.data, 8 + 12*i)
+            chunks[chunk_id] = chunk_offset
+        if not {b'OIDF', b'OIDL', b'CDAT'} <= chunks.keys():
+            raise ValueError(f"incomplete commit-graph file: {path}")
+        self.fanout = struct.unpack_from('>256I', self.data, chunks[b'OIDF'])
+        self.oids = chunks[b'OIDL']
+        self.cdat = chunks[b'CDAT']
+        self.edges = chunks.get(b'EDGE')
+        self.size = self.fanout[255]
+
+    def oid(self, pos: int) -> bytes:
+        start = self.oids + pos*self.hash_size
+        return self.data[start:start + self.hash_size]
+
+    def find(self, oid: bytes) -> int:
+        """Binary search the oid position using the fanout table"""
+        low = self.fanout[oid[0] - 1] if oid[0] else 0
+        high = self.fanout[oid[0]]
+        while low < high:
+            middle = (low + high) // 2
+            middle_oid = self.oid(middle)
+            if middle_oid < oid:
+                low = middle + 1
+            elif middle_oid > oid:
+                high = middle
+            else:
+                return middle
+        return None
+
+    def parents(self, pos: int) -> Tuple[int, int]:
+        return struct.unpack_from(
+            '>II', self.data, self.cdat + pos*(self.hash_size + 16) 
+                              + self.hash_size)
+
+    def generation(self, pos: int) -> int:
+        generation, = struct.unpack_from(
+            '>I', self.data, self.cdat + pos*(self.hash_size + 16) 
+                             + self.hash_size + 8)
+        return generation >> 2
+
+    def commit_time(self, pos: int) -> int:
+        high, low = struct.unpack_from(
+            '>II', self.data, self.cdat + pos*(self.hash_size + 16) 
+                              + self.hash_size + 8)
+        return ((high & 0b11) << 32) | low
+
+    def edge(self, pos: int) -> int:
+        edge, = struct.unpack_from('>I', self.data, self.edges + 4*pos)
+        return edge
@@ -0,0 +1,288 @@
+# This module connect releasy with Git through the git command line
+from __future__ import annotations
+
+from functools import lru_cache
+import subprocess
+from typing import (
+    IO, Any, Callable, Dict, Iterator, List, Set, Tuple)
+import weakref
+
+from releasy.repository import (
+    Commit, CommitSet, DiffDelta, Repository, RepositoryProxy, Tag)
+
+
+class GitCliRepository(RepositoryProxy):
+    """
+    A Repository proxy to Git that drives git subprocesses instead of pygit2
+
+    The objects are read from a long-lived git cat-file --batch process, and
+    fetch_commits streams the whole commit graph from a single git rev-list.
+    Both outputs are parsed incrementally from large buffered reads. It is
+    interchangeable with GitRepository and does not require libgit2.
+
+    The subprocesses are started on demand and stopped by close().
+    """
+    READ_SIZE = 1 << 20
+
+    def __init__(self, path: str, git: str = 'git') -> None:
+        super().__init__()
+        self.path = path
+        self.name = path
+        self.git = git
+        self.repository: Repository = None
+        self.parent_ids: Dict[str, List[str]] = {}
+        self._objects: ObjectReader = None
+
+    def close(self) -> None:
+        if self._objects:
+            self._objects.close()
+            self._objects = None
+
+    def fetch_tags(self, name_filter: Callable[[str], Any] = None) -> Set[Tag]:
+        tags: Set[Tag] = set()
+        for name, *ref in self._tag_refs():
+            if name_filter and not name_filter(name):
+                continue
+            tag = self._get_tag(name, *ref)
+            if tag:
+                tags.add(tag)
+        return tags
+
+    def _tag_refs(self) -> Iterator[Tuple[str, str, str, str, str]]:
+        """Yield the name, the target type and id, and the type and id of 
+        the object the target points to, of each tag, without reading any 
+        object"""
+        output = self._run(
+            'for-each-ref', '--format=%(refname:strip=2) %(objecttype) '
+            '%(objectname) %(*objecttype) %(*objectname)', 'refs/tags')
+        for line in output.decode('utf-8', 'replace').splitlines():
+            name, target_type, target, peeled_type, peeled = line.split(' ')
+            yield name, target_type, target, peeled_type, peeled
+
+    def _get_tag(self, name: str, target_type: str, target: str,
+                 peeled_type: str, peeled: str) -> Tag:
+        if target_type == 'commit':
+            commit = self.repository.get_commit(target)
+            tag = Tag(self.repository, name, commit)
+            return tag
+        elif target_type == 'tag': # annotatted tag
+            if peeled_type == 'tag': # tag of a tag
+                peeled, peeled_type, _ = self._get_objects().read(
+                    f"{target}^{{}}")
+            if peeled_type != 'commit':
+                return None
+            commit = self.repository.get_commit(peeled)
+            headers, message = _parse_object(
+                self._get_objects().read(target)[2])
+            if 'tagger' in headers:
+                tagger, timestamp, offset \
+                    = _parse_signature(headers['tagger'][0])
+                tag = Tag(self.repository, name, commit, message, tagger,
+                          timestamp=timestamp, offset=offset)
+            else:
+                tag = Tag(self.repository, name, commit, message)
+            return tag
+        return None
+
+    def fetch_commit(self, commit_id: str) -> Commit:
+        _, _, data = self._get_objects().read(commit_id)
+        headers, message = _parse_object(data)
+        self.parent_ids[commit_id] = headers.get('parent', [])
+        committer, committer_timestamp, committer_offset \
+            = _parse_signature(headers['committer'][0])
+        author, author_timestamp, author_offset \
+            = _parse_signature(headers['author'][0])
+        commit = Commit(
+            self.repository,
+            commit_id,
+            message,
+            committer,
+            author=author,
+            committer_timestamp=committer_timestamp,
+            committer_offset=committer_offset,
+            author_timestamp=author_timestamp,
+            author_offset=author_offset)
+        return commit
+
+    def fetch_commit_parents(self, commit: Commit) -> CommitSet:
+        parent_ids = self.parent_ids.get(commit.id)
+        if parent_ids is None:
+            self.fetch_commit(commit.id)
+            parent_ids = self.parent_ids[commit.id]
+        return CommitSet(self.repository.get_commit(parent_id)
+                         for parent_id in parent_ids)
+
+    def fetch_commits(self) -> List[Commit]:
+        """Load all the commits reachable from the tags with a single
+        git rev-list.
+
+        The commits are listed with their parents before their children, so
+        each commit is created with its parents already linked.
+        """
+        heads = set[str]()
+        for _, target_type, target, peeled_type, peeled in self._tag_refs():
+            if target_type == 'commit':
+                heads.add(target)
+            elif target_type == 'tag':
+                if peeled_type == 'tag':
+                    peeled, peeled_type, _ = self._get_objects().read(
+                        f"{target}^{{}}")
+                if peeled_type == 'commit':
+                    heads.add(peeled)
+        if not heads:
+            return []
+
+        process = subprocess.Popen(
+            [self.git, '-C', self.path, 'rev-list', '--reverse',
+             '--topo-order', '--parents', '--date=raw', '--stdin',
+             f"--format={_COMMIT_FORMAT}"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            bufsize=GitCliRepository.READ_SIZE)
+        process.stdin.write(''.join(f"{head}\n" for head in heads).encode())
+        process.stdin.close()
+
+        commits: Dict[str, Commit] = {}
+        identities = self.repository.identity_table
+        table = self.repository.commit_table
+        with process:
+            for fields in _read_fields(process.stdout, _COMMIT_FIELDS,
+                                       GitCliRepository.READ_SIZE):
+                ids = fields[0].lstrip('\n').split('\n', 1)
+                author_name = ids[1]
+                commit_id, *parent_ids = ids[0].split(' ')[1:]
+                committer_timestamp, _, committer_offset \
+                    = fields[5].partition(' ')
+                author_timestamp, _, author_offset = fields[2].partition(' ')
+                commit = Commit(
+                    self.repository,
+                    commit_id,
+                    fields[6],
+                    committer_id=identities.intern(fields[3], fields[4]),
+                    author_id=identities.intern(author_name, fields[1]),
+                    committer_timestamp=int(committer_timestamp),
+                    committer_offset=_parse_offset(committer_offset),
+                    author_timestamp=int(author_timestamp),
+                    author_offset=_parse_offset(author_offset))
+                table.set_parents(commit.index, [
+                    commits[parent_id] for parent_id in parent_ids])
+                commits[commit_id] = commit
+        if process.returncode:
+            raise RuntimeError(f"git rev-list failed in {self.path}")
+        return list(commits.values())
+
+    def diff(self, commit_a: Commit, commit_b: Commit,
+             parse_delta: bool = False) -> DiffDelta:
+        output = self._run('diff', '--numstat', '-z', '--no-renames',
+                           commit_a.id, commit_b.id)
+        insertions = deletions = files_changed = 0
+        files = set()
+        for line in output.decode('utf-8', 'replace').split('\0'):
+            if not line:
+                continue
+            added, deleted, path = line.split('\t', 2)
+            files_changed += 1
+            if added != '-':
+                insertions += int(added)
+                deletions += int(deleted)
+            if parse_delta:
+                files.add(path)
+        return DiffDelta(insertions, deletions, files_changed, files)
+
+    def _get_objects(self) -> ObjectReader:
+        if not self._objects:
+            self._objects = ObjectReader(self.git, self.path)
+        return self._objects
+
+    def _run(self, *args) -> bytes:
+        return subprocess.run([self.git, '-C', self.path, *args],
+                              stdout=subprocess.PIPE, check=True).stdout
+
+
+class ObjectReader:
+    """Read objects from a long-lived git cat-file --batch process"""
+    def __init__(self, git: str, path: str) -> None:
+        self.process = subprocess.Popen(
+            [git, '-C', path, 'cat-file', '--batch'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            bufsize=GitCliRepository.READ_SIZE)
+        self._finalizer = weakref.finalize(self, _stop, self.process)
+
+    def close(self) -> None:
+        self._finalizer()
+
+    def read(self, name: str) -> Tuple[str, str, bytes]:
+        """Return the id, the type and the content of an object. The name 
+        can be any revision, e.g., tag^{} to peel a tag."""
+        self.process.stdin.write(f"{name}\n".encode())
+        self.process.stdin.flush()
+        header = self.process.stdout.readline().decode().split()
+        if len(header) != 3:
+            raise KeyError(name)
+        object_id, object_type, size = header
+        data = self.process.stdout.read(int(size) + 1)[:-1]
+        return object_id, object_type, data
+
+
+def _stop(process: subprocess.Popen) -> None:
+    process.stdin.close()
+    process.wait()
+    process.stdout.close()
+
+
+# rev-list --format fields, separated by NUL. The first field starts with
+# the commit id and parents line, before the author name.
+_COMMIT_FORMAT = '%an%x00%ae%x00%ad%x00%cn%x00%ce%x00%cd%x00%B%x00'
+_COMMIT_FIELDS = 7
+
+
+def _read_fields(stream: IO[bytes], count: int,
+                 read_size: int) -> Iterator[List[str]]:
+    """Yield the NUL separated fields of a stream in groups of count"""
+    fields: List[str] = []
+    partial = b''
+    while True:
+        chunk = stream.read(read_size)
+        if not chunk:
+            break
+        chunk_fields = (partial + chunk).split(b'\0')
+        partial = chunk_fields.pop()
+        for field in chunk_fields:
+            fields.append(field.decode('utf-8', 'replace'))
+            if len(fields) == count:
+                yield fields
+                fields = []
+
+
+def _parse_object(data: bytes) -> Tuple[Dict[str, List[str]], str]:
+    """Parse the headers and the message of a commit or tag object"""
+    text = data.decode('utf-8', 'replace')
+    header_text, _, message = text.partition('\n\n')
+    headers: Dict[str, List[str]] = {}
+    for line in header_text.split('\n'):
+        if line.startswith(' '): # continuation of a multi-line header
+            continue
+        key, _, value = line.partition(' ')
+        headers.setdefault(key, []).append(value)
+    return headers, message
+
+
+def _parse_signature(signature: str) -> Tuple[str, int, int]:
+    """Parse 'Name <email> timestamp offset' into the identity, the 
+    timestamp and the offset in minutes"""
+    identity, _, raw_time = signature.rpartition('> ')
+    return (f"{identity}>", *_parse_time(raw_time))
+
+
+def _parse_time(raw_time: str) -> Tuple[int, int]:
+    """Parse a raw git date, e.g., '1600000000 -0300', into the timestamp 
+    and the offset in minutes"""
+    timestamp, _, offset = raw_time.partition(' ')
+    return int(timestamp), _parse_offset(offset)
+
+
+@lru_cache(maxsize=None)
+def _parse_offset(offset: str) -> int:
+    minutes = int(offset[1:3]) * 60 + int(offset[3:5]) if offset else 0
+    if offset.startswith('-'):
+        minutes = -minutes
+    return minutes
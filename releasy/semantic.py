@@ -1,12 +1,11 @@
 from __future__ import annotations
-from collections import OrderedDict
 
-from typing import Callable, Generic, Iterator, Set, TypeVar
+from typing import Iterator, Set, TypeVar
 
 import datetime
 
 from .project import Project
-from .release import Release, ReleaseSet
+from .release import OrderedReleaseSet, Release, ReleaseSet
 from .repository import CommitSet
 
 
@@ -71,7 +70,7 @@ class MainRelease(SemanticRelease):
         if self.prev_main_release:
             ref = self.prev_main_release.time
         elif self.commits:
-            ref = self.commits.first(lambda c: c.author_time).author_time
+            ref = self.commits.first(lambda c: c.author_timestamp).author_time
         else:
             return datetime.timedelta(0)
         return self.time - ref
@@ -80,7 +79,7 @@ class MainRelease(SemanticRelease):
     def delay(self) -> datetime.timedelta:
         if self.prev_main_release and self.commits:
             ref = self.release.commits.first(
-                lambda c: c.author_time).author_time
+                lambda c: c.author_timestamp).author_time
             return ref - self.prev_main_release.time
         else:
             return datetime.timedelta(0)
@@ -98,23 +97,25 @@ class Patch(FinalRelease):
         if self.base_release:
             ref = self.base_release.time
         else:
-            ref = self.commits.first(lambda c: c.author_time).author_time
+            ref = self.commits.first(lambda c: c.author_timestamp).author_time
         return self.time - ref
 
     @property
     def delay(self) -> datetime.timedelta:
         if self.base_release:
             ref = self.release.commits.first(
-                lambda c: c.author_time).author_time
+                lambda c: c.author_timestamp).author_time
             return ref - self.base_release.time
         else:
             return datetime.timedelta(0)
 
 
 SR = TypeVar('SR')
-class SReleaseSet(Generic[SR]):
+class SReleaseSet(OrderedReleaseSet[SR]):
+    """An ordered set of semantic releases"""
     def __init__(self, sreleases: Set[SR] = None) -> None:
-        self._sreleases = OrderedDict[str, SR]()
+        super().__init__()
+        self._sreleases = self._named
         if sreleases:
             for srelease in sreleases:
                 self.add(srelease)
@@ -135,8 +136,7 @@ class SReleaseSet(Generic[SR]):
 
     def __getitem__(self, key) -> SR:
         if isinstance(key, int):
-            release_name = list(self._sreleases.keys())[key]
-            return self._sreleases[release_name]
+            return self._ordered()[key]
         elif isinstance(key, str):
             return self._sreleases[key]
         else:
@@ -146,10 +146,8 @@ class SReleaseSet(Generic[SR]):
         return str(set(self._sreleases.keys()))
 
     def commits(self) -> CommitSet():
-        commits = CommitSet()
-        for srelease in self._sreleases.values():
-            commits.update(srelease.commits)
-        return commits
+        return CommitSet().union(
+            *(srelease.commits for srelease in self._sreleases.values()))
 
     @property
     def names(self) -> Set[str]:
@@ -168,35 +166,16 @@ class SReleaseSet(Generic[SR]):
                 prefixes.add(prefix)
         return prefixes
 
-    def first(self, func: Callable = None) -> SR:
-        if self._sreleases:
-            if func:
-                ordered_sreleases = sorted(self._sreleases.values(), key=func)
-            else:
-                ordered_sreleases = list(self._sreleases.values())
-            return ordered_sreleases[0]
-        else:
-            return None
-
-    def last(self, func: Callable = None) -> SR:
-        if self._sreleases:
-            if func:
-                ordered_sreleases = sorted(self._sreleases.values(), key=func)
-            else:
-                ordered_sreleases = list(self._sreleases.values())
-            return ordered_sreleases[-1]
-        else:
-            return None
-
     def __or__(self, __o: SReleaseSet[SR]) -> SReleaseSet[SR]:
         sreleases = SReleaseSet[SR]()
-        sreleases.update(self.all)
-        sreleases.update(__o.all)
+        sreleases._sreleases.update(self._sreleases)
+        sreleases.update(__o)
         return sreleases
 
     def add(self, srelease: SR) -> None:
         if srelease and srelease.name not in self._sreleases:
             self._sreleases[srelease.name] = srelease
+            self._changed()
 
     def update(self, sreleases: SR) -> None:
         for srelease in sreleases:
@@ -1,6 +1,8 @@
-from typing import Set
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Set
 from datetime import datetime, timedelta
-from releasy.repository import Commit, CommitSet, Repository, RepositoryProxy, Tag
+import random
+from releasy.repository import Commit, CommitSet, DiffDelta, Repository, RepositoryProxy, Tag
 
 
 class MockRepositoryProxy(RepositoryProxy):
@@ -8,9 +10,7 @@ class MockRepositoryProxy(RepositoryProxy):
         super().__init__()
         self.ref_dt = ref_dt
         self.name = 'mock'
-
-    def fetch_tags(self) -> Set[Tag]:
-        tag_refs = {
+        self.tag_refs = {
             "0.0.0-alpha1":  '0',
             "v0.9.0":        '1',
             "0.10.1":        '5',
@@ -31,8 +31,11 @@ class MockRepositoryProxy(RepositoryProxy):
             "v4.0.0":        '21'
         }
 
+    def fetch_tags(self, name_filter: Callable[[str], Any] = None) -> Set[Tag]:
         tags: Set[Tag] = set()
-        for tag_ref, commit_ref in tag_refs.items():
+        for tag_ref, commit_ref in self.tag_refs.items():
+            if name_filter and not name_filter(tag_ref):
+                continue
             tag = Tag(self.repository, tag_ref, self.repository.get_commit(commit_ref))
             tags.add(tag)
 
@@ -112,8 +115,12 @@ class MockRepositoryProxy(RepositoryProxy):
                 parents.add(parent)
         return parents
 
-    def diff(self, commit_a: Commit, commit_b: Commit):
-        pass
+    def diff(self, commit_a: Commit, commit_b: Commit, 
+             parse_files: bool = False) -> DiffDelta:
+        insertions = int(commit_a.id)
+        deletions = int(commit_b.id)
+        files = set([f"{commit_a.id}.txt"]) if parse_files else set()
+        return DiffDelta(insertions, deletions, 1, files)
 
 
 class MockRepository(Repository):
@@ -121,3 +128,81 @@ class MockRepository(Repository):
     
     def __init__(self):
         super().__init__(MockRepositoryProxy(MockRepository.ref_dt))
+
+
+class DagRepositoryProxy(RepositoryProxy):
+    """A history given by the parents of each commit and the tag commits.
+
+    The commit ids are numbers and the commit times follow them. 
+    DagRepositoryProxy.random generates an arbitrary history, with merges 
+    and several roots, to compare the miners on histories of any shape.
+    """
+    def __init__(self, parent_refs: Dict[str, List[str]], 
+                 tag_refs: Dict[str, str]) -> None:
+        super().__init__()
+        self.name = 'dag'
+        self.ref_dt = MockRepository.ref_dt
+        self.parent_refs = parent_refs
+        self.tag_refs = tag_refs
+
+    @classmethod
+    def random(cls, seed: int, commits: int = 30, 
+               tags: int = 5) -> DagRepositoryProxy:
+        rand = random.Random(seed)
+        parent_refs = {}
+        for pos in range(commits):
+            candidates = [str(parent) for parent in range(max(0, pos - 8), pos)]
+            parent_refs[str(pos)] = rand.sample(
+                candidates, min(len(candidates), rand.choice([0, 1, 1, 2, 2])))
+        tag_refs = {}
+        for tag in range(tags):
+            name = f"v{rand.randrange(1, 9)}.{rand.randrange(9)}.0"
+            tag_refs[name] = str(rand.randrange(commits))
+        return cls(parent_refs, tag_refs)
+
+    def fetch_tags(self, name_filter: Callable[[str], Any] = None) -> Set[Tag]:
+        return set(Tag(self.repository, name, self.repository.get_commit(id))
+                   for name, id in self.tag_refs.items()
+                   if not name_filter or name_filter(name))
+
+    def fetch_commit(self, id: str) -> Commit:
+        time = self.ref_dt + timedelta(minutes=1) * int(id)
+        return Commit(self.repository, id, id, 'alice', time, 'alice', time)
+
+    def fetch_commit_parents(self, commit: Commit) -> CommitSet:
+        return CommitSet(self.repository.get_commit(id) 
+                         for id in self.parent_refs.get(commit.id, []))
+
+    def diff(self, commit_a: Commit, commit_b: Commit, 
+             parse_files: bool = False) -> DiffDelta:
+        return DiffDelta(0, 0, 0, set())
+
+
+class SyntheticRepositoryProxy(DagRepositoryProxy):
+    """A generated history with long-lived maintenance branches.
+
+    The branches fork from a common untagged history and each one has its
+    own releases. Every tenth commit of a branch merges the previous branch.
+    When patches is set, the releases of each branch are the patches of its
+    first release, e.g., v1.0.0, v1.0.1, v1.0.2, instead of v1.0.0, v1.1.0.
+    """
+    def __init__(self, branches: int, tags: int, commits_per_tag: int = 10, 
+                 history: int = 1000, patches: bool = False) -> None:
+        super().__init__({str(pos): [str(pos - 1)] 
+                          for pos in range(1, history)}, {})
+        self.name = 'synthetic'
+        pos = history
+        tips = {}
+        for branch in range(branches):
+            tip = history - 1
+            for tag in range(tags):
+                for _ in range(commits_per_tag):
+                    parents = [str(tip)]
+                    if branch and pos % 10 == 0 and branch - 1 in tips:
+                        parents.append(str(tips[branch - 1]))
+                    self.parent_refs[str(pos)] = parents
+                    tip = pos
+                    pos += 1
+                version = f"0.{tag}" if patches else f"{tag}.0"
+                self.tag_refs[f"v{branch + 1}.{version}"] = str(tip)
+            tips[branch] = tip
@@ -0,0 +1,104 @@
+import sqlite3
+
+import pytest
+
+from releasy.cache import CommitGraphCache, DiffCache
+from releasy.repository import CommitSet, DiffDelta
+from .mock_repository import MockRepository
+
+
+class describe_commit_graph_cache:
+    @pytest.fixture(autouse=True)
+    def init(self, tmp_path):
+        repository = MockRepository()
+        repository.load_commits()
+        self.commits = repository.commit_cache.cache
+        self.tags = repository.get_tags()
+        self.cache = CommitGraphCache(str(tmp_path / 'cache.db'))
+        self.cache.save('refs', self.commits.values(), self.tags)
+
+    def it_load_commits(self):
+        commits, _ = self.cache.load(MockRepository(), 'refs')
+        assert len(commits) == 23
+        assert commits['14'].parents.ids == set(['12', '13'])
+        assert not commits['0'].parents
+        assert commits['7'].committer == 'charlie'
+        assert commits['8'].author == 'charlie'
+        assert commits['10'].author_time == self.commits['10'].author_time
+
+    def it_index_loaded_commits(self):
+        repository = MockRepository()
+        commits, _ = self.cache.load(repository, 'refs')
+        table = repository.commit_table
+        commit = commits['10']
+        assert table.committer_times[commit.index] \
+            == commit.committer_time.timestamp()
+        lazy_commits = CommitSet([commits['7'], commits['8']]) \
+            | CommitSet([commits['1']])
+        assert lazy_commits.authors == set(['bob', 'charlie'])
+        assert repository.is_ancestor(commits['2'], commits['14'])
+
+    def it_close_connections(self, monkeypatch):
+        connections = []
+        connect = sqlite3.connect
+        def track(*args):
+            connections.append(connect(*args))
+            return connections[-1]
+        monkeypatch.setattr(sqlite3, 'connect', track)
+        self.cache.load(MockRepository(), 'refs')
+        self.cache.save('refs', self.commits.values(), self.tags)
+        assert len(connections) == 2
+        for connection in connections:
+            with pytest.raises(sqlite3.ProgrammingError):
+                connection.execute('SELECT 1')
+
+    def it_load_tags(self):
+        _, tags = self.cache.load(MockRepository(), 'refs')
+        assert len(tags) == 18
+        tags = {tag.name: tag for tag in tags}
+        assert tags['v2.0.1'].commit.id == '14'
+        assert tags['v2.0.1'].time == self.commits['14'].committer_time
+        assert not tags['v2.0.1'].is_annotated
+
+    def it_ignore_stale_cache(self):
+        assert self.cache.load(MockRepository(), 'other refs') is None
+
+
+class describe_diff_cache:
+    @pytest.fixture(autouse=True)
+    def init(self, tmp_path):
+        self.cache = DiffCache(str(tmp_path / 'diffs.db'), max_entries=10)
+
+    def it_store_diffs(self):
+        self.cache.put('a', 'b', DiffDelta(10, 5, 2, set()), False)
+        delta = self.cache.get('a', 'b', False)
+        assert delta.churn == 15
+        assert delta.files_changed == 2
+        assert not self.cache.get('b', 'a', False)
+
+    def it_store_diff_files(self):
+        self.cache.put('a', 'b', DiffDelta(10, 5, 2, set(['x', 'y'])), True)
+        assert self.cache.get('a', 'b', True).files == set(['x', 'y'])
+        assert self.cache.get('a', 'b', False).files == set()
+
+    def it_does_not_return_files_not_stored(self):
+        self.cache.put('a', 'b', DiffDelta(10, 5, 2, set()), False)
+        assert not self.cache.get('a', 'b', True)
+
+    def it_evict_least_recently_used_diffs(self):
+        for tree in range(10):
+            self.cache.put(str(tree), 'b', DiffDelta(tree, 0, 1, set()), False)
+        self.cache.get('0', 'b', False)
+        self.cache.put('10', 'b', DiffDelta(10, 0, 1, set()), False)
+        assert self.cache.size == 10
+        assert self.cache.get('0', 'b', False)
+        assert not self.cache.get('1', 'b', False)
+
+    def it_close_the_connection(self, tmp_path):
+        with DiffCache(str(tmp_path / 'other.db')) as cache:
+            cache.put('a', 'b', DiffDelta(10, 5, 2, set()), False)
+        with pytest.raises(sqlite3.ProgrammingError):
+            cache.get('a', 'b', False)
+        self.cache.close()
+        with pytest.raises(sqlite3.ProgrammingError):
+            self.cache.get('a', 'b', False)
@@ -0,0 +1,102 @@
+import random
+
+import pytest
+
+import releasy
+from releasy.miner_release import FinalReleaseMiner
+from releasy.miner_commit import HistoryCommitMiner
+from releasy.miner_base_release import BaseReleaseMiner
+from releasy.miner_semantic import SemanticReleaseMiner
+from releasy.project import Project
+
+from releasy.repository import Repository
+
+from .mock_repository import DagRepositoryProxy, MockRepository
+
+
+def mine(repository, project: Project = None, 
+         engine: str = 'dfs') -> Project:
+    return releasy.Miner(repository).apply(
+        FinalReleaseMiner(),
+        HistoryCommitMiner(engine),
+        BaseReleaseMiner(),
+        SemanticReleaseMiner()
+    ).mine(project)
+
+
+def summary(project: Project):
+    return {
+        release.name: (
+            release.commits.ids,
+            set(tail.id for tail in release.tails),
+            release.base_releases.names,
+            release.base_release.name if release.base_release else None)
+        for release in project.releases
+    }, project.main_releases.names, project.patches.names, {
+        mrelease.name: mrelease.patches.names 
+        for mrelease in project.main_releases}
+
+
+class describe_incremental_miner:
+    @pytest.fixture(autouse=True, params=HistoryCommitMiner.ENGINES)
+    def init(self, request):
+        self.engine = request.param
+        self.project = mine(MockRepository())
+        self.repository = MockRepository()
+        self.tag_refs = dict(self.repository.proxy.tag_refs)
+
+    def mine_with_new_tags(self, *new_tags):
+        for tag in new_tags:
+            del self.repository.proxy.tag_refs[tag]
+        project = mine(self.repository, engine=self.engine)
+        self.repository.proxy.tag_refs.update(self.tag_refs)
+        return project, mine(self.repository, project, self.engine)
+
+    def it_mine_only_new_releases(self):
+        previous, project = self.mine_with_new_tags('v3.1.0', 'v4.0.0')
+        assert project is previous
+        assert summary(project) == summary(self.project)
+
+    def it_remine_when_new_releases_are_older(self):
+        _, project = self.mine_with_new_tags('v1.0.0', 'v4.0.0')
+        assert summary(project) == summary(self.project)
+
+    def it_remine_when_tags_are_removed(self):
+        project = mine(self.repository, engine=self.engine)
+        del self.repository.proxy.tag_refs['v4.0.0']
+        project = mine(self.repository, project, self.engine)
+        assert 'v4.0.0' not in project.releases
+        assert project.releases['v3.1.1'].commits.ids == set(['19', '17'])
+
+    @pytest.mark.parametrize('seed', range(300))
+    def it_mine_as_a_full_mine_on_any_history(self, seed):
+        proxy = DagRepositoryProxy.random(seed, commits=40, tags=8)
+        tag_refs = dict(proxy.tag_refs)
+        full_project = mine(Repository(
+            DagRepositoryProxy(proxy.parent_refs, tag_refs)))
+        repository = Repository(proxy)
+        rand = random.Random(seed)
+        for tag in rand.sample(sorted(tag_refs), rand.randint(1, 3)):
+            del proxy.tag_refs[tag]
+        project = mine(repository, engine=self.engine)
+        proxy.tag_refs.update(tag_refs)
+        project = mine(repository, project, self.engine)
+        assert summary(project) == summary(full_project)
+
+
+class describe_miner:
+    def it_mine_the_same_releases_with_any_engine(self):
+        assert summary(mine(MockRepository(), engine='topological')) \
+            == summary(mine(MockRepository(), engine='dfs'))
+
+    def it_load_commits_before_mining(self):
+        repository = MockRepository()
+        mine(repository)
+        assert repository.commits_loaded
+        assert len(repository.commit_cache.cache) == 23
+
+    def it_fetch_commits_on_demand(self):
+        repository = MockRepository()
+        releasy.Miner(repository, load_commits=False).apply(
+            FinalReleaseMiner()).mine()
+        assert not repository.commits_loaded
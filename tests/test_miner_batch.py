@@ -0,0 +1,91 @@
+import multiprocessing
+import time
+import pytest
+
+from releasy.miner_batch import BatchMiner, RepositoryFactory
+from releasy.miner_commit import HistoryCommitMiner
+from releasy.miner_release import FinalReleaseMiner
+from releasy.miner_semantic import SemanticReleaseMiner
+from releasy.miner_base_release import BaseReleaseMiner
+from releasy.repository import Repository
+
+from .mock_repository import MockRepository, MockRepositoryProxy
+
+
+class FailingProxy(MockRepositoryProxy):
+    def fetch_tags(self, name_filter=None):
+        raise ValueError("broken repository")
+
+
+class SlowProxy(MockRepositoryProxy):
+    def fetch_tags(self, name_filter=None):
+        time.sleep(60)
+
+
+def create_repository(proxy_type, name: str) -> Repository:
+    proxy = proxy_type(MockRepository.ref_dt)
+    proxy.name = name
+    return Repository(proxy)
+
+
+def repository(proxy_type, name: str) -> RepositoryFactory:
+    return RepositoryFactory(name, create_repository, proxy_type, name)
+
+
+class describe_batch_miner:
+    @pytest.fixture(autouse=True)
+    def init(self):
+        self.batch = BatchMiner(workers=2, timeout=5).apply(
+            FinalReleaseMiner(),
+            HistoryCommitMiner(),
+            BaseReleaseMiner(),
+            SemanticReleaseMiner())
+
+    def it_mine_repositories(self):
+        results = list(self.batch.mine(
+            [repository(MockRepositoryProxy, name) for name in 'abc']))
+        assert sorted(result.name for result in results) == ['a', 'b', 'c']
+        summary = results[0].summary
+        assert summary['releases']['v2.0.0']['commits'] == 6
+        assert summary['releases']['v2.0.0']['base_release'] == '1.1.1'
+        assert len(summary['main_releases']) == 7
+        assert self.batch.report.succeeded == 3
+
+    def it_mine_repositories_in_spawned_workers(self):
+        batch = BatchMiner(workers=1, timeout=30, start_method='spawn')
+        batch.apply(*self.batch.miners)
+        results = list(batch.mine(
+            [repository(MockRepositoryProxy, 'mock')]))
+        assert results[0].summary['releases']['v2.0.0']['commits'] == 6
+
+    def it_reject_repository_objects(self):
+        with pytest.raises(TypeError):
+            list(self.batch.mine(
+                [create_repository(MockRepositoryProxy, 'mock')]))
+
+    def it_stop_the_workers_on_invalid_repositories(self):
+        with pytest.raises(TypeError):
+            list(self.batch.mine([
+                repository(SlowProxy, 'slow'),
+                create_repository(MockRepositoryProxy, 'mock')]))
+        assert not multiprocessing.active_children()
+
+    def it_isolate_failures(self):
+        results = {result.name: result for result in self.batch.mine([
+            repository(FailingProxy, 'failing'),
+            repository(MockRepositoryProxy, 'mock')])}
+        assert 'broken repository' in results['failing'].error
+        assert not results['failing'].summary
+        assert results['mock'].summary
+        assert self.batch.report.failed == 1
+        assert self.batch.report.succeeded == 1
+
+    def it_stop_repositories_on_timeout(self):
+        self.batch.timeout = 0.5
+        results = {result.name: result for result in self.batch.mine([
+            repository(SlowProxy, 'slow'),
+            repository(MockRepositoryProxy, 'mock')])}
+        assert results['slow'].timed_out
+        assert results['mock'].summary
+        assert self.batch.report.timed_out == 1
+        assert self.batch.report.throughput > 0
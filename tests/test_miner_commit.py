@@ -3,15 +3,17 @@ import pytest
 import releasy
 from releasy.miner_release import ReleaseMiner
 from releasy.miner_commit import HistoryCommitMiner, MixedHistoryCommitMiner
-from .mock_repository import MockRepository
+from releasy.repository import Repository
+from .mock_repository import (
+    DagRepositoryProxy, MockRepository, SyntheticRepositoryProxy)
 
 
 class describe_mix_history_commit_miner:
-    @pytest.fixture(autouse=True)
-    def init(self) -> None:
+    @pytest.fixture(autouse=True, params=MixedHistoryCommitMiner.ENGINES)
+    def init(self, request) -> None:
         project = releasy.Miner(MockRepository()).apply(
             ReleaseMiner(),
-            MixedHistoryCommitMiner()
+            MixedHistoryCommitMiner(engine=request.param)
         ).mine()
         self.project = project
 
@@ -39,13 +41,68 @@ class describe_mix_history_commit_miner:
         assert project.releases['v4.0.0'].commits.ids \
             == set(['21', '18', '16'])
 
+    def it_mine_tails(self):
+        project = self.project
+        assert project.releases['1.1.0'].tails.ids == set(['6', '2'])
+        assert project.releases['v2.0.0'].tails.ids == set(['14', '12', '2'])
+        assert project.releases['v2.0.1'].tails.ids == set(['14', '12', '2'])
+        assert project.releases['v4.0.0'].tails.ids == set(['21', '18', '16'])
+
+
+class describe_mix_history_commit_miner_engines:
+    def it_mine_the_same_commits_with_any_engine(self):
+        releases = [
+            releasy.Miner(Repository(SyntheticRepositoryProxy(4, 5))).apply(
+                ReleaseMiner(),
+                MixedHistoryCommitMiner(engine)
+            ).mine().releases
+            for engine in MixedHistoryCommitMiner.ENGINES]
+        assert [(release.commits.ids, release.tails.ids) 
+                for release in releases[0]] \
+            == [(releases[1][release.name].commits.ids, 
+                 releases[1][release.name].tails.ids)
+                for release in releases[0]]
+        assert len(releases[0]['v2.0.0'].commits) == 1010
+
+    def it_mine_the_same_commits_with_any_engine_on_any_history(self):
+        for seed in range(200):
+            releases = [
+                releasy.Miner(Repository(DagRepositoryProxy.random(seed))).apply(
+                    ReleaseMiner(),
+                    MixedHistoryCommitMiner(engine)
+                ).mine().releases
+                for engine in MixedHistoryCommitMiner.ENGINES]
+            assert [(release.commits.ids, release.tails.ids) 
+                    for release in releases[0]] \
+                == [(releases[1][release.name].commits.ids, 
+                     releases[1][release.name].tails.ids)
+                    for release in releases[0]], seed
+
+    def it_reject_unknown_engines(self):
+        with pytest.raises(ValueError):
+            MixedHistoryCommitMiner(engine='bfs')
+
+    def it_share_memos_reached_twice_from_a_segment(self):
+        proxy = DagRepositoryProxy(
+            {'5': ['3'], '6': ['3'], '7': ['6', '5'], '9': ['7'], 
+             '10': ['7', '9'], '11': ['10'], '16': ['11', '10'], 
+             '19': ['3'], '20': ['19'], '25': ['20']},
+            {'v1.1.0': '16', 'v7.2.0': '25'})
+        releases = releasy.Miner(Repository(proxy)).apply(
+            ReleaseMiner(),
+            MixedHistoryCommitMiner('shared')
+        ).mine().releases
+        assert releases['v1.1.0'].commits.ids \
+            == set(['3', '5', '6', '7', '9', '10', '11', '16'])
+        assert releases['v7.2.0'].commits.ids == set(['3', '19', '20', '25'])
+
 
 class describe_history_commit_miner:
-    @pytest.fixture(autouse=True)
-    def init(self) -> None:
+    @pytest.fixture(autouse=True, params=HistoryCommitMiner.ENGINES)
+    def init(self, request) -> None:
         project = releasy.Miner(MockRepository()).apply(
             ReleaseMiner(),
-            HistoryCommitMiner()
+            HistoryCommitMiner(engine=request.param)
         ).mine()
         self.project = project
 
@@ -87,6 +144,39 @@ class describe_history_commit_miner:
         assert project.releases['v2.0.1'].head.id == '14'
         assert project.releases['v2.0.1'].commits.ids == set()
 
+    def it_mine_tails(self):
+        project = self.project
+        assert project.releases['v1.0.0'].tails.ids == set(['2'])
+        assert project.releases['v2.0.0'].tails.ids == set(['14', '12', '11'])
+        assert project.releases['v2.0.1'].tails.ids == set()
+        assert project.releases['v2.1'].tails.ids == set(['18', '16'])
+
+    def it_export_the_commit_mapping(self):
+        c2r = dict(self.project.c2r.export())
+        assert len(c2r) == 23
+        assert c2r['12'] == 'v2.0.0'
+        assert c2r['14'] == 'v2.0.0'
+
+
+class describe_history_commit_miner_engines:
+    def it_mine_the_same_commits_with_any_engine_on_any_history(self):
+        for seed in range(200):
+            releases = [
+                releasy.Miner(Repository(DagRepositoryProxy.random(seed))).apply(
+                    ReleaseMiner(),
+                    HistoryCommitMiner(engine)
+                ).mine().releases
+                for engine in HistoryCommitMiner.ENGINES]
+            assert [(release.commits.ids, release.tails.ids) 
+                    for release in releases[0]] \
+                == [(releases[1][release.name].commits.ids, 
+                     releases[1][release.name].tails.ids)
+                    for release in releases[0]], seed
+
+    def it_reject_unknown_engines(self):
+        with pytest.raises(ValueError):
+            HistoryCommitMiner(engine='bfs')
+
 
 class describe_commit_set:
     @pytest.fixture(autouse=True)
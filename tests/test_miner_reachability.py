@@ -0,0 +1,75 @@
+import pytest
+
+import releasy
+from releasy.miner_reachability import ReachabilityMiner
+from releasy.miner_release import FinalReleaseMiner
+from releasy.reachability import ReachabilityIndex
+from releasy.repository import Bitmap
+
+from .mock_repository import MockRepository
+
+
+def mine(repository, path, project=None):
+    return releasy.Miner(repository).apply(
+        FinalReleaseMiner(),
+        ReachabilityMiner(path)
+    ).mine(project)
+
+
+class describe_reachability_miner:
+    @pytest.fixture(autouse=True)
+    def init(self, tmp_path):
+        self.path = str(tmp_path / 'reachability.db')
+        self.repository = MockRepository()
+        self.project = mine(self.repository, self.path)
+        self.releases = self.project.releases
+        self.index = self.project.reachability
+
+    def it_index_all_releases(self):
+        assert len(self.index) == len(self.releases)
+
+    def it_check_reachable_commits(self):
+        v2_1 = self.releases['v2.1']
+        assert self.index.reaches(v2_1, self.repository.get_commit('16'))
+        assert self.index.reaches(v2_1, self.repository.get_commit('0'))
+        assert not self.index.reaches(v2_1, self.repository.get_commit('17'))
+
+    def it_keep_compressed_bitmaps(self):
+        bitmap = self.index.bitmap(self.releases['v2.1'])
+        assert isinstance(bitmap, Bitmap)
+        assert set(self.index.ids[position] for position in bitmap) \
+            == set(str(id) for id in range(21)) - set(['17', '19'])
+
+    def it_check_ancestry(self):
+        assert self.index.is_ancestor(
+            self.releases['v2.0.0'], self.releases['v2.1'])
+        assert not self.index.is_ancestor(
+            self.releases['v2.1'], self.releases['v2.0.0'])
+
+    def it_find_commits_between_releases(self):
+        v2_1, v2_0_0 = self.releases['v2.1'], self.releases['v2.0.0']
+        assert self.index.ids_between(v2_1, v2_0_0) \
+            == set(['20', '18', '16', '15'])
+        assert self.index.count_between(v2_1, v2_0_0) == 4
+        assert self.index.commits_between(v2_1, v2_0_0).ids \
+            == set(['20', '18', '16', '15'])
+
+    def it_find_releases_containing_a_commit(self):
+        assert self.index.releases_containing(
+            self.repository.get_commit('17'), self.releases).names \
+            == set(['v3.1.1', 'v4.0.0'])
+
+    def it_load_the_saved_index(self):
+        index = ReachabilityIndex(MockRepository(), self.path)
+        assert index.heads == self.index.heads
+        assert index.bitmaps == self.index.bitmaps
+
+    def it_invalidate_moved_tags(self):
+        self.repository.proxy.tag_refs['v2.1'] = '22'
+        project = mine(self.repository, self.path)
+        index = project.reachability
+        assert index.heads['v2.1'] == '22'
+        assert index.reaches(project.releases['v2.1'], 
+                             self.repository.get_commit('22'))
+        assert ReachabilityIndex(MockRepository(), self.path).heads \
+            == index.heads
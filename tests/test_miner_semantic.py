@@ -6,9 +6,9 @@ from releasy.miner_release import FinalReleaseMiner
 from releasy.miner_commit import HistoryCommitMiner, MixedHistoryCommitMiner
 from releasy.miner_base_release import BaseReleaseMiner
 from releasy.miner_semantic import SemanticReleaseMiner
-from releasy.repository import Commit
+from releasy.repository import Commit, Repository
 
-from .mock_repository import MockRepository
+from .mock_repository import MockRepository, SyntheticRepositoryProxy
 
 
 class describe_release_miner:
@@ -157,6 +157,20 @@ class describe_release_miner:
         assert len(dup_releases) == 1
         assert dup_releases[0].name == '2.0'
 
+    def it_mine_long_patch_series(self):
+        project = releasy.Miner(Repository(SyntheticRepositoryProxy(
+            2, 400, commits_per_tag=2, patches=True))).apply(
+            FinalReleaseMiner(),
+            HistoryCommitMiner(),
+            BaseReleaseMiner(),
+            SemanticReleaseMiner()
+        ).mine()
+        assert project.main_releases.names == set(['v1.0.0', 'v2.0.0'])
+        assert len(project.patches) == 798
+        assert len(project.main_releases['v1.0.0'].patches) == 399
+        assert project.patches['v2.0.399'].main_release.name == 'v2.0.0'
+        assert not [patch for patch in project.patches if patch.is_orphan]
+
 
 class describe_semantic_release_set:
     @pytest.fixture(autouse=True)
@@ -176,3 +190,32 @@ class describe_semantic_release_set:
         assert self.project.patches.commits().ids \
             == set(['19', '17', '15', '13', '7', '5', '4'])
 
+    def it_has_contributors(self):
+        commits = self.project.main_releases.commits()
+        assert commits.authors \
+            == set(commit.author for commit in list(commits))
+        assert self.project.patches.commits().committers \
+            == set(['alice', 'charlie'])
+
+    def it_unite_sets_in_order(self):
+        mreleases = self.project.main_releases
+        patches = self.project.patches
+        sreleases = mreleases | patches
+        assert [srelease.name for srelease in sreleases] \
+            == [srelease.name for srelease in mreleases] \
+             + [srelease.name for srelease in patches]
+
+    def it_has_positional_access(self):
+        mreleases = self.project.main_releases
+        names = [mrelease.name for mrelease in mreleases]
+        assert [mreleases[pos].name for pos in range(len(mreleases))] == names
+        assert mreleases[-1].name == names[-1]
+
+    def it_has_first_and_last_releases(self):
+        mreleases = self.project.main_releases
+        name = lambda mrelease: mrelease.name
+        assert mreleases.first(name).name == '1.1.0'
+        assert mreleases.last(name).name == 'v4.0.0'
+        mreleases.add(self.project.patches['0.10.1'])
+        assert mreleases.first(name).name == '0.10.1'
+        assert mreleases[-1].name == '0.10.1'
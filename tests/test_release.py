@@ -1,11 +1,13 @@
 
+import re
 import pytest
 import releasy
 from releasy.miner_commit import HistoryCommitMiner
 from releasy.miner_contributor import ContributorMiner
 from releasy.miner_release import ReleaseMiner
 
-from releasy.release import Release
+from releasy.release import (
+    Commit2ReleaseMapper, Release, ReleaseSet, ReleaseVersion, sort_releases)
 from tests.mock_repository import MockRepository
 
 class describe_release_version:
@@ -32,6 +34,111 @@ class describe_release_version:
         assert result == [1, 0, -1]
 
 
+    def it_parses_version_types(self):
+        """parses the version type once"""
+        version = Release(None, "v1.2.0", None).version
+        assert version.prefix == 'v'
+        assert version.number == '1.2.0'
+        assert version.is_main_release()
+        assert version.is_minor()
+        assert not version.is_pre_release()
+        version = Release(None, "1.2.1-rc1", None).version
+        assert version.suffix == '-rc1'
+        assert version.is_pre_release()
+        assert version.is_patch()
+        assert not version.is_main_release()
+
+    def it_does_not_share_memoized_versions(self):
+        """does not share the memoized versions"""
+        v1 = ReleaseVersion("v2")
+        v2 = ReleaseVersion("v2")
+        assert v1.numbers == v2.numbers == [2, 0, 0]
+        assert v1.numbers is not v2.numbers
+
+    def it_parses_with_custom_patterns(self):
+        """parses with custom patterns"""
+        version = ReleaseVersion(
+            "rel-1_4", version_separator=re.compile(r'([0-9]+)'))
+        assert version.numbers == [1, 4, 0]
+        assert version.is_minor()
+
+
+    def it_orders_versions(self):
+        """orders versions by numbers, then final releases after pre releases"""
+        names = ["2.0.0", "1.0.0-rc2", "1.0.0", "1.0.0-rc1", "0.9", "v1.0.1",
+                 "1.0.0-beta"]
+        versions = sorted(ReleaseVersion(name) for name in names)
+        assert [version.full_name for version in versions] == [
+            "0.9", "1.0.0-beta", "1.0.0-rc1", "1.0.0-rc2", "1.0.0", "v1.0.1",
+            "2.0.0"]
+        assert ReleaseVersion("v1.0") == ReleaseVersion("1.0.0")
+        assert ReleaseVersion("v1.0").key == ReleaseVersion("1.0.0.0").key
+        assert hash(ReleaseVersion("v1.0")) == hash(ReleaseVersion("1.0.0"))
+        assert ReleaseVersion("1.0.0-rc1") < ReleaseVersion("1.0.0")
+        assert ReleaseVersion("1.0.0") >= ReleaseVersion("1.0.0-rc1")
+
+
+class describe_release_set:
+    @pytest.fixture(autouse=True)
+    def init(self) -> None:
+        self.releases = ReleaseSet(
+            Release(None, name, None) for name in ['1.0.0', '2.0', '1.1.0'])
+
+    def it_has_positional_access(self):
+        assert [self.releases[pos].name for pos in range(3)] \
+            == ['1.0.0', '2.0', '1.1.0']
+        assert self.releases[-1].name == '1.1.0'
+        self.releases.remove(self.releases['2.0'])
+        assert self.releases[1].name == '1.1.0'
+        self.releases.add(Release(None, '0.9', None))
+        assert self.releases[-1].name == '0.9'
+
+    def it_has_first_and_last_releases(self):
+        version = lambda release: release.version
+        assert self.releases.first().name == '1.0.0'
+        assert self.releases.last().name == '1.1.0'
+        assert self.releases.first(version).name == '1.0.0'
+        assert self.releases.last(version).name == '2.0'
+        self.releases.add(Release(None, '0.9', None))
+        self.releases.add(Release(None, 'v2.0.0', None))
+        assert self.releases.first(version).name == '0.9'
+        assert self.releases.last(version).name == 'v2.0.0'
+
+    def it_follow_release_changes_with_the_same_function(self):
+        version = lambda release: release.version
+        assert self.releases.last(version).name == '2.0'
+        self.releases['1.1.0'].version = ReleaseVersion('3.0.0')
+        assert self.releases.last(version).name == '1.1.0'
+        assert self.releases.first(version).name == '1.0.0'
+
+
+class describe_commit_to_release_mapper:
+    @pytest.fixture(autouse=True)
+    def init(self) -> None:
+        self.repository = MockRepository()
+        self.c2r = Commit2ReleaseMapper()
+        self.r1 = Release(None, 'v1.0.0', None)
+        self.r2 = Release(None, 'v2.0.0', None)
+        self.c2r.assign_commit(self.repository.get_commit('1'), self.r1)
+        self.c2r.assign_commit(self.repository.get_commit('2'), self.r1)
+        self.c2r.assign_commit(self.repository.get_commit('2'), self.r2)
+        self.c2r.assign_commit(self.repository.get_commit('2'), self.r2)
+
+    def it_map_commits_to_releases(self):
+        assert self.c2r.get_release(self.repository.get_commit('1')) \
+            == set([self.r1])
+        assert self.c2r.get_release(self.repository.get_commit('2')) \
+            == set([self.r1, self.r2])
+        assert self.c2r.get_release(self.repository.get_commit('3')) is None
+        assert self.c2r.is_assigned(self.repository.get_commit('1'))
+        assert not self.c2r.is_assigned(self.repository.get_commit('0'))
+        assert len(self.c2r) == 2
+
+    def it_export_the_mapping(self):
+        assert self.c2r.export() == [
+            ('1', 'v1.0.0'), ('2', 'v1.0.0'), ('2', 'v2.0.0')]
+
+
 class TestRelease:
     class describe_with_history_commit_miner():
         @pytest.fixture(autouse=True)
@@ -43,6 +150,13 @@ class TestRelease:
             ).mine()
             self.releases = project.releases
 
+        def it_sorts_releases(self):
+            assert [release.name for release in sort_releases(self.releases)] \
+                == ['0.0.0-alpha1', 'v0.9.0', 'v1.0.0', '0.10.1', '1.1.0', 
+                    '1.1.1', 'v2.0.0-alpha1', 'v2.0.0-beta1', 'r-1.0.2', 
+                    'v2.0.0', 'v2.0.1', '2.0', 'rel2.1.1pre', 'v3.1.1', 
+                    'v2.1', 'v4.0.0', 'v3.1.0']
+
         def it_has_committers(self):
             assert len(self.releases['v1.0.0'].contributors.committers) == 1
             assert len(self.releases['1.1.1'].contributors.committers) == 2
@@ -1,7 +1,9 @@
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Set
 import pytest
-from releasy.repository import Commit, Repository, RepositoryProxy, Tag
+from releasy.repository import (
+    Bitmap, Commit, CommitSet, IdentityTable, Repository, RepositoryProxy, 
+    Tag)
 from .mock_repository import MockRepository, MockRepositoryProxy
 
 
@@ -22,6 +24,16 @@ class describe_tag:
         tag = Tag(repo, '1.0.0', Commit(repo, '1'))
         assert Commit(repo, '1') == tag.commit
 
+    def it_has_time(self, repo: Repository):
+        commit = repo.get_commit('1')
+        tag = Tag(repo, '1.0.0', commit)
+        assert tag.time == commit.committer_time
+        assert tag.timestamp == commit.committer_timestamp
+        tag = Tag(repo, '1.0.0', commit, timestamp=1600000000, offset=-180)
+        assert tag.is_annotated
+        assert tag.time == datetime(2020, 9, 13, 9, 26, 40,
+                                    tzinfo=timezone(timedelta(hours=-3)))
+
 
 class describe_commit:
     def it_has_repository(self, repo: Repository):
@@ -32,6 +44,12 @@ class describe_commit:
         commit = Commit(repo, '1')
         assert commit.id == '1'
 
+    def it_has_index(self, repo: Repository):
+        commit = repo.get_commit('14')
+        assert commit.index == Commit(repo, '14').index
+        assert commit.index != repo.get_commit('13').index
+        assert repo.commit_table.ids[commit.index] == '14'
+
     def it_has_parents(self, repo: Repository):
         commit = repo.get_commit('14')
         assert commit.parents.ids == set(['12', '13'])
@@ -46,6 +64,16 @@ class describe_commit:
         assert 'bob' == repo.get_commit('1').author
         assert 'charlie' == repo.get_commit('8').author
 
+    def it_has_identity_ids(self, repo: Repository):
+        commit = repo.get_commit('2')
+        identities = repo.identity_table
+        assert identities.names[commit.committer_id] == 'bob'
+        assert commit.author_id == commit.committer_id
+        assert commit.author is repo.get_commit('1').author
+        commit = Commit(repo, 'a', committer_id=identities.intern('dave'))
+        assert commit.committer == 'dave'
+        assert commit.author_id is None
+
     def it_has_committer_time(self, repo: Repository):
         ref = repo.get_commit('0').committer_time
         assert repo.get_commit('10').committer_time == ref + 10*timedelta(days=1)
@@ -53,8 +81,190 @@ class describe_commit:
     def it_has_author_time(self, repo: Repository):
         ref = repo.get_commit('0').committer_time
         assert repo.get_commit('10').committer_time == ref + 10*timedelta(days=1)
+
+    def it_has_raw_times(self, repo: Repository):
+        commit = repo.get_commit('10')
+        assert commit.committer_timestamp \
+            == commit.committer_time.timestamp()
+        commit = Commit(repo, 'a', committer_timestamp=1600000000,
+                        committer_offset=-180)
+        assert commit.committer_time == datetime(
+            2020, 9, 13, 9, 26, 40, tzinfo=timezone(timedelta(hours=-3)))
+        assert commit.committer_time.utcoffset() == timedelta(hours=-3)
+        assert commit.author_time is None
         
 
+class describe_commit_table:
+    def it_store_parents(self, repo: Repository):
+        commit = repo.get_commit('14')
+        assert repo.commit_table.parents(commit.index) is None
+        commit.parents
+        assert repo.commit_table.parents(commit.index) \
+            == (repo.get_commit('12').index, repo.get_commit('13').index)
+        assert repo.commit_table.parents(repo.get_commit('0').index) is None
+
+    def it_store_loaded_parents(self, repo: Repository):
+        repo.load_commits()
+        table = repo.commit_table
+        assert table.parents(table.indexes['0']) == ()
+        assert table.parents(table.indexes['1']) == (table.indexes['0'],)
+
+    def it_store_times(self, repo: Repository):
+        commit = repo.get_commit('10')
+        assert repo.commit_table.committer_times[commit.index] \
+            == commit.committer_time.timestamp()
+
+    def it_back_the_commits(self, repo: Repository):
+        commit = repo.get_commit('10')
+        table = repo.commit_table
+        table.committer_times[commit.index] += 60
+        table.author_ids[commit.index] = repo.identity_table.intern('dave')
+        assert commit.committer_timestamp \
+            == repo.get_commit('9').committer_timestamp + 24*60*60 + 60
+        assert commit.author == 'dave'
+        assert not hasattr(commit, '__dict__')
+
+    def it_keep_commits_without_repository(self):
+        time = datetime(2020, 1, 1, tzinfo=timezone.utc)
+        commit = Commit(None, 'a', committer='alice', committer_time=time)
+        assert commit.committer == 'alice'
+        assert commit.committer_time == time
+        assert commit.committer_id is None
+        assert commit.author is None
+
+
+class describe_identity_table:
+    def it_intern_identities(self):
+        identities = IdentityTable()
+        id = identities.intern('alice <alice@example.com>')
+        assert identities.intern('alice', 'alice@example.com') == id
+        assert identities.intern('bob', 'bob@example.com') == id + 1
+        assert identities.names[id] == 'alice <alice@example.com>'
+        assert len(identities) == 2
+
+    def it_name_missing_identities(self):
+        identities = IdentityTable()
+        assert identities.name(identities.intern('alice')) == 'alice'
+        assert identities.name(-1) is None
+
+
+class describe_commit_cache:
+    @pytest.fixture(autouse=True)
+    def init(self):
+        self.repository = Repository(
+            MockRepositoryProxy(MockRepository.ref_dt), cache_size=2)
+
+    def it_evict_least_recently_used_commits(self):
+        for id in ['1', '2', '1', '3']:
+            self.repository.get_commit(id)
+        cache = self.repository.commit_cache
+        assert list(cache.cache.keys()) == ['1', '3']
+        assert (cache.hits, cache.misses, cache.evictions) == (1, 3, 1)
+
+    def it_keep_commits_in_use(self):
+        commit = self.repository.get_commit('1')
+        for id in ['2', '3', '4']:
+            self.repository.get_commit(id)
+        assert '1' not in self.repository.commit_cache.cache
+        assert self.repository.get_commit('1') is commit
+
+
+class describe_commit_set:
+    @pytest.fixture(autouse=True)
+    def init(self, repo: Repository):
+        commits = [repo.get_commit(str(pos)) for pos in range(8)]
+        self.a = CommitSet(commits[0:5])
+        self.b = CommitSet(commits[3:8])
+
+    def it_unite_sets(self):
+        commits = self.a | self.b
+        assert len(commits) == 8
+        assert [commit.id for commit in commits] \
+            == ['0', '1', '2', '3', '4', '5', '6', '7']
+
+    def it_intersect_sets(self):
+        commits = self.a & self.b
+        assert len(commits) == 2
+        assert commits.ids == set(['3', '4'])
+
+    def it_subtract_sets(self):
+        assert len(self.a.difference(self.b)) == 3
+        assert self.a.difference(self.b).ids == set(['0', '1', '2'])
+        assert self.a - self.b == set(self.a.difference(self.b))
+
+    def it_compare_sets(self):
+        assert self.a & self.b == self.b & self.a
+        assert self.a | self.b != self.a
+        assert self.a == self.a.all
+
+    def it_change_lazy_sets(self, repo: Repository):
+        commits = self.a & self.b
+        commits.add(repo.get_commit('0'))
+        assert len(commits) == 3
+        assert list(commits.bitmap) == [0, 3, 4]
+        assert '0' in commits
+
+    def it_test_lazy_sets_without_materializing(self, repo: Repository):
+        commits = self.a & self.b
+        assert repo.get_commit('3') in commits
+        assert '4' in commits
+        assert repo.get_commit('0') not in commits
+        assert '7' not in commits and 'unknown' not in commits
+        assert Commit(None, '3') not in commits
+        assert commits._commits is None
+
+    def it_has_contributors(self, repo: Repository):
+        assert self.a.authors == set(['alice', 'bob'])
+        assert (self.a & self.b).committers == set(['bob', 'alice'])
+        assert sorted((self.a | self.b).author_ids) \
+            == sorted(commit.author_id for commit in self.a | self.b)
+        assert (CommitSet() | self.b).committers \
+            == set(['alice', 'bob', 'charlie'])
+        assert (CommitSet() | CommitSet()).authors == set()
+
+    def it_unite_many_sets(self, repo: Repository):
+        c = CommitSet([repo.get_commit('9')])
+        assert self.a.union(self.b, c).ids == self.a.ids | self.b.ids | c.ids
+        assert CommitSet().union().ids == set()
+
+    def it_handle_commits_without_repository(self):
+        commits = CommitSet([Commit(None, 'a'), Commit(None, 'b')])
+        assert commits.bitmap is None
+        assert (commits | self.a).ids \
+            == set(['a', 'b', '0', '1', '2', '3', '4'])
+        assert (commits & self.a).ids == set()
+        assert commits.author_ids is None
+        assert commits.authors == set([None])
+
+
+class describe_bitmap:
+    @pytest.fixture(autouse=True)
+    def init(self):
+        self.a = Bitmap([0, 3, 5000, 9000])
+        self.b = Bitmap([3, 9000, 20000])
+
+    def it_store_only_the_used_chunks(self):
+        assert sorted(Bitmap([1, 100000]).chunks) \
+            == [0, 100000 >> Bitmap.CHUNK_BITS]
+        assert list(Bitmap([100000, 1])) == [1, 100000]
+        assert len(self.a) == 4
+        assert 5000 in self.a and 5001 not in self.a and 7 not in Bitmap()
+
+    def it_combine_bitmaps(self):
+        assert list(self.a | self.b) == [0, 3, 5000, 9000, 20000]
+        assert list(self.a & self.b) == [3, 9000]
+        assert list(self.a - self.b) == [0, 5000]
+        assert Bitmap.union(self.a, self.b, Bitmap([1])) \
+            == Bitmap([0, 1, 3, 5000, 9000, 20000])
+        assert not (self.a - self.a).chunks
+
+    def it_convert_to_bytes(self):
+        data = self.a.to_bytes()
+        assert int.from_bytes(data, 'little') \
+            == sum(1 << position for position in self.a)
+        assert Bitmap.from_bytes(data) == self.a
+
+
 class describe_repository:
     @pytest.fixture(autouse=True)
     def init(self):
@@ -65,9 +275,59 @@ class describe_repository:
         assert len(tags) == 18
         assert Tag(self.repository, '1.1.0') in tags
 
+    def it_filter_tags(self):
+        tags = self.repository.get_tags(lambda name: name.startswith('v'))
+        assert len(tags) == 10
+        assert Tag(self.repository, 'v2.1') in tags
+        assert Tag(self.repository, 'non') not in tags
+        assert '18' not in self.repository.commit_cache.cache
+
     def it_fetch_commits(self):
         assert self.repository.get_commit('1') == Commit(self.repository, '1')
 
+    def it_diff_many(self):
+        pairs = [(self.repository.get_commit(str(id)), 
+                  self.repository.get_commit(str(id-1)))
+                 for id in range(1, 10)]
+        deltas = list(self.repository.diff_many(pairs, parse_files=True))
+        assert [delta.insertions for delta in deltas] == list(range(1, 10))
+        assert deltas[0].files == set(['1.txt'])
+
+    def it_load_commits(self):
+        self.repository.load_commits()
+        commits = self.repository.commit_cache.cache
+        assert len(commits) == 23
+        assert commits['14'].parents.ids == set(['12', '13'])
+        assert not commits['0'].parents
+
+    def it_has_generations(self):
+        commit = lambda id: self.repository.get_commit(id)
+        assert self.repository.generation(commit('0')) == 1
+        assert self.repository.generation(commit('5')) == 1
+        assert self.repository.generation(commit('4')) == 5
+        assert self.repository.generation(commit('6')) == 4
+        assert self.repository.generation(commit('7')) == 6
+
+    def it_check_ancestors(self):
+        commit = lambda id: self.repository.get_commit(id)
+        assert self.repository.is_ancestor(commit('14'), commit('20'))
+        assert self.repository.is_ancestor(commit('5'), commit('14'))
+        assert self.repository.is_ancestor(commit('14'), commit('14'))
+        assert not self.repository.is_ancestor(commit('17'), commit('20'))
+        assert not self.repository.is_ancestor(commit('11'), commit('10'))
+        assert not self.repository.is_ancestor(commit('20'), commit('14'))
+
+    def it_find_merge_bases(self):
+        commit = lambda id: self.repository.get_commit(id)
+        merge_bases = lambda a, b: self.repository.merge_bases(
+            commit(a), commit(b)).ids
+        assert merge_bases('17', '20') == set(['14'])
+        assert merge_bases('11', '13') == set(['2'])
+        assert merge_bases('22', '21') == set(['18'])
+        assert merge_bases('14', '20') == set(['14'])
+        assert merge_bases('7', '7') == set(['7'])
+        assert merge_bases('5', '0') == set()
+
 
 class DemoProxy(RepositoryProxy):
     pass
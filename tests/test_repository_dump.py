@@ -0,0 +1,110 @@
+import pytest
+
+from releasy.repository import Commit, DiffUnavailable, Repository
+from releasy.repository_dump import VERSION, DumpRepository, export_dump
+from .mock_repository import MockRepository
+
+
+@pytest.fixture
+def dump_path(tmp_path):
+    path = str(tmp_path / 'mock.dump')
+    export_dump(MockRepository(), path)
+    return path
+
+
+class describe_dump_repository:
+    @pytest.fixture(autouse=True)
+    def init(self, dump_path):
+        self.origin = MockRepository()
+        self.repository = Repository(DumpRepository(dump_path))
+
+    def it_has_name(self):
+        assert self.repository.name == 'mock'
+
+    def it_fetch_tags(self):
+        tags = {tag.name: tag for tag in self.repository.get_tags()}
+        origin_tags = {tag.name: tag for tag in self.origin.get_tags()}
+        assert set(tags) == set(origin_tags)
+        assert tags['v1.0.0'].commit.id == '3'
+        assert tags['v1.0.0'].time == origin_tags['v1.0.0'].time
+        assert not tags['v1.0.0'].is_annotated
+
+    def it_filter_tags(self):
+        tags = self.repository.get_tags(lambda name: name.startswith('v2'))
+        assert set(tag.name for tag in tags) \
+            == set(['v2.0.0-alpha1', 'v2.0.0-beta1', 'v2.0.0', 'v2.0.1', 
+                    'v2.1'])
+
+    def it_fetch_commits(self):
+        for id in ['0', '7', '14', '22']:
+            commit = self.repository.get_commit(id)
+            origin = self.origin.get_commit(id)
+            assert (commit.message, commit.committer, commit.committer_time,
+                    commit.author, commit.author_time) \
+                == (origin.message, origin.committer, origin.committer_time,
+                    origin.author, origin.author_time)
+            assert commit.parents.ids == origin.parents.ids
+
+    def it_load_commits(self):
+        self.repository.load_commits()
+        commits = self.repository.commit_cache.cache
+        assert len(commits) == 23
+        assert commits['14'].parents.ids == set(['12', '13'])
+        assert not commits['0'].parents
+
+    def it_reject_unknown_commits(self):
+        with pytest.raises(KeyError):
+            self.repository.get_commit('99')
+        with pytest.raises(KeyError):
+            self.repository.proxy.fetch_commit_parents(Commit(None, '99'))
+
+    def it_does_not_support_diffs(self):
+        commit_a = self.repository.get_commit('1')
+        commit_b = self.repository.get_commit('2')
+        assert not self.repository.supports_diff
+        assert self.origin.supports_diff
+        with pytest.raises(DiffUnavailable):
+            self.repository.diff(commit_a, commit_b, False)
+        with pytest.raises(DiffUnavailable):
+            self.repository.diff_many([(commit_a, commit_b)])
+
+    def it_keep_missing_identities(self, tmp_path):
+        origin = MockRepository()
+        fetch_commit = origin.proxy.fetch_commit
+        def fetch_commit_without_identities(id):
+            commit = fetch_commit(id)
+            if id == '5':
+                return Commit(origin, id, id, None, commit.committer_time,
+                              '', commit.author_time)
+            return commit
+        origin.proxy.fetch_commit = fetch_commit_without_identities
+        path = str(tmp_path / 'identities.dump')
+        export_dump(origin, path)
+        commit = Repository(DumpRepository(path)).get_commit('5')
+        assert commit.committer is None
+        assert commit.author == ''
+
+
+class describe_dump_file:
+    def it_reject_corrupted_dumps(self, dump_path):
+        with open(dump_path, 'r+b') as dump:
+            dump.seek(100)
+            byte = dump.read(1)
+            dump.seek(100)
+            dump.write(bytes([byte[0] ^ 0xff]))
+        with pytest.raises(ValueError, match='corrupted'):
+            DumpRepository(dump_path)
+        assert DumpRepository(dump_path, verify=False)
+
+    def it_reject_other_versions(self, dump_path):
+        with open(dump_path, 'r+b') as dump:
+            dump.seek(8)
+            dump.write(bytes([VERSION + 1]))
+        with pytest.raises(ValueError, match='version'):
+            DumpRepository(dump_path)
+
+    def it_reject_truncated_dumps(self, dump_path):
+        with open(dump_path, 'r+b') as dump:
+            dump.truncate(200)
+        with pytest.raises(ValueError, match='truncated'):
+            DumpRepository(dump_path)
@@ -1,8 +1,110 @@
 from datetime import datetime, timezone
+import os
+import sqlite3
+import subprocess
+import pygit2
 import pytest
 from releasy.repository import Commit, Repository, Tag
 
-from releasy.repository_git import GitRepository
+from releasy.repository_git import (
+    CommitGraph, GitRepository, _read_packed_refs)
+
+
+@pytest.fixture(scope='module')
+def graph_path(tmp_path_factory):
+    """A repository with an octopus merge and a split commit-graph chain,
+    whose layers are written before and after the merge"""
+    path = str(tmp_path_factory.mktemp('graph'))
+    def git(*args, day=1):
+        env = dict(os.environ,
+                   GIT_AUTHOR_NAME='alice', GIT_AUTHOR_EMAIL='alice@mail',
+                   GIT_COMMITTER_NAME='bob', GIT_COMMITTER_EMAIL='bob@mail',
+                   GIT_AUTHOR_DATE=f"2020-01-{day:02} 12:00:00 -0300",
+                   GIT_COMMITTER_DATE=f"2020-01-{day:02} 13:00:00 -0300")
+        subprocess.run(['git', '-C', path, *args], env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    def commit(file_name, day):
+        with open(os.path.join(path, file_name), 'a') as file:
+            file.write(f"day {day}\n")
+        git('add', file_name)
+        git('commit', '-q', '-m', f"change {file_name}", day=day)
+
+    git('init', '-q', '-b', 'main')
+    for day in range(1, 4):
+        commit('main.txt', day)
+    git('tag', 'v1.0.0')
+    git('commit-graph', 'write', '--reachable', '--split=no-merge')
+    for day, branch in enumerate(['a', 'b', 'c'], 4):
+        git('checkout', '-q', '-b', branch, 'main')
+        commit(f"{branch}.txt", day)
+    git('checkout', '-q', 'main')
+    commit('main.txt', 7)
+    git('merge', '-q', '-m', 'octopus', 'a', 'b', 'c', day=8)
+    commit('main.txt', 9)
+    git('tag', 'v2.0.0')
+    git('commit-graph', 'write', '--reachable', '--split=no-merge')
+    return path
+
+
+class describe_commit_graph:
+    @pytest.fixture(autouse=True)
+    def init(self, graph_path):
+        self.git = pygit2.Repository(graph_path)
+        self.commit_graph = CommitGraph.open(self.git.path)
+        self.commits = list(self.git.walk(
+            self.git.head.target, pygit2.GIT_SORT_TOPOLOGICAL))
+
+    def it_read_split_chains(self):
+        assert len(self.commit_graph.layers) == 2
+        assert self.commit_graph.size == len(self.commits)
+        assert self.commit_graph.layers[1].edges
+
+    def it_read_parents(self):
+        for rcommit in self.commits:
+            assert self.commit_graph.parents(rcommit.hex) \
+                == [parent_id.hex for parent_id in rcommit.parent_ids]
+        assert max(len(rcommit.parent_ids) for rcommit in self.commits) == 4
+
+    def it_read_commit_times(self):
+        for rcommit in self.commits:
+            assert self.commit_graph.commit_time(rcommit.hex) \
+                == rcommit.commit_time
+
+    def it_read_generations(self):
+        generations = {}
+        for rcommit in reversed(self.commits):
+            generations[rcommit.hex] = 1 + max(
+                (generations[parent_id.hex] 
+                 for parent_id in rcommit.parent_ids), default=0)
+        for rcommit in self.commits:
+            assert self.commit_graph.generation(rcommit.hex) \
+                == generations[rcommit.hex]
+
+    def it_ignore_commits_out_of_the_graph(self):
+        assert self.commit_graph.parents('00' * 20) is None
+        assert 'ff' * 20 not in self.commit_graph
+
+    def it_fetch_parents_from_the_graph(self, graph_path):
+        repository = Repository(GitRepository(graph_path))
+        merge = next(rcommit for rcommit in self.commits 
+                     if len(rcommit.parent_ids) == 4)
+        assert repository.proxy.commit_graph
+        assert [parent.id 
+                for parent in repository.get_commit(merge.hex).parents] \
+            == [parent_id.hex for parent_id in merge.parent_ids]
+
+    def it_close_the_caches(self, graph_path, tmp_path):
+        proxy = GitRepository(graph_path, 
+                              diff_cache_path=str(tmp_path / 'diffs.db'))
+        diff_cache = proxy.diff_cache
+        layers = proxy.commit_graph.layers
+        proxy.close()
+        assert proxy.diff_cache is None and proxy.commit_graph is None
+        with pytest.raises(sqlite3.ProgrammingError):
+            diff_cache.db.execute('SELECT 1')
+        assert all(layer.data.closed for layer in layers)
+        repository = Repository(proxy)
+        assert len(repository.get_commit(self.commits[0].hex).parents) == 1
 
 @pytest.mark.local
 class describe_git_repository:
@@ -17,6 +119,11 @@ class describe_git_repository:
         assert Tag(self.repository, '1.0.1') in tags
         # TODO assert '1.0.1' in tags
 
+    def it_fetch_filtered_tags(self):
+        tags = self.repository.get_tags(lambda name: name.startswith('1.0'))
+        assert Tag(self.repository, '1.0.1') in tags
+        assert all(tag.name.startswith('1.0') for tag in tags)
+
     def it_has_specific_commits(self):
         assert self.repository.get_commit('18a0198d91cfa21b27ea6fa60353a606ba76c7db')
 
@@ -25,6 +132,25 @@ class describe_git_repository:
         assert commit.parents.ids \
             == set(['f45fb10eb1354c7a4ff421b07598e008e8ad427b'])
 
+    def it_load_commits(self):
+        self.repository.load_commits()
+        commit = self.repository.get_commit('18a0198d91cfa21b27ea6fa60353a606ba76c7db')
+        assert commit.parents.ids \
+            == set(['f45fb10eb1354c7a4ff421b07598e008e8ad427b'])
+        assert commit.author_time \
+            == datetime(2022, 5, 28, 1, 3, 48, tzinfo=timezone.utc) 
+
+    def it_read_commit_graph(self):
+        commit_graph = self.repository.proxy.commit_graph
+        if not commit_graph:
+            pytest.skip("repository without commit-graph file")
+        commit_id = '18a0198d91cfa21b27ea6fa60353a606ba76c7db'
+        assert commit_graph.parents(commit_id) \
+            == ['f45fb10eb1354c7a4ff421b07598e008e8ad427b']
+        assert commit_graph.generation(commit_id) \
+            == commit_graph.generation(
+                'f45fb10eb1354c7a4ff421b07598e008e8ad427b') + 1
+
     def it_mine_tag_time(self):
         tags = sorted(self.repository.get_tags(), key=lambda tag: tag.time)
         # 1.0.0 1.0.1 Sep 18 00:12:14 2018 -0300
@@ -82,3 +208,36 @@ class describe_git_repository:
         assert delta.churn == 122
         assert 'releasy/semantic.py' in delta.files
         assert 'tests/test_miner_semantic.py' in delta.files
+
+    def it_mine_many_diffs(self):
+        commit_a = self.repository.get_commit('18a0198d91cfa21b27ea6fa60353a606ba76c7db')
+        commit_b = self.repository.get_commit('f45fb10eb1354c7a4ff421b07598e008e8ad427b')
+        commit_c = self.repository.get_commit('7d99f1b0930fe0817ad5b8964361a35b8f5c98a1')
+        commit_d = self.repository.get_commit('8d2d89453796172be92991961f9d30db360c057b')
+        deltas = list(self.repository.diff_many(
+            [(commit_a, commit_b), (commit_c, commit_d)] * 3, 
+            parse_files=True, workers=2, chunk_size=1))
+
+        assert [delta.churn for delta in deltas] == [370, 122] * 3
+        assert 'releasy/semantic.py' in deltas[1].files
+
+
+class describe_packed_refs:
+    def it_read_targets_and_peeled_ids(self, tmp_path):
+        path = tmp_path / 'packed-refs'
+        path.write_text(
+            "# pack-refs with: peeled fully-peeled sorted \n"
+            "2a9310f2f60bc825b1224e0d7488edebe64da1b4 refs/heads/main\n"
+            "7513cbf38772d716cea3e33b65184c11bbbb83f7 refs/tags/v1.0\n"
+            "^2a9310f2f60bc825b1224e0d7488edebe64da1b4\n"
+            "1688ace5e6e2e2e69603afaacd8e89679a38fa5d refs/tags/nightly\n")
+        refs = _read_packed_refs(str(path))
+        assert refs['refs/tags/v1.0'] == (
+            '7513cbf38772d716cea3e33b65184c11bbbb83f7',
+            '2a9310f2f60bc825b1224e0d7488edebe64da1b4')
+        assert refs['refs/tags/nightly'] == (
+            '1688ace5e6e2e2e69603afaacd8e89679a38fa5d', None)
+        assert len(refs) == 3
+
+    def it_ignore_missing_files(self, tmp_path):
+        assert _read_packed_refs(str(tmp_path / 'packed-refs')) == {}
@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta, timezone
+import os
+import subprocess
+import pytest
+
+from releasy.repository import Repository, Tag
+from releasy.repository_git import GitRepository
+from releasy.repository_gitcli import GitCliRepository
+
+
+@pytest.fixture(scope='module')
+def git_path(tmp_path_factory):
+    """A repository with a merge, lightweight and annotated tags"""
+    path = str(tmp_path_factory.mktemp('repo'))
+    def git(*args, day=1):
+        env = dict(os.environ,
+                   GIT_AUTHOR_NAME='alice', GIT_AUTHOR_EMAIL='alice@mail',
+                   GIT_COMMITTER_NAME='bob', GIT_COMMITTER_EMAIL='bob@mail',
+                   GIT_AUTHOR_DATE=f"2020-01-{day:02} 12:00:00 -0300",
+                   GIT_COMMITTER_DATE=f"2020-01-{day:02} 13:00:00 -0300")
+        subprocess.run(['git', '-C', path, *args], env=env, check=True,
+                       stdout=subprocess.DEVNULL)
+
+    git('init', '-q', '-b', 'main')
+    for day in range(1, 4):
+        with open(os.path.join(path, 'file.txt'), 'a') as file:
+            file.write(f"line {day}\n")
+        git('add', 'file.txt')
+        git('commit', '-q', '-m', f"change {day}", day=day)
+    git('tag', 'v1.0.0', 'HEAD~2')
+    git('tag', '-a', 'v1.1.0', '-m', 'release 1.1.0', 'HEAD~1', day=2)
+    git('checkout', '-q', '-b', 'fix', 'HEAD~2')
+    with open(os.path.join(path, 'fix.txt'), 'w') as file:
+        file.write("fix\n")
+    git('add', 'fix.txt')
+    git('commit', '-q', '-m', 'fix', day=4)
+    git('checkout', '-q', 'main')
+    git('merge', '-q', '--no-ff', '-m', 'merge fix', 'fix', day=5)
+    git('tag', '-a', 'v2.0.0', '-m', 'release 2.0.0', day=5)
+    git('tag', 'nightly-1')
+    git('pack-refs', '--all')
+    git('tag', 'ci-2', 'HEAD~1')
+    return path
+
+
+class describe_git_cli_repository:
+    @pytest.fixture(autouse=True)
+    def init(self, git_path):
+        proxy = GitCliRepository(git_path)
+        self.repository = Repository(proxy)
+        yield
+        proxy.close()
+
+    def it_fetch_tags(self):
+        tags = {tag.name: tag for tag in self.repository.get_tags()}
+        assert set(tags) == set(['v1.0.0', 'v1.1.0', 'v2.0.0', 
+                                 'nightly-1', 'ci-2'])
+        assert not tags['v1.0.0'].is_annotated
+        assert tags['v1.1.0'].is_annotated
+        assert tags['v1.1.0'].message == 'release 1.1.0\n'
+        assert tags['v1.1.0'].author == 'bob <bob@mail>'
+        assert tags['v1.1.0'].time == datetime(
+            2020, 1, 2, 13, tzinfo=timezone(timedelta(hours=-3)))
+        assert tags['v2.0.0'].commit == tags['nightly-1'].commit
+
+    def it_filter_tags(self):
+        tags = self.repository.get_tags(lambda name: name.startswith('v'))
+        assert set(tag.name for tag in tags) \
+            == set(['v1.0.0', 'v1.1.0', 'v2.0.0'])
+
+    def it_fetch_commits(self):
+        tags = {tag.name: tag for tag in self.repository.get_tags()}
+        commit = tags['v2.0.0'].commit
+        assert commit.message == 'merge fix\n'
+        assert commit.author == 'alice <alice@mail>'
+        assert commit.committer == 'bob <bob@mail>'
+        assert commit.author_time == datetime(
+            2020, 1, 5, 12, tzinfo=timezone(timedelta(hours=-3)))
+        assert len(commit.parents) == 2
+        assert tags['v1.0.0'].commit in commit.parents[1].parents
+
+    def it_load_commits(self):
+        self.repository.load_commits()
+        commits = self.repository.commit_cache.cache
+        assert len(commits) == 5
+        merge = [commit for commit in commits.values() 
+                 if commit.message == 'merge fix\n'][0]
+        assert set(parent.message for parent in merge.parents) \
+            == set(['change 3\n', 'fix\n'])
+
+    def it_diff(self):
+        tags = {tag.name: tag for tag in self.repository.get_tags()}
+        delta = self.repository.diff(tags['v1.0.0'].commit, tags['v2.0.0'].commit, 
+                                True)
+        assert (delta.insertions, delta.deletions, delta.files_changed) \
+            == (3, 0, 2)
+        assert delta.files == set(['file.txt', 'fix.txt'])
+
+    def it_is_interchangeable_with_pygit2(self, git_path):
+        def mine(proxy):
+            repository = Repository(proxy)
+            repository.load_commits()
+            tags = sorted((tag.name, tag.commit.id, tag.message, tag.author,
+                           tag.time) for tag in self.repository.get_tags())
+            commits = sorted(
+                (commit.id, commit.message, commit.committer, 
+                 commit.committer_time, commit.author, commit.author_time, 
+                 commit.parents.ids)
+                for commit in repository.commit_cache.cache.values())
+            return tags, commits
+
+        assert mine(GitCliRepository(git_path)) == mine(GitRepository(git_path))